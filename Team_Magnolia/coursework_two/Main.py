@@ -287,6 +287,8 @@ def build_parser() -> argparse.ArgumentParser:
     p_ex.add_argument("--pdf", type=str, help="Local PDF path")
     p_ex.add_argument("--minio-key", dest="minio_key", type=str,
                       help="MinIO object key (e.g. reports/2024.pdf)")
+    p_ex.add_argument("--no-cache", dest="no_cache", action="store_true",
+                      help="Bypass the LLM response cache (fresh calls, cache refreshed)")
     p_ex.set_defaults(func=extract_command)
 
     # convert
@@ -335,7 +337,13 @@ def build_parser() -> argparse.ArgumentParser:
                       help="Only process keys that start with this prefix, e.g. '2024/'")
     p_be.add_argument("--limit", type=int, default=None,
                       help="Process first N files only (debug)")
-    p_be.set_defaults(func=lambda a: run_batch(a.prefix, a.limit))
+    p_be.add_argument("--no-cache", dest="no_cache", action="store_true",
+                      help="Bypass the LLM response cache (fresh calls, cache refreshed)")
+    p_be.add_argument("--workers", type=int, default=1,
+                      help="Number of worker processes (default: 1 = sequential)")
+    p_be.add_argument("--no-resume", dest="resume", action="store_false",
+                      help="Reprocess keys already recorded in the batch checkpoint")
+    p_be.set_defaults(func=lambda a: run_batch(a.prefix, a.limit, a.workers, a.resume))
 
 
     # serve Flask dashboard
@@ -360,6 +368,10 @@ def main() -> int:
         parser.print_help()
         return 1
 
+    if getattr(args, "no_cache", False):
+        from modules.extract.extractor import LLM_CACHE
+        LLM_CACHE.bypass = True
+
     try:
         args.func(args)
         return 0
@@ -14,54 +14,71 @@ Flask dashboard for CSR-ESG records
 
 import itertools
 import os
-from typing import List, Dict, Any
+import threading
+import time
 
 from flask import Flask, render_template, request, jsonify
-from pymongo import MongoClient
+
+from modules.Viz.models import DataLoader, LiveRecordView
+from modules.Viz.index import RecordIndex
 
 # ────────────────────────────────────────────────────────────────────────────
-# 0) 读取 MongoDB 中的全部文档 → data (list[dict])
+# 0) 读取 MongoDB 中的全部文档 → 内存索引（company / metric / 公司名）
 # ────────────────────────────────────────────────────────────────────────────
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27019")
 MONGO_DB  = os.getenv("MONGO_DB",  "csr_extraction")
 MONGO_COLL = os.getenv("MONGO_COLL", "csr_reports")
-
-client = MongoClient(MONGO_URI)
-coll   = client[MONGO_DB][MONGO_COLL]
-
-# 只排除 _id 以便直接 JSON 序列化；其余字段全部保留
-data: List[Dict[str, Any]] = list(coll.find({}, {"_id": 0}))
-
-if not data:
+# 每隔多少秒增量拉取一次新记录（0 = 不刷新）
+REFRESH_SECONDS = float(os.getenv("VIZ_REFRESH_SECONDS", "60"))
+# memory = 启动时载入并建内存索引；mongo = 每个请求下推到聚合管道（带 TTL 缓存）
+BACKEND = os.getenv("VIZ_BACKEND", "memory")
+
+loader = DataLoader(mode="mongo", mongo_uri=MONGO_URI,
+                    db_name=MONGO_DB, collection_name=MONGO_COLL)
+if BACKEND == "mongo":
+    rec_index = LiveRecordView(loader)
+    REFRESH_SECONDS = 0          # 数据实时来自 Mongo，无需增量刷新
+else:
+    rec_index = RecordIndex(loader.fetch_new_records()[0])
+
+if not len(rec_index):
     raise RuntimeError(
         f"Collection '{MONGO_DB}.{MONGO_COLL}' is empty – "
         "please ingest some reports first."
     )
 
-# ────────────────────────────────────────────────────────────────────────────
-# 1) 构建 “Thematic Area → 指标(id) 列表” 映射（页面下拉菜单用）
-# ────────────────────────────────────────────────────────────────────────────
-thematic_area_choices: Dict[str, List[str]] = {}
-for rec in data:
-    area = rec.get("thematic_area", "Unknown")
-    ind  = rec.get("indicator_id")
-    if not ind:
-        continue
-    thematic_area_choices.setdefault(area, [])
-    if ind not in thematic_area_choices[area]:
-        thematic_area_choices[area].append(ind)
+_refresh_lock = threading.Lock()
+_last_refresh = time.monotonic()
+
+
+def refresh_index() -> int:
+    """增量拉取新文档并追加进索引；返回新增条数。"""
+    global rec_index, _last_refresh
+    with _refresh_lock:
+        new, full_reload = loader.fetch_new_records()
+        _last_refresh = time.monotonic()
+        if full_reload:
+            rec_index = RecordIndex(new)
+            return len(new)
+        return rec_index.add(new)
 
 # ────────────────────────────────────────────────────────────────────────────
-# 2) Flask 应用 & 路由
+# 1) Flask 应用 & 路由
 # ────────────────────────────────────────────────────────────────────────────
 app = Flask(__name__)
 
+
+@app.before_request
+def _maybe_refresh():
+    if REFRESH_SECONDS and time.monotonic() - _last_refresh > REFRESH_SECONDS:
+        refresh_index()
+
 # ===============  (1) DASHBOARD  首页  ======================================
 @app.route("/", methods=["GET"])
 def index() -> str:
     available_years = [str(y) for y in range(2017, 2026)]
-    esg_choices = list(itertools.chain.from_iterable(thematic_area_choices.values()))
-    company_list = sorted({rec.get("company_name", "") for rec in data})
+    esg_choices = list(itertools.chain.from_iterable(rec_index.thematic_area_choices.values()))
+    company_list = rec_index.company_names
     return render_template(
         "index.html",
         available_years=available_years,
@@ -79,15 +96,14 @@ def dashboard_data():
 
     result_years, result_values = [], []
 
-    for rec in data:
-        if rec.get("company_name") == company and rec.get("indicator_id") == metric:
-            rec_years = rec.get("years", [])
-            nums      = rec.get("values_numeric", [])
-            for y, v in zip(rec_years, nums):
-                if y in selected_years:
-                    result_years.append(y)
-                    result_values.append(v)
-            break
+    rec = rec_index.first(company, metric)
+    if rec is not None:
+        rec_years = rec.get("years", [])
+        nums      = rec.get("values_numeric", [])
+        for y, v in zip(rec_years, nums):
+            if y in selected_years:
+                result_years.append(y)
+                result_values.append(v)
 
     return jsonify({
         "years":   result_years,
@@ -98,13 +114,7 @@ def dashboard_data():
 # ===============  (2) DATACHECK  公司覆盖情况  ===============================
 @app.route("/datacheck", methods=["GET"])
 def datacheck_page():
-    company_status = [
-        {
-            "company_name": c,
-            "has_report": any(rec.get("company_name") == c for rec in data)
-        }
-        for c in sorted({rec.get("company_name", "") for rec in data})
-    ]
+    company_status = rec_index.coverage()
     return render_template("datacheck.html", company_status=company_status)
 
 # ===============  (3) SEARCH  查询表格 ======================================
@@ -114,20 +124,15 @@ def search_page():
     return render_template(
         "search.html",
         available_years=years,
-        thematic_area_choices=thematic_area_choices,
+        thematic_area_choices=rec_index.thematic_area_choices,
         search_results=[]
     )
 
 
 @app.route("/api/search_companies", methods=["GET"])
 def api_search_companies():
-    q = request.args.get("q", "").lower()
-    names = {
-        rec.get("company_name", "")
-        for rec in data
-        if q and q in rec.get("company_name", "").lower()
-    }
-    return jsonify([{"company_name": n} for n in sorted(names)])
+    names = rec_index.search_names(request.args.get("q", ""))
+    return jsonify([{"company_name": n} for n in names])
 
 
 @app.route("/search_results", methods=["POST"])
@@ -137,13 +142,8 @@ def search_results():
     metrics   = request.form.getlist("selected_metrics")
 
     results = []
-    for rec in data:
-        if rec.get("company_name") not in companies:
-            continue
+    for rec in rec_index.select(companies, metrics):
         mid = rec.get("indicator_id")
-        if mid not in metrics:
-            continue
-
         row = {
             "company_name":  rec.get("company_name"),
             "thematic_area": rec.get("thematic_area"),
@@ -182,7 +182,7 @@ def search_results():
     return render_template(
         "search.html",
         available_years=[str(y) for y in range(2017, 2026)],
-        thematic_area_choices=thematic_area_choices,
+        thematic_area_choices=rec_index.thematic_area_choices,
         search_results=results
     )
 
@@ -190,7 +190,7 @@ def search_results():
 @app.route("/dataviz", methods=["GET"])
 def dataviz_page():
     years       = [str(y) for y in range(2017, 2026)]
-    esg_choices = list(itertools.chain.from_iterable(thematic_area_choices.values()))
+    esg_choices = list(itertools.chain.from_iterable(rec_index.thematic_area_choices.values()))
     chart_types = ["line", "bar", "pie"]
     return render_template(
         "data_viz.html",
@@ -202,13 +202,8 @@ def dataviz_page():
 
 @app.route("/api/dv_search_companies", methods=["GET"])
 def dv_search_companies():
-    q = request.args.get("q", "").lower()
-    names = {
-        rec.get("company_name", "")
-        for rec in data
-        if q and q in rec.get("company_name", "").lower()
-    }
-    return jsonify([{"company_name": n} for n in sorted(names)])
+    names = rec_index.search_names(request.args.get("q", ""))
+    return jsonify([{"company_name": n} for n in names])
 
 
 @app.route("/api/dv_chart_data", methods=["POST"])
@@ -223,12 +218,9 @@ def dv_chart_data():
         return jsonify({"chart_type": chart_type, "data": {}})
 
     chart_data = {}
-    for rec in data:
+    for rec in rec_index.select(comp_list, metric_list):
         name   = rec.get("company_name")
         metric = rec.get("indicator_id")
-        if name not in comp_list or metric not in metric_list:
-            continue
-
         key       = f"{name}|{metric}"
         year_vals = {}
         for y in year_list:
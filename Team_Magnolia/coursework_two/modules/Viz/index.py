@@ -0,0 +1,98 @@
+# index.py
+# -*- coding: utf-8 -*-
+"""
+In-memory query index for the Viz dashboard
+──────────────────────────────────────────────────────────────────────────────
+app.py 原来每个请求都线性扫描整个 `data` 列表（/datacheck 甚至是
+companies × records）。这里在加载时建好索引，之后只做字典查找：
+
+* company            → record positions
+* (company, metric)  → record positions
+* 排好序的公司名（autocomplete 只扫不重复的公司名，而不是全部记录）
+* thematic_area → indicator 列表、公司覆盖情况（预计算）
+
+`add()` 支持增量追加，DataLoader 拉到新记录后无需整体重建。
+查询结果按记录加载顺序返回，与原来线性扫描的顺序一致。
+"""
+from __future__ import annotations
+
+import threading
+from bisect import insort
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class RecordIndex:
+    def __init__(self, records: Iterable[Dict[str, Any]] = ()):
+        self._lock = threading.RLock()
+        self._records: List[Dict[str, Any]] = []
+        self._by_company: Dict[Any, List[int]] = {}
+        self._by_pair: Dict[Tuple[Any, Any], List[int]] = {}
+        self._names: List[str] = []          # sorted, distinct
+        self._names_lower: Dict[str, str] = {}
+        self._areas: Dict[str, List[str]] = {}
+        self._area_seen: Dict[str, set] = {}
+        self.add(records)
+
+    # ── build / incremental update ───────────────────────────────
+    def add(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Append records to every index; returns how many were added."""
+        n = 0
+        with self._lock:
+            for rec in records:
+                pos = len(self._records)
+                self._records.append(rec)
+                name = rec.get("company_name")
+                ind = rec.get("indicator_id")
+                self._by_company.setdefault(name, []).append(pos)
+                self._by_pair.setdefault((name, ind), []).append(pos)
+
+                display = rec.get("company_name", "")
+                if display not in self._names_lower:
+                    self._names_lower[display] = (display or "").lower()
+                    insort(self._names, display)
+
+                if ind:
+                    area = rec.get("thematic_area", "Unknown")
+                    seen = self._area_seen.setdefault(area, set())
+                    if ind not in seen:
+                        seen.add(ind)
+                        self._areas.setdefault(area, []).append(ind)
+                n += 1
+        return n
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    # ── lookups ──────────────────────────────────────────────────
+    @property
+    def company_names(self) -> List[str]:
+        return list(self._names)
+
+    @property
+    def thematic_area_choices(self) -> Dict[str, List[str]]:
+        return {a: list(v) for a, v in self._areas.items()}
+
+    def coverage(self) -> List[Dict[str, Any]]:
+        """[{company_name, has_report}] for the /datacheck page."""
+        return [{"company_name": c, "has_report": c in self._by_company} for c in self._names]
+
+    def first(self, company: Any, metric: Any) -> Optional[Dict[str, Any]]:
+        pos = self._by_pair.get((company, metric))
+        return self._records[pos[0]] if pos else None
+
+    def select(self, companies: Iterable[Any], metrics: Iterable[Any]) -> List[Dict[str, Any]]:
+        """Records whose company ∈ companies and indicator ∈ metrics, in load order."""
+        metrics = set(metrics)
+        positions: List[int] = []
+        for c in set(companies):
+            for m in metrics:
+                positions.extend(self._by_pair.get((c, m), ()))
+        positions.sort()
+        return [self._records[p] for p in positions]
+
+    def search_names(self, q: str) -> List[str]:
+        """Case-insensitive substring match over distinct company names (sorted)."""
+        q = (q or "").lower()
+        if not q:
+            return []
+        return [n for n in self._names if q in self._names_lower[n]]
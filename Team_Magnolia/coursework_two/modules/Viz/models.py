@@ -1,20 +1,75 @@
 # models.py
 import os
 import json
-from pymongo import MongoClient
+import re
+import threading
+import time
+from datetime import timedelta
+from bson import ObjectId
+from pymongo import ASCENDING, MongoClient
+
+# 聚合结果（公司列表、指标下拉、搜索）的缓存时间（秒）
+CACHE_TTL = float(os.getenv("VIZ_CACHE_TTL", "300"))
+# 流式游标每批取回的文档数
+CURSOR_BATCH = 500
+# 增量拉取的回看窗口（秒）：并行 batch worker 生成的 _id 不是严格递增的，
+# 按 _id 里的时间戳回看这么久，并跳过已读过的 _id
+INCREMENTAL_LAG = float(os.getenv("VIZ_INCREMENTAL_LAG", "300"))
+# 每隔多少秒整体重读一次（兜住更新 / 删除，以及晚于回看窗口写入的文档）
+FULL_RELOAD_SECONDS = float(os.getenv("VIZ_FULL_RELOAD_SECONDS", "1800"))
+
+
+class TTLCache:
+    """很小的线程安全 TTL 缓存：key → (过期时间, 值)。"""
+
+    def __init__(self, ttl=CACHE_TTL, max_items=1024):
+        self.ttl = ttl
+        self.max_items = max_items
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get_or_set(self, key, compute):
+        now = time.monotonic()
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is not None and hit[0] > now:
+                return hit[1]
+        value = compute()
+        with self._lock:
+            if len(self._data) >= self.max_items:
+                # 先丢掉已过期的，仍然满就整体清空
+                self._data = {k: v for k, v in self._data.items() if v[0] > now}
+                if len(self._data) >= self.max_items:
+                    self._data.clear()
+            self._data[key] = (now + self.ttl, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
 
 class DataLoader:
-    def __init__(self, mode="json", json_path=None, mongo_uri=None, db_name=None, collection_name=None):
+    def __init__(self, mode="json", json_path=None, mongo_uri=None, db_name=None, collection_name=None,
+                 cache_ttl=CACHE_TTL, incremental_lag=INCREMENTAL_LAG, full_reload_seconds=FULL_RELOAD_SECONDS):
         """
         mode: "json" 或 "mongo"
         如果是 json，必须给 json_path
         如果是 mongo，必须给 mongo_uri, db_name, collection_name
+        mongo 模式下筛选 / 投影 / 分组都下推到聚合管道，结果放进 TTL 缓存
         """
         self.mode = mode
         self.json_path = json_path
         self.mongo_uri = mongo_uri
         self.db_name = db_name
         self.collection_name = collection_name
+        self.incremental_lag = timedelta(seconds=incremental_lag)
+        self.full_reload_seconds = full_reload_seconds
+        self._watermark = None      # mongo: 已读到的最大 _id 时间戳（增量拉取用）
+        self._recent_ids = set()    # mongo: 回看窗口内已读过的 _id
+        self._last_full = None      # mongo: 上次整体重读的时间（monotonic）
+        self._json_mtime = None     # json: 上次交给调用方时的文件 mtime
+        self.cache = TTLCache(cache_ttl)
 
         if self.mode == "json":
             if not json_path:
@@ -25,6 +80,7 @@ class DataLoader:
                 raise ValueError("Mongo模式必须提供mongo连接信息")
             self.client = MongoClient(mongo_uri)
             self.collection = self.client[db_name][collection_name]
+            self.ensure_indexes()
         else:
             raise ValueError("模式只支持 'json' 或 'mongo'")
 
@@ -34,25 +90,131 @@ class DataLoader:
         with open(self.json_path, "r", encoding="utf-8") as f:
             return json.load(f)
 
+    def fetch_new_records(self):
+        """
+        增量拉取：返回 (records, full_reload)。
+        mongo 模式取 _id 时间戳不早于「水位 − incremental_lag」且没读过的文档
+        （去掉 _id 便于 JSON 序列化），每隔 full_reload_seconds 整体重读一次；
+        json 模式文件被改写时整体重读。full_reload=True 表示调用方应重建索引。
+        第一次调用返回全部记录。
+        """
+        if self.mode == "json":
+            mtime = os.path.getmtime(self.json_path)
+            if mtime == self._json_mtime:
+                return [], False
+            if self._json_mtime is not None:   # 文件被改写 → 重读
+                self.data = self.load_json()
+            self._json_mtime = mtime
+            return self.data, True
+
+        now = time.monotonic()
+        full = self._last_full is None or now - self._last_full >= self.full_reload_seconds
+        if full:
+            self._watermark, self._recent_ids, self._last_full = None, set(), now
+            query = {}
+        elif self._watermark is None:
+            # 集合此前为空，还没有水位 → 直接读全部（不会与已读记录重复）
+            query = {}
+        else:
+            since = ObjectId.from_datetime(self._watermark - self.incremental_lag)
+            query = {"_id": {"$gte": since}}
+
+        out, seen = [], []
+        for doc in self.collection.find(query).sort("_id", 1):
+            oid = doc.pop("_id")
+            if oid in self._recent_ids:
+                continue
+            seen.append(oid)
+            out.append(doc)
+
+        if seen:
+            newest = max(oid.generation_time for oid in seen)
+            if self._watermark is None or newest > self._watermark:
+                self._watermark = newest
+            cutoff = self._watermark - self.incremental_lag
+            self._recent_ids = {oid for oid in self._recent_ids.union(seen) if oid.generation_time >= cutoff}
+        return out, full
+
+    def ensure_indexes(self):
+        """支撑下面各个查询的索引（已存在时 create_index 是空操作）。"""
+        self.collection.create_index([("company_name", ASCENDING), ("indicator_id", ASCENDING)])
+        self.collection.create_index([("indicator_id", ASCENDING)])
+        self.collection.create_index([("thematic_area", ASCENDING), ("indicator_id", ASCENDING)])
+
     def get_all_records(self):
         if self.mode == "json":
             return self.data
         elif self.mode == "mongo":
-            return list(self.collection.find({}))
+            return list(self.iter_records())
+
+    def iter_records(self, companies=None, metrics=None, projection=None):
+        """
+        流式遍历记录：按公司 / 指标过滤，mongo 模式下由服务端筛选，
+        游标分批取回而不是一次性 list() 整个集合。
+        projection 为 None 时返回除 _id 外的全部字段。
+        """
+        companies = set(companies) if companies is not None else None
+        metrics = set(metrics) if metrics is not None else None
+        if self.mode == "json":
+            for rec in self.data:
+                if companies is not None and rec.get("company_name") not in companies:
+                    continue
+                if metrics is not None and rec.get("indicator_id") not in metrics:
+                    continue
+                yield rec
+            return
+
+        query = {}
+        if companies is not None:
+            query["company_name"] = {"$in": sorted(companies)}
+        if metrics is not None:
+            query["indicator_id"] = {"$in": sorted(metrics)}
+        proj = {"_id": 0} if projection is None else dict(projection, _id=0)
+        cursor = self.collection.find(query, proj, batch_size=CURSOR_BATCH).sort("_id", ASCENDING)
+        try:
+            yield from cursor
+        finally:
+            cursor.close()
+
+    def find_record(self, company, metric):
+        """(company, metric) 对应的第一条记录，没有则 None。"""
+        if self.mode == "json":
+            return next(self.iter_records([company], [metric]), None)
+        return self.collection.find_one(
+            {"company_name": company, "indicator_id": metric},
+            {"_id": 0}, sort=[("_id", ASCENDING)],
+        )
+
+    def company_names(self):
+        """去重、排序后的公司名列表。"""
+        def compute():
+            if self.mode == "json":
+                return sorted({rec.get("company_name", "") for rec in self.data})
+            pipeline = [
+                {"$group": {"_id": {"$ifNull": ["$company_name", ""]}}},
+                {"$sort": {"_id": 1}},
+            ]
+            return [doc["_id"] for doc in self.collection.aggregate(pipeline)]
+        return list(self.cache.get_or_set(("company_names",), compute))
 
     def search_companies(self, keyword):
         keyword = keyword.lower()
         if self.mode == "json":
             return sorted({rec["company_name"] for rec in self.data if keyword in rec.get("company_name", "").lower()})
-        else:
+
+        def compute():
             pipeline = [
-                {"$match": {"company_name": {"$regex": keyword, "$options": "i"}}},
+                {"$match": {"company_name": {"$regex": re.escape(keyword), "$options": "i"}}},
                 {"$group": {"_id": "$company_name"}},
                 {"$sort": {"_id": 1}}
             ]
             return [doc["_id"] for doc in self.collection.aggregate(pipeline)]
+        return list(self.cache.get_or_set(("search", keyword), compute))
 
     def build_thematic_area_choices(self):
+        if self.mode == "mongo":
+            return {a: list(v) for a, v in
+                    self.cache.get_or_set(("thematic_areas",), self._aggregate_thematic_areas).items()}
         records = self.get_all_records()
         thematic_area_choices = {}
         for rec in records:
@@ -63,6 +225,27 @@ class DataLoader:
                 thematic_area_choices[area].append(ind)
         return thematic_area_choices
 
+    def _aggregate_thematic_areas(self):
+        # 每个 (area, indicator) 只回传一行；按首次出现的 _id 排序，
+        # 保持与逐条遍历相同的下拉顺序
+        pipeline = [
+            {"$match": {"indicator_id": {"$nin": [None, ""]}}},
+            {"$group": {
+                "_id": {"area": {"$ifNull": ["$thematic_area", "Unknown"]},
+                        "ind": "$indicator_id"},
+                "first": {"$min": "$_id"},
+            }},
+            {"$sort": {"first": 1}},
+        ]
+        choices = {}
+        for doc in self.collection.aggregate(pipeline):
+            choices.setdefault(doc["_id"]["area"], []).append(doc["_id"]["ind"])
+        return choices
+
+    def coverage(self):
+        """[{company_name, has_report}]，给 /datacheck 页面用。"""
+        return [{"company_name": c, "has_report": True} for c in self.company_names()]
+
     def extract_year_value_map(self, rec, selected_years):
         rec_years = rec.get('years') or []
         nums = rec.get('values_numeric') or []
@@ -79,3 +262,37 @@ class DataLoader:
                 val = None
             year_map[y] = val
         return year_map
+
+
+class LiveRecordView:
+    """
+    与 RecordIndex 相同的查询接口，但每次都直接查询（mongo 模式即聚合下推），
+    不在 worker 里常驻整份数据；适合集合很大或多 worker 部署。
+    """
+
+    def __init__(self, loader):
+        self.loader = loader
+
+    def __len__(self):
+        return len(self.loader.company_names())
+
+    @property
+    def company_names(self):
+        return self.loader.company_names()
+
+    @property
+    def thematic_area_choices(self):
+        return self.loader.build_thematic_area_choices()
+
+    def coverage(self):
+        return self.loader.coverage()
+
+    def first(self, company, metric):
+        return self.loader.find_record(company, metric)
+
+    def select(self, companies, metrics):
+        return self.loader.iter_records(companies, metrics)
+
+    def search_names(self, q):
+        q = (q or "").strip()
+        return self.loader.search_companies(q) if q else []
@@ -6,18 +6,19 @@ from datetime import datetime
 import json, re, ast, operator as op
 from typing import Dict, List, Any, Union
 
-from pymongo import MongoClient
+from pymongo import InsertOne
 from bson import ObjectId
 
 # ─── Legacy dependencies (Mongo / validation / dimension table) ───
-from modules.extract.config_loader  import MONGO_URI, MONGO_DB
 from modules.extract.validator      import validate_record
 from modules.extract.company_lookup import get_company_id
+from modules.db.pools               import get_mongo_db
 
 # ─── New: lightweight PostgreSQL DAO  (see modules/db/pg_client.py) ─
 from modules.db.pg_client import (                         # type: ignore
+    get_cursor as pg_cursor,
     _upsert_company as pg_upsert_company,
-    _upsert_indicator as pg_upsert_indicator,
+    bulk_upsert_indicators as pg_bulk_upsert_indicators,
     batch_insert_metrics,
     batch_insert_targets,
 )
@@ -41,7 +42,7 @@ SAFE_OP = {
 
 # ──────────────────────── Utility functions ───────────────────────
 def _mongo_col(name: str = "csr_reports"):
-    return MongoClient(MONGO_URI)[MONGO_DB][name]
+    return get_mongo_db()[name]
 
 
 def _safe_eval(expr: str) -> Union[float, None]:
@@ -104,8 +105,7 @@ def ingest_report(
         raise FileNotFoundError(json_path)
 
     # ② Resolve company (Mongo dimension + PostgreSQL company_dim)
-    db = MongoClient(MONGO_URI)[MONGO_DB]
-    comp_col = db.dim_companies
+    comp_col = get_mongo_db().dim_companies
     if isinstance(company, ObjectId):
         company_id = company
         company_name = (comp_col.find_one({"_id": company_id}) or {}).get("name")
@@ -121,9 +121,6 @@ def ingest_report(
         return
     print(f"💾  Ingesting → {company_name} ({company_id})")
 
-    # —— PostgreSQL dimension upsert — returns integer PK
-    pg_company_id = pg_upsert_company(company_name.lower(), company_name)
-
     # ③ Read JSON
     raw: Dict[str, List[Dict[str, Any]]] = json.loads(json_path.read_text("utf-8"))
 
@@ -131,8 +128,7 @@ def ingest_report(
     recs: List[Dict[str, Any]] = []
     metric_rows_pg: List[dict] = []
     target_rows_pg: List[dict] = []
-
-    indicator_cache: Dict[str, int] = {}  # slug → indicator_id (PG)
+    indicator_rows_pg: List[tuple] = []   # (slug, name, area) → one multi-row upsert
 
     for theme, rows in raw.items():
         for row in rows:
@@ -193,22 +189,17 @@ def ingest_report(
             _clean_numeric(r, "values_numeric")
             _clean_numeric(r, "target_value")
 
-            # —— PostgreSQL dimension: indicator_dim (cache to avoid duplicate upsert)
+            # —— PostgreSQL dimension: indicator_dim (resolved in bulk below)
             slug = r["indicator_id"]
-            if slug not in indicator_cache:
-                indicator_cache[slug] = pg_upsert_indicator(
-                    slug=slug,
-                    name=r.get("indicator_name") or slug,
-                    area=r["thematic_area"],
-                )
-            pg_indicator_id = indicator_cache[slug]
+            indicator_rows_pg.append(
+                (slug, r.get("indicator_name") or slug, r["thematic_area"])
+            )
 
-            # —— Pre-build PG rows (does not affect old logic) ——
+            # —— Pre-build PG rows; ids are filled in once dimensions resolve ——
             if r["record_type"] == "metric":
                 metric_rows_pg.append(
                     {
-                        "company_id": pg_company_id,
-                        "indicator_id": pg_indicator_id,
+                        "slug": slug,
                         "report_year": r.get("report_year"),
                         "indicator_year": r.get("indicator_year"),
                         "value_numeric": _first(r.get("values_numeric")),
@@ -221,8 +212,7 @@ def ingest_report(
             else:  # target / commitment
                 target_rows_pg.append(
                     {
-                        "company_id": pg_company_id,
-                        "indicator_id": pg_indicator_id,
+                        "slug": slug,
                         "goal_text": r.get("goal_text"),
                         "progress_text": r.get("progress_text"),
                         "baseline_year": r.get("baseline_year"),
@@ -236,9 +226,10 @@ def ingest_report(
 
             recs.append(r)
 
-    # ⑤ Validation & write to MongoDB (old logic intact)
+    # ⑤ Validation, then one bulk_write to MongoDB
     col = _mongo_col()
     ok = bad = 0
+    valid: List[Dict[str, Any]] = []
 
     for r in recs:
         try:
@@ -257,13 +248,21 @@ def ingest_report(
                 print(f"[WARN] Validation failed, skipped – {e}")
                 continue
 
-        col.insert_one(r)
-        ok += 1
+        valid.append(r)
+
+    if valid:
+        ok = col.bulk_write([InsertOne(r) for r in valid], ordered=False).inserted_count
 
-    # ⑥ Batch write to PostgreSQL
+    # ⑥ PostgreSQL: company + all indicator slugs + facts in one transaction
     try:
-        batch_insert_metrics(metric_rows_pg)
-        batch_insert_targets(target_rows_pg)
+        with pg_cursor() as cur:
+            pg_company_id = pg_upsert_company(company_name.lower(), company_name, cur=cur)
+            slug_ids = pg_bulk_upsert_indicators(indicator_rows_pg, cur=cur)
+            for row in metric_rows_pg + target_rows_pg:
+                row["company_id"] = pg_company_id
+                row["indicator_id"] = slug_ids[row.pop("slug")]
+            batch_insert_metrics(metric_rows_pg, cur=cur)
+            batch_insert_targets(target_rows_pg, cur=cur)
         print(
             f"[RESULT] Mongo inserted {ok}, skipped {bad}  |  "
             f"PostgreSQL metrics={len(metric_rows_pg)}, targets={len(target_rows_pg)}"
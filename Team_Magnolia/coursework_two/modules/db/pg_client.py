@@ -1,32 +1,46 @@
 # modules/db/pg_client.py
 # -------------------------------------------------------------
-#  一个进程中重用单个（非异步安全）连接的小型包装
+#  PostgreSQL 小型 DAO：连接来自 modules/db/pools.py 的共享连接池
+#  每个函数都可以传入 `cur`，让调用方把多步写入放进同一个事务
 # -------------------------------------------------------------
-import os
-import psycopg2
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, Tuple
+
 from psycopg2.extras import execute_values
 
-from modules.extract.config_loader import POSTGRES_URI, POSTGRES_SCHEMA
+from modules.extract.config_loader import POSTGRES_SCHEMA
+from modules.db.pools import pg_connection
 
-# 全局连接（重用）——对 CLI 用途来说足够简单
-_conn = psycopg2.connect(POSTGRES_URI)
-_conn.autocommit = True
+_PAGE_SIZE = 1000  # execute_values 每条语句的行数
 
 
-def get_cursor():
+@contextmanager
+def get_cursor() -> Iterator:
     """
-    上下文管理器，自动关闭游标。
+    上下文管理器：从连接池借连接，退出时提交并归还。
     用法示例：
         with get_cursor() as cur:
             cur.execute("SELECT 1")
     """
-    return _conn.cursor()
+    with pg_connection() as conn:
+        with conn.cursor() as cur:
+            yield cur
+
+
+@contextmanager
+def _cursor(cur=None) -> Iterator:
+    """复用调用方的游标；没有则新开一个（独立事务）。"""
+    if cur is not None:
+        yield cur
+    else:
+        with get_cursor() as own:
+            yield own
 
 
 # ──────────────────────────────────────────────────────────────
 # Upsert 辅助函数
 # ──────────────────────────────────────────────────────────────
-def _upsert_company(name_norm: str, name_display: str | None) -> int:
+def _upsert_company(name_norm: str, name_display: str | None, cur=None) -> int:
     """
     确保 company_dim 中存在该公司行，并返回 company_id。
     使用 ON CONFLICT (norm_name) 避免重复。
@@ -38,12 +52,12 @@ def _upsert_company(name_norm: str, name_display: str | None) -> int:
         SET display_name = EXCLUDED.display_name
     RETURNING company_id;
     """
-    with get_cursor() as cur:
-        cur.execute(sql, (name_norm, name_display))
-        return cur.fetchone()[0]
+    with _cursor(cur) as c:
+        c.execute(sql, (name_norm, name_display))
+        return c.fetchone()[0]
 
 
-def _upsert_indicator(slug: str, name: str, area: str) -> int:
+def _upsert_indicator(slug: str, name: str, area: str, cur=None) -> int:
     """
     确保 indicator_dim 中存在该指标行，并返回 indicator_id。
     """
@@ -55,12 +69,36 @@ def _upsert_indicator(slug: str, name: str, area: str) -> int:
             thematic_area  = EXCLUDED.thematic_area
     RETURNING indicator_id;
     """
-    with get_cursor() as cur:
-        cur.execute(sql, (slug, name, area))
-        return cur.fetchone()[0]
+    with _cursor(cur) as c:
+        c.execute(sql, (slug, name, area))
+        return c.fetchone()[0]
+
+
+def bulk_upsert_indicators(rows: Iterable[Tuple[str, str, str]], cur=None) -> Dict[str, int]:
+    """
+    一条多行 upsert 解析所有指标 slug → indicator_id。
+    rows: (slug, indicator_name, thematic_area)；同一 slug 只保留第一次出现
+    （ON CONFLICT DO UPDATE 不允许同一语句里两次更新同一行）。
+    """
+    uniq: Dict[str, Tuple[str, str, str]] = {}
+    for slug, name, area in rows:
+        uniq.setdefault(slug, (slug, name, area))
+    if not uniq:
+        return {}
+    tmpl = f"""
+    INSERT INTO {POSTGRES_SCHEMA}.indicator_dim (slug, indicator_name, thematic_area)
+    VALUES %s
+    ON CONFLICT (slug) DO UPDATE
+        SET indicator_name = EXCLUDED.indicator_name,
+            thematic_area  = EXCLUDED.thematic_area
+    RETURNING slug, indicator_id;
+    """
+    with _cursor(cur) as c:
+        res = execute_values(c, tmpl, list(uniq.values()), page_size=_PAGE_SIZE, fetch=True)
+    return {slug: iid for slug, iid in res}
 
 
-def batch_insert_metrics(rows: list[dict]):
+def batch_insert_metrics(rows: list[dict], cur=None):
     """一次性插入多条度量型记录。"""
     if not rows:
         return
@@ -78,11 +116,11 @@ def batch_insert_metrics(rows: list[dict]):
          r.get("page_number"), r.get("source"))
         for r in rows
     ]
-    with get_cursor() as cur:
-        execute_values(cur, tmpl, values, page_size=100)
+    with _cursor(cur) as c:
+        execute_values(c, tmpl, values, page_size=_PAGE_SIZE)
 
 
-def batch_insert_targets(rows: list[dict]):
+def batch_insert_targets(rows: list[dict], cur=None):
     """一次性插入多条承诺/目标型记录。"""
     if not rows:
         return
@@ -101,5 +139,5 @@ def batch_insert_targets(rows: list[dict]):
          r.get("page_number"), r.get("source"))
         for r in rows
     ]
-    with get_cursor() as cur:
-        execute_values(cur, tmpl, values, page_size=100)
+    with _cursor(cur) as c:
+        execute_values(c, tmpl, values, page_size=_PAGE_SIZE)
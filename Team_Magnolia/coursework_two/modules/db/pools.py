@@ -0,0 +1,89 @@
+# modules/db/pools.py
+# -------------------------------------------------------------
+#  进程级共享连接池：MongoDB + PostgreSQL
+#  旧代码每次 ingest / company 查找都新建 MongoClient，
+#  pg_client 在 import 时就连库；这里统一改为懒加载、按进程复用。
+# -------------------------------------------------------------
+from __future__ import annotations
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from pymongo import MongoClient
+from psycopg2.pool import ThreadedConnectionPool
+
+from modules.extract.config_loader import MONGO_URI, MONGO_DB, POSTGRES_URI, database
+
+PG_POOL_MIN = int(database.get("pg_pool_min", 1))
+PG_POOL_MAX = int(database.get("pg_pool_max", 8))
+
+_lock = threading.Lock()
+# 按 pid 缓存：fork 出来的 batch worker 不能复用父进程的 socket
+_mongo_clients: Dict[int, MongoClient] = {}
+_pg_pools: Dict[int, ThreadedConnectionPool] = {}
+
+
+# ──────────────────────────────────────────────────────────────
+# MongoDB
+# ──────────────────────────────────────────────────────────────
+def get_mongo_client() -> MongoClient:
+    """Process-wide MongoClient (pymongo pools sockets internally)."""
+    pid = os.getpid()
+    client = _mongo_clients.get(pid)
+    if client is None:
+        with _lock:
+            client = _mongo_clients.get(pid)
+            if client is None:
+                client = _mongo_clients[pid] = MongoClient(MONGO_URI)
+    return client
+
+
+def get_mongo_db(name: Optional[str] = None):
+    return get_mongo_client()[name or MONGO_DB]
+
+
+# ──────────────────────────────────────────────────────────────
+# PostgreSQL
+# ──────────────────────────────────────────────────────────────
+def get_pg_pool() -> ThreadedConnectionPool:
+    pid = os.getpid()
+    pool = _pg_pools.get(pid)
+    if pool is None:
+        with _lock:
+            pool = _pg_pools.get(pid)
+            if pool is None:
+                pool = _pg_pools[pid] = ThreadedConnectionPool(PG_POOL_MIN, PG_POOL_MAX, POSTGRES_URI)
+    return pool
+
+
+@contextmanager
+def pg_connection() -> Iterator:
+    """
+    借出一个连接；正常退出时 commit，异常时 rollback，最后归还连接池。
+        with pg_connection() as conn, conn.cursor() as cur:
+            cur.execute(...)
+    """
+    pool = get_pg_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn)
+
+
+def close_all() -> None:
+    """Close this process's pools (tests / graceful shutdown)."""
+    pid = os.getpid()
+    with _lock:
+        client = _mongo_clients.pop(pid, None)
+        pool = _pg_pools.pop(pid, None)
+    if client is not None:
+        client.close()
+    if pool is not None:
+        pool.closeall()
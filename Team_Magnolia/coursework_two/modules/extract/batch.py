@@ -2,16 +2,34 @@
 封装单 PDF → 标准化 → 入库，以及批量调度
 """
 from pathlib import Path
-from typing import Optional, Dict, Any, List
-import json, re, time
+from typing import Optional, Dict, Any, List, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import json, os, re, shutil, time
 
-from modules.extract.minio_client   import download_pdf, list_objects
-from modules.extract.extractor      import main as extract_main, refine_extracted_data as refine_extracted
+from modules.extract.minio_client   import download_pdf, list_object_etags
+from modules.extract.checkpoint     import CheckpointLedger, file_sha256
+from modules.extract.docling_pool   import CONVERTER_POOL
+from modules.extract.extractor      import main as extract_main, main_many as extract_many, refine_extracted_data as refine_extracted, LLM_CACHE
 from modules.db.ingest      import ingest_report
 from modules.db.lineage     import record_lineage
-from modules.extract.company_lookup import get_company_id
+from modules.extract.company_lookup import get_company_id, prefetch_companies
 from modules.extract.config_loader  import OUTPUT_DIR, OUTPUT_PDF, OUTPUT_MD, OUTPUT_CSV
 
+CHECKPOINT_FILE = OUTPUT_DIR / "batch_checkpoint.jsonl"
+SCRATCH_DIR     = OUTPUT_DIR / "batch"
+RESULTS_DIR     = OUTPUT_DIR / "batch_results"   # 并行模式下保留的最终 JSON（lineage 指向这里）
+# 并行模式下每个 worker 一次领取的 key 数：这些 PDF 一起送进同一个 Docling converter
+DOCLING_BATCH   = int(os.getenv("DOCLING_BATCH_SIZE", "4"))
+
+
+def _safe_key(key: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", key)
+
+
+def _scratch_dir(key: str) -> Path:
+    """每个 key 独立的临时目录，并行 worker 之间互不覆盖；入库成功后删除。"""
+    return SCRATCH_DIR / _safe_key(key)
+
 
 # ──────────────────────────────────────────────────────────────
 # 小工具：计时器
@@ -24,29 +42,59 @@ class Timer:
 # ──────────────────────────────────────────────────────────────
 # 单文件流水线
 # ──────────────────────────────────────────────────────────────
-def run_single(key: str) -> bool:
+def run_single(key: str, work_dir: Optional[Path] = None) -> bool:
     """
     处理 MinIO 里的一个 PDF（object key）。
     成功返回 True，失败 False（不会抛异常，方便批量循环）。
+    work_dir : 中间文件目录；None → 共享的 OUTPUT_DIR（单进程模式）
     """
+    return _run_single(key, work_dir)[0]
+
+
+def _run_single(
+    key: str, work_dir: Optional[Path] = None, results_dir: Optional[Path] = None
+) -> Tuple[bool, Optional[str]]:
+    """
+    run_single 的实现；额外返回下载 PDF 的 sha256 供 checkpoint 使用。
+    results_dir : work_dir 是临时目录时，最终 JSON 复制到这里，lineage 只记录这一份。
+    """
+    out_dir = Path(work_dir or OUTPUT_DIR)
     try:
-        local_pdf = OUTPUT_DIR / key.replace("/", "_")
-        print(f"\n⏬  [{key}] Downloading → {local_pdf}")
-        pdf_path  = download_pdf(key, local_pdf)
+        pdf_path, sha256 = _download(key, out_dir)
 
         # —— 第一遍抽取 ——
         with Timer() as t1:
-            raw_json = extract_main(str(pdf_path))
+            raw_json = extract_main(str(pdf_path), out_dir)
+        return _finish(key, raw_json, sha256, out_dir, results_dir, t1.elapsed)
+
+    except Exception as e:
+        print(f"💥  [{key}] error: {e}")
+        return False, None
+
+
+def _download(key: str, out_dir: Path) -> Tuple[Path, str]:
+    local_pdf = out_dir / key.replace("/", "_")
+    print(f"\n⏬  [{key}] Downloading → {local_pdf}")
+    pdf_path = download_pdf(key, local_pdf)
+    return pdf_path, file_sha256(pdf_path)
+
+
+def _finish(
+    key: str, raw_json, sha256: str, out_dir: Path,
+    results_dir: Optional[Path], extract_seconds: float,
+) -> Tuple[bool, Optional[str]]:
+    """第一遍抽取之后的步骤：标准化 → 填元数据 → 入库 → lineage。"""
+    try:
         if not raw_json or not Path(raw_json).exists():
             print(f"❌  [{key}] first-pass extraction failed")
-            return False
+            return False, sha256
 
         # —— 第二遍标准化 ——
         with Timer() as t2:
-            final_json = refine_extracted(raw_json, OUTPUT_DIR)
+            final_json = refine_extracted(raw_json, out_dir)
         if not final_json or not Path(final_json).exists():
             print(f"⚠️   [{key}] second-pass produced no data")
-            return False
+            return False, sha256
 
         # —— 填充元数据（company / report_year） ——
         display_name = Path(key).stem
@@ -75,48 +123,160 @@ def run_single(key: str) -> bool:
 
         # —— 入库 & lineage —— 
         ingest_report(Path(final_json), company_id)
-        record_lineage(
-            pdf_src=key,
-            stats={"run_seconds": round(t1.elapsed + t2.elapsed, 2)},
-            outputs={
-                "filtered_pdf": str(OUTPUT_DIR / OUTPUT_PDF),
-                "markdown":     str(OUTPUT_DIR / OUTPUT_MD),
+        if results_dir is not None:
+            Path(results_dir).mkdir(parents=True, exist_ok=True)
+            kept = Path(results_dir) / f"{_safe_key(key)}.json"
+            shutil.copyfile(final_json, kept)
+            outputs = {"final_json": str(kept)}   # 其余中间文件随临时目录删除
+        else:
+            outputs = {
+                "filtered_pdf": str(out_dir / OUTPUT_PDF),
+                "markdown":     str(out_dir / OUTPUT_MD),
                 "raw_json":     str(raw_json),
                 "final_json":   str(final_json),
-                "csv":          str(OUTPUT_DIR / OUTPUT_CSV),
-            },
+                "csv":          str(out_dir / OUTPUT_CSV),
+            }
+        record_lineage(
+            pdf_src=key,
+            stats={"run_seconds": round(extract_seconds + t2.elapsed, 2), "sha256": sha256},
+            outputs=outputs,
             pipeline_version="v0.1.0",
         )
         print(f"✅  [{key}] done")
-        return True
+        return True, sha256
 
     except Exception as e:
         print(f"💥  [{key}] error: {e}")
-        return False
+        return False, None
+
+
+def _init_batch_worker(bypass_cache: bool = False) -> None:
+    """
+    batch 已按 key 占满 CPU，worker 内部的 filter_pdf 不再开子进程池。
+    spawn 模式下 worker 重新 import 模块，主进程里的 `--no-cache` 设置
+    不会被继承，所以显式传进来。
+    """
+    os.environ["PAGE_FILTER_WORKERS"] = "1"
+    LLM_CACHE.bypass = bypass_cache
+    _prefetch_companies()  # 每个 worker 各自预热（spawn 不继承父进程的缓存）
+
+
+def _prefetch_companies() -> None:
+    try:
+        print(f"🏢  Prefetched {prefetch_companies()} companies into cache.")
+    except Exception as e:
+        print(f"⚠️   Company prefetch skipped: {e}")
+
+
+def _batch_worker(keys: List[str]) -> Tuple[List[Tuple[str, bool, Optional[str]]], Tuple[int, int]]:
+    """
+    进程池入口（必须是模块级函数才能被 pickle）：处理一组 key。
+    先逐个下载，再把全部 PDF 交给 `extract_many`（一起走同一个 Docling
+    converter），最后逐个标准化 / 入库。
+    返回每个 key 的 (key, ok, sha256)，以及这一组的 LLM cache 命中/未命中数。
+    """
+    hits, misses = LLM_CACHE.hits, LLM_CACHE.misses
+    results: List[Tuple[str, bool, Optional[str]]] = []
+    runs: Dict[str, Tuple[Path, Path]] = {}
+    shas: Dict[str, str] = {}
+    for key in keys:
+        scratch = _scratch_dir(key)
+        try:
+            pdf_path, shas[key] = _download(key, scratch)
+            runs[key] = (pdf_path, scratch)
+        except Exception as e:
+            print(f"💥  [{key}] error: {e}")
+            results.append((key, False, None))
+
+    if runs:
+        with Timer() as t1:
+            raw = extract_many(runs)
+        for key, (_, scratch) in runs.items():
+            ok, sha256 = _finish(key, raw.get(key), shas[key], scratch, RESULTS_DIR, t1.elapsed / len(runs))
+            if ok:  # 失败时保留，便于排查
+                shutil.rmtree(scratch, ignore_errors=True)
+            results.append((key, ok, sha256))
+    return results, (LLM_CACHE.hits - hits, LLM_CACHE.misses - misses)
+
+
+def _chunks(keys: List[str], size: int) -> List[List[str]]:
+    size = max(1, size)
+    return [keys[i:i + size] for i in range(0, len(keys), size)]
 
 
 # ──────────────────────────────────────────────────────────────
 # 批量调度
 # ──────────────────────────────────────────────────────────────
-def run_batch(prefix: Optional[str] = None, limit: Optional[int] = None):
+def run_batch(
+    prefix: Optional[str] = None,
+    limit: Optional[int] = None,
+    workers: int = 1,
+    resume: bool = True,
+    docling_batch: int = DOCLING_BATCH,
+):
     """
     批量处理整个 MinIO 存储桶（或指定前缀）里的 PDF。
-    prefix : 只处理以该前缀开头的对象（如 "2024/"）
-    limit  : 仅处理前 N 个（调试用）
+    prefix  : 只处理以该前缀开头的对象（如 "2024/"）
+    limit   : 仅处理前 N 个（调试用）
+    workers : 并行进程数；>1 时每个 key 使用独立的临时目录（成功后删除，最终 JSON 留在 RESULTS_DIR）
+    docling_batch : 并行模式下每个 worker 一次领取、一起做 Docling 转换的 key 数
+    resume  : 跳过 checkpoint 里已完成且 etag 未变化的 key
     """
-    # 1. 列举 + 再去重
-    keys: List[str] = sorted(set(list_objects(prefix)), key=str.lower)
+    # 1. 列举（已去重）+ checkpoint 过滤
+    etags: Dict[str, str] = list_object_etags(prefix)
+    keys: List[str] = list(etags)
     if limit:
         keys = keys[:limit]
 
-    print(f"🗂   Total {len(keys)} PDF to process.")
+    ledger = CheckpointLedger(CHECKPOINT_FILE)
+    if resume:
+        todo = [k for k in keys if not ledger.is_done(k, etags.get(k))]
+        if len(todo) < len(keys):
+            print(f"⏭️   {len(keys) - len(todo)} PDF already in checkpoint – skipped.")
+        keys = todo
+
+    print(f"🗂   Total {len(keys)} PDF to process (workers={workers}).")
+    if keys and workers <= 1:  # 并行模式在 _init_batch_worker 里预热
+        _prefetch_companies()
     ok = fail = 0
+    hits = misses = 0  # 并行模式下由各 worker 汇总
 
-    # 2. 顺序处理
-    for k in keys:
-        if run_single(k):
-            ok += 1
-        else:
-            fail += 1
+    # 2. 顺序 / 并行处理；结果统一由主进程写 checkpoint
+    if workers <= 1:
+        for k in keys:
+            success, sha256 = _run_single(k)
+            if success:
+                ok += 1
+                ledger.mark_done(k, etags.get(k), sha256)
+            else:
+                fail += 1
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                                 initargs=(LLM_CACHE.bypass,)) as pool:
+            # 分组不超过平均份额，避免 key 少时只有一两个 worker 在干活
+            size = min(docling_batch, -(-len(keys) // workers)) if keys else 1
+            futures = {pool.submit(_batch_worker, chunk): chunk for chunk in _chunks(keys, size)}
+            for fut in as_completed(futures):
+                chunk = futures[fut]
+                try:
+                    results, (h, m) = fut.result()
+                    hits, misses = hits + h, misses + m
+                except Exception as e:  # worker 进程崩溃等
+                    print(f"💥  [{', '.join(chunk)}] worker error: {e}")
+                    results = [(k, False, None) for k in chunk]
+                for k, success, sha256 in results:
+                    if success:
+                        ok += 1
+                        ledger.mark_done(k, etags.get(k), sha256)
+                    else:
+                        fail += 1
 
     print(f"\n🥳  Batch finished → success={ok}, fail={fail}")
+    if workers <= 1:
+        hits, misses = LLM_CACHE.hits, LLM_CACHE.misses
+    c = LLM_CACHE.stats()
+    print(f"🗄   LLM cache → hits={hits}, misses={misses}, entries={c['entries']}")
+    if workers <= 1:  # 并行模式下每个 worker 进程各自持有 converter
+        d = CONVERTER_POOL.stats()
+        print(f"⏱️   Docling → load={d['load_seconds']}s, convert={d['convert_seconds']}s "
+              f"over {d['documents']} PDF")
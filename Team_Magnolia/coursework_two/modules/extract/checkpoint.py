@@ -0,0 +1,83 @@
+"""
+Batch checkpoint ledger
+───────────────────────────────────────────────────────────────────────────────
+Append-only JSONL，每处理成功一个 MinIO key 写一行：
+
+    {"key": "2024/Apple.pdf", "etag": "...", "sha256": "...", "finished_at": "..."}
+
+每行写完立即 fsync，批处理中途被杀掉也不会丢已完成的记录。
+重跑时 `is_done(key, etag)` 为 True 的对象直接跳过；
+MinIO 上内容变了（etag 不同）则会重新处理。
+"""
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+
+def file_sha256(path: str | Path, chunk: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class CheckpointLedger:
+    """Durable record of completed batch keys."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._done: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._needs_newline = False
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                self._needs_newline = not line.endswith("\n")
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # 最后一行可能是被打断的半行
+                if rec.get("key"):
+                    self._done[rec["key"]] = rec
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+    def get(self, key: str) -> Optional[dict]:
+        return self._done.get(key)
+
+    def is_done(self, key: str, etag: Optional[str] = None) -> bool:
+        rec = self._done.get(key)
+        if rec is None:
+            return False
+        # 没有 etag 可比较时，只要记录存在就算完成
+        return etag is None or rec.get("etag") in (None, etag)
+
+    def mark_done(self, key: str, etag: Optional[str] = None, sha256: Optional[str] = None) -> None:
+        rec = {
+            "key": key,
+            "etag": etag,
+            "sha256": sha256,
+            "finished_at": datetime.datetime.utcnow().isoformat() + "Z",
+        }
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                if self._needs_newline:  # 上次被打断的半行单独成行
+                    f.write("\n")
+                    self._needs_newline = False
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._done[key] = rec
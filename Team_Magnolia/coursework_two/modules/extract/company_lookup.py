@@ -1,11 +1,60 @@
 # modules/company_lookup.py
 
+from collections import OrderedDict
 from typing import Optional
 import re
-from pymongo import MongoClient, ReturnDocument
+import threading
+from pymongo import ReturnDocument
 from bson.objectid import ObjectId
 
-from modules.extract.config_loader import MONGO_URI, MONGO_DB
+from modules.db.pools import get_mongo_db
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+
+# ──────────────────────────────────────────────────────────────
+# 进程级 LRU：norm_name → ObjectId
+# dim_companies 里 norm_name 唯一且 _id 一经插入不再变化（本项目只通过
+# get_company_id 的 upsert 写入该集合），所以只缓存 Mongo 返回的结果
+# （不缓存“未找到”），新公司插入不会让已有条目失效。
+# 集合在外部被重建时，重新调用 prefetch_companies() 即可刷新。
+# ──────────────────────────────────────────────────────────────
+CACHE_MAX = 4096
+
+_cache: "OrderedDict[str, ObjectId]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cache_get(norm: str) -> Optional[ObjectId]:
+    with _cache_lock:
+        oid = _cache.get(norm)
+        if oid is not None:
+            _cache.move_to_end(norm)
+        return oid
+
+
+def _cache_put(norm: str, oid: ObjectId) -> None:
+    with _cache_lock:
+        _cache[norm] = oid
+        _cache.move_to_end(norm)
+        while len(_cache) > CACHE_MAX:
+            _cache.popitem(last=False)
+
+
+def prefetch_companies() -> int:
+    """
+    批处理开始时（每个 worker 进程各一次）清空缓存并一次性加载
+    dim_companies（norm_name → _id），返回加载条数。超过 CACHE_MAX 的部分不加载。
+    """
+    coll = get_mongo_db()["dim_companies"]
+    with _cache_lock:
+        _cache.clear()
+    n = 0
+    for doc in coll.find({"norm_name": {"$exists": True}}, {"norm_name": 1}).limit(CACHE_MAX):
+        _cache_put(doc["norm_name"], doc["_id"])
+        n += 1
+    return n
+
 
 def _normalize_name(name: str) -> str:
     """
@@ -16,25 +65,28 @@ def _normalize_name(name: str) -> str:
     # 去首尾、转小写
     norm = name.strip().lower()
     # 删除所有非字母数字和空白字符（剔除标点）
-    norm = re.sub(r"[^\w\s]", "", norm)
+    norm = _PUNCT_RE.sub("", norm)
     # 合并多个空格
-    norm = re.sub(r"\s+", " ", norm)
+    norm = _SPACE_RE.sub(" ", norm)
     return norm
 
 def get_company_id(name: str) -> Optional[ObjectId]:
     """
     根据规范化后的名称在 dim_companies 中查找或新建一条记录，
     返回其 _id；若传入 name 为空或全是空白，则返回 None 并跳过。
+    命中进程级 LRU 缓存时不访问 MongoDB。
     """
     norm = _normalize_name(name or "")
     if not norm:
         # 名称为空或全是空白，跳过
         return None
 
-    # 直接用 MongoClient 连接
-    client = MongoClient(MONGO_URI)
-    db = client[MONGO_DB]
-    coll = db["dim_companies"]
+    cached = _cache_get(norm)
+    if cached is not None:
+        return cached
+
+    # 进程级共享的 MongoClient（连接池）
+    coll = get_mongo_db()["dim_companies"]
 
     try:
         # 原子 upsert：若已有 norm_name，则直接返回；否则插入 name 与 norm_name
@@ -51,4 +103,7 @@ def get_company_id(name: str) -> Optional[ObjectId]:
             # 如果仍然找不到，就让异常向上抛出，方便排查
             raise
 
-    return doc.get("_id")
+    oid = doc.get("_id")
+    if oid is not None:
+        _cache_put(norm, oid)
+    return oid
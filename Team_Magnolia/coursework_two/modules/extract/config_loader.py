@@ -66,6 +66,21 @@ GROQ_API_KEY = os.getenv(
 GROQ_BASE_URL = _cfg.get("groq_base_url", "https://api.groq.com/openai/v1")
 GROQ_MODEL = _cfg.get("groq_model", "meta-llama/llama-4-scout-17b-16e-instruct")
 
+_llm = _cfg.get("llm", {}) or {}
+LLM_MAX_WORKERS = int(os.getenv("LLM_MAX_WORKERS", _llm.get("max_workers", 1)))
+LLM_RATE_LIMITS: Dict[str, Dict[str, float]] = _llm.get("rate_limits", {}) or {}
+
+_llm_cache = _cfg.get("llm_cache", {}) or {}
+LLM_CACHE_ENABLED = bool(_llm_cache.get("enabled", True))
+LLM_CACHE_PATH = BASE_DIR / _llm_cache.get("path", "output/llm_cache.sqlite")
+LLM_CACHE_MAX_BYTES = int(float(_llm_cache.get("max_mb", 512)) * 1024 * 1024)
+LLM_CACHE_BYPASS = os.getenv("LLM_CACHE_BYPASS", str(_llm_cache.get("bypass", False))).lower() in ("1", "true", "yes")
+
+_page_filter = _cfg.get("page_filter", {}) or {}
+PAGE_FILTER_WORKERS = int(_page_filter.get("workers", 1))
+PAGE_FILTER_MIN_PAGES_PARALLEL = int(_page_filter.get("min_pages_parallel", 64))
+PAGE_FILTER_CACHE_DIR = BASE_DIR / _page_filter["cache_dir"] if _page_filter.get("cache_dir") else None
+
 # ──────────────────────────────────────────────────────────────────────────────
 # 5)  Docling page-break
 # ──────────────────────────────────────────────────────────────────────────────
@@ -0,0 +1,112 @@
+"""
+Warm Docling converter pool
+───────────────────────────────────────────────────────────────────────────────
+`DocumentConverter` 第一次转换时才加载 OCR / TableFormer 模型，单个 PDF
+要花好几秒。旧版 `parse_with_docling()` 每次都新建 converter → 每份报告
+都重新加载模型。
+
+这里每个进程（= 每个 batch worker）保留一个按 pipeline options 区分的
+converter 缓存，首次使用时初始化，之后复用；并把「模型加载」与「转换」
+分开计时。`convert_many` 把一批过滤后的 PDF 依次送进同一个 converter。
+缓存记录创建它的 pid：fork 出的 worker 不会复用父进程的
+converter（模型线程 / 句柄不能跨进程共享），而是重新加载自己的一份。
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Tuple
+
+from docling.document_converter import DocumentConverter, PdfFormatOption
+from docling.datamodel.base_models import ConversionStatus, InputFormat
+from docling.datamodel.pipeline_options import PdfPipelineOptions
+
+
+class ConverterPool:
+    """Process-local cache of initialised DocumentConverters keyed by options."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._pid = os.getpid()
+        self._converters: Dict[str, DocumentConverter] = {}
+        self.load_seconds = 0.0
+        self.convert_seconds = 0.0
+        self.documents = 0
+
+    def _check_owner(self) -> None:
+        """Drop converters (and stats) inherited from the parent after a fork."""
+        if self._pid != os.getpid():
+            self._reset()
+
+    @staticmethod
+    def _key(options: PdfPipelineOptions) -> str:
+        return options.model_dump_json()
+
+    def get(self, options: PdfPipelineOptions) -> DocumentConverter:
+        """Return a warm converter for *options*, loading models on first use."""
+        key = self._key(options)
+        with self._lock:
+            self._check_owner()
+            conv = self._converters.get(key)
+            if conv is None:
+                t0 = time.perf_counter()
+                conv = DocumentConverter({InputFormat.PDF: PdfFormatOption(pipeline_options=options)})
+                conv.initialize_pipeline(InputFormat.PDF)  # 提前加载 OCR / TableFormer
+                elapsed = time.perf_counter() - t0
+                self.load_seconds += elapsed
+                self._converters[key] = conv
+                print(f"[Timing] Docling model load {elapsed:.1f}s")
+            return conv
+
+    def convert(self, options: PdfPipelineOptions, pdf: str | Path):
+        """Convert one PDF; returns the DoclingDocument."""
+        conv = self.get(options)
+        t0 = time.perf_counter()
+        doc = conv.convert(str(pdf)).document
+        elapsed = time.perf_counter() - t0
+        self._record(elapsed)
+        print(f"[Timing] Docling convert {Path(pdf).name}: {elapsed:.1f}s")
+        return doc
+
+    def convert_many(
+        self, options: PdfPipelineOptions, pdfs: Iterable[str | Path]
+    ) -> Iterator[Tuple[Path, object]]:
+        """
+        Stream several PDFs through the same converter.
+        Yields (pdf_path, DoclingDocument | None); failed inputs yield None.
+        """
+        conv = self.get(options)
+        t0 = time.perf_counter()
+        for res in conv.convert_all([str(p) for p in pdfs], raises_on_error=False):
+            elapsed = time.perf_counter() - t0
+            self._record(elapsed)
+            src = Path(res.input.file)
+            print(f"[Timing] Docling convert {src.name}: {elapsed:.1f}s ({res.status})")
+            ok = res.status in (ConversionStatus.SUCCESS, ConversionStatus.PARTIAL_SUCCESS)
+            yield src, res.document if ok else None
+            t0 = time.perf_counter()
+
+    def _record(self, elapsed: float) -> None:
+        with self._lock:
+            self._check_owner()
+            self.convert_seconds += elapsed
+            self.documents += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._check_owner()
+            return {
+                "converters": len(self._converters),
+                "documents": self.documents,
+                "load_seconds": round(self.load_seconds, 2),
+                "convert_seconds": round(self.convert_seconds, 2),
+            }
+
+
+# one pool per process – batch workers each get their own warm converter
+CONVERTER_POOL = ConverterPool()
@@ -23,14 +23,13 @@ from __future__ import annotations
 
 import json, os, re, time, json5
 from pathlib import Path
-from collections import defaultdict
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Iterable, List, Dict, Any, Optional, Tuple, TypeVar
 
 import fitz                       # PyMuPDF
 import torch
 from openai import OpenAI
-from docling.document_converter import DocumentConverter, PdfFormatOption
-from docling.datamodel.base_models import InputFormat
 from docling.datamodel.pipeline_options import (
     PdfPipelineOptions,
     AcceleratorOptions,
@@ -44,11 +43,30 @@ from modules.extract.config_loader import (
     OUTPUT_DIR, PDF_PATH,
     OUTPUT_PDF, OUTPUT_MD, OUTPUT_JSON,
     GROQ_API_KEY, GROQ_BASE_URL, GROQ_MODEL,
+    LLM_MAX_WORKERS, LLM_RATE_LIMITS,
+    LLM_CACHE_ENABLED, LLM_CACHE_PATH, LLM_CACHE_MAX_BYTES, LLM_CACHE_BYPASS,
     PAGE_BREAK, YEAR_RE, THEMES,
 )
 from modules.extract.prompts import THEME_PROMPTS, REFINEMENT_PROMPT
+from modules.extract.page_index import PageIndex, rough_tokens
+from modules.extract.rate_limit import ModelRateLimiter
+from modules.extract.llm_cache import LLMCache
+from modules.extract.docling_pool import CONVERTER_POOL
+from modules.extract.page_classifier import classify_pdf, match_theme as _match_theme
 
 FALLBACK_MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
+# shared by every worker thread so per-model Groq quotas hold across themes
+RATE_LIMITER = ModelRateLimiter(LLM_RATE_LIMITS)
+# persistent response cache: reruns over unchanged PDFs make no API calls
+LLM_CACHE = LLMCache(
+    LLM_CACHE_PATH,
+    max_bytes=LLM_CACHE_MAX_BYTES,
+    enabled=LLM_CACHE_ENABLED,
+    bypass=LLM_CACHE_BYPASS,
+)
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
 # ──────────────────────────────────────────────────────────────────────────
 # 0. Utilities
 # ──────────────────────────────────────────────────────────────────────────
@@ -62,30 +80,21 @@ def _accelerator():
     return AcceleratorOptions(device=AcceleratorDevice.CPU, num_threads=4)
 
 
-def _match_theme(text: str, cfg: dict) -> bool:
-    """Return *True* if page text matches the theme config."""
-    goal_hit = cfg.get("goal_kw_re") and all(p.search(text) for p in cfg["goal_kw_re"])
-    if not goal_hit and cfg.get("unit_re") and not cfg["unit_re"].search(text):
-        return False
+def _loads_json(raw: str):
+    """Strict JSON first, then lenient JSON5 (raises ValueError on failure)."""
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return json5.loads(raw)
 
-    yrs = YEAR_RE.findall(text)
-    if cfg.get("require_multiple_year_occurrences", False):
-        if len(yrs) < 2:
-            return False
-    elif not yrs:
-        return False
 
-    if cfg.get("require_all_keywords", False):
-        if not all(p.search(text) for p in cfg["keyword_re"]):
-            return False
-    else:
-        hits = len({p.pattern for p in cfg["keyword_re"] if p.search(text)})
-        if hits < cfg.get("min_keyword_hits", 1):
-            return False
-
-    if cfg.get("extra_re") and not any(p.search(text) for p in cfg["extra_re"]):
-        return False
-    return True
+def _map_concurrent(fn: Callable[[_T], _R], items: List[_T], max_workers: Optional[int] = None) -> List[_R]:
+    """Map *fn* over *items* on a bounded thread pool; results keep input order."""
+    workers = max_workers or LLM_MAX_WORKERS
+    if workers <= 1 or len(items) <= 1:
+        return [fn(it) for it in items]
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as pool:
+        return list(pool.map(fn, items))
 
 
 # ──────────────────────────────────────────────────────────────────────────
@@ -93,18 +102,12 @@ def _match_theme(text: str, cfg: dict) -> bool:
 # ──────────────────────────────────────────────────────────────────────────
 
 def filter_pdf(src: str | Path, dst: str | Path):
-    selected, flags, labels = set(), defaultdict(list), {}
-    with fitz.open(str(src)) as doc:
-        for idx, pg in enumerate(doc):
-            label_txt = pg.get_label()
-            m = re.search(r"\d+", label_txt or "")
-            labels[idx] = int(m.group()) if m else idx + 1
-            text = pg.get_text("text") or ""
-            for theme, cfg in THEMES.items():
-                if _match_theme(text, cfg):
-                    selected.add(idx)
-                    flags[idx].append(theme)
+    # 每页的主题命中由 page_classifier 一次性算出（组合 regex / 并行 / 按哈希缓存）
+    vectors, labels = classify_pdf(src)
+    flags = {i: list(themes) for i, themes in enumerate(vectors) if themes}
+    selected = set(flags)
 
+    with fitz.open(str(src)) as doc:
         # fallback – use full PDF
         if not selected:
             print("[WARN] No page matched regex filters – using entire PDF")
@@ -119,24 +122,26 @@ def filter_pdf(src: str | Path, dst: str | Path):
         Path(dst).parent.mkdir(parents=True, exist_ok=True)
         new.save(str(dst), garbage=4, deflate=True)
         print(f"[OK] Filtered PDF → {dst}  ({len(selected)} pages)")
-    return dict(flags), sorted(selected), labels
+    return flags, sorted(selected), labels
 
 
 # ──────────────────────────────────────────────────────────────────────────
 # 2. PDF → Markdown (Docling + OCR)
 # ──────────────────────────────────────────────────────────────────────────
 
-def parse_with_docling(pdf: Path, orig_idx: List[int], labels: Dict[int, int], out_md: Path):
-    pipeline = PdfPipelineOptions(
+@lru_cache(maxsize=None)
+def _pdf_pipeline_options() -> PdfPipelineOptions:
+    """Pipeline options shared by every conversion (also the converter-pool key)."""
+    return PdfPipelineOptions(
         do_ocr=True,
         ocr_languages=["eng"],
         do_table_structure=True,
         accelerator_options=_accelerator(),
         table_structure_options=TableStructureOptions(do_cell_matching=True, mode=TableFormerMode.FAST),
     )
-    converter = DocumentConverter({InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline)})
-    print("[Info] Running Docling + OCR …")
-    doc = converter.convert(str(pdf)).document
+
+
+def _write_markdown(doc, orig_idx: List[int], labels: Dict[int, int], out_md: Path) -> Path:
     md_pages = doc.export_to_markdown(page_break_placeholder=PAGE_BREAK).split(PAGE_BREAK)
 
     def _mk(i):  # assemble with true page‑number
@@ -154,31 +159,48 @@ def parse_with_docling(pdf: Path, orig_idx: List[int], labels: Dict[int, int], o
     return out_md
 
 
+def parse_with_docling(pdf: Path, orig_idx: List[int], labels: Dict[int, int], out_md: Path):
+    print("[Info] Running Docling + OCR …")
+    doc = CONVERTER_POOL.convert(_pdf_pipeline_options(), pdf)
+    return _write_markdown(doc, orig_idx, labels, out_md)
+
+
+def parse_many_with_docling(
+    jobs: Iterable[Tuple[Path, List[int], Dict[int, int], Path]],
+) -> Dict[Path, Optional[Path]]:
+    """
+    Batch variant of `parse_with_docling`: stream several filtered PDFs
+    through one warm converter. `jobs` = (pdf, orig_idx, labels, out_md).
+    Returns pdf → markdown path (None when conversion failed).
+    """
+    by_pdf = {Path(j[0]).resolve(): j for j in jobs}
+    out: Dict[Path, Optional[Path]] = {}
+    print(f"[Info] Running Docling + OCR on {len(by_pdf)} PDFs …")
+    for src, doc in CONVERTER_POOL.convert_many(_pdf_pipeline_options(), list(by_pdf)):
+        pdf, orig_idx, labels, out_md = by_pdf[src.resolve()]
+        out[Path(pdf)] = _write_markdown(doc, orig_idx, labels, out_md) if doc is not None else None
+    return out
+
+
 # ──────────────────────────────────────────────────────────────────────────
 # 3. First‑pass LLM extraction
 # ──────────────────────────────────────────────────────────────────────────
 
 def _rough_tokens(txt: str) -> int:
-    return len(txt) // 4 or 1
-
-def _batches(pgs: List[int], md: str, max_toks: int = 10_000):
-    cur, tok, out = [], 0, []
-    for p in pgs:
-        seg = grab_pages(md, [p])
-        tks = _rough_tokens(seg)
-        if cur and tok + tks > max_toks:
-            out.append(cur)
-            cur, tok = [], 0
-        cur.append(p); tok += tks
-    if cur:
-        out.append(cur)
-    return out
+    return rough_tokens(txt)
+
+
+def _as_index(md: str | PageIndex) -> PageIndex:
+    return md if isinstance(md, PageIndex) else PageIndex.from_markdown(md)
+
+
+def _batches(pgs: List[int], md: str | PageIndex, max_toks: int = 10_000):
+    """Pack pages into token-bounded batches (index built once, O(pages))."""
+    return _as_index(md).batches(pgs, max_toks)
 
 
-def grab_pages(md: str, pages: List[int]) -> str:
-    parts = re.split(r"(?:^|\n\n)--- PAGE (\d+) ---\n\n", md)
-    pg_map = {int(parts[i]): parts[i + 1] for i in range(1, len(parts), 2)}
-    return "\n\n".join(f"--- PAGE {p} ---\n\n{pg_map.get(p, '')}" for p in pages)
+def grab_pages(md: str | PageIndex, pages: List[int]) -> str:
+    return _as_index(md).grab(pages)
 
 
 def llm_extract(client: OpenAI, text: str, prompt: str, max_retry: int = 3):
@@ -189,11 +211,20 @@ def llm_extract(client: OpenAI, text: str, prompt: str, max_retry: int = 3):
         print("Skipping LLM call: Input text is empty.")
         return {}
 
+    model_chain = (GROQ_MODEL, FALLBACK_MODEL)
+    cached = LLM_CACHE.get(model_chain, prompt, text)
+    if cached is not None:
+        try:
+            return _loads_json(cached)
+        except ValueError:
+            print("[WARN] cached response is not valid JSON – calling model")
+
     # 尝试顺序：先主模型，再备选模型
-    for model_name in (GROQ_MODEL, FALLBACK_MODEL):
+    for model_name in model_chain:
         for attempt in range(1, max_retry + 1):
             try:
                 print(f"→ Calling model={model_name} (attempt {attempt}/{max_retry}), text len={len(text)}")
+                RATE_LIMITER.acquire(model_name, rough_tokens(prompt + text))
                 resp = client.chat.completions.create(
                     model=model_name,
                     messages=[{"role": "system", "content": prompt},
@@ -202,11 +233,9 @@ def llm_extract(client: OpenAI, text: str, prompt: str, max_retry: int = 3):
                     response_format={"type": "json_object"},
                 )
                 raw = resp.choices[0].message.content
-                # 解析 JSON
-                try:
-                    return json.loads(raw)
-                except json.JSONDecodeError:
-                    return json5.loads(raw)
+                parsed = _loads_json(raw)
+                LLM_CACHE.put(model_name, prompt, text, raw)
+                return parsed
             except Exception as e:
                 code = getattr(e, 'status_code', None) or getattr(e, 'code', None)
                 msg = getattr(e, 'message', str(e))
@@ -222,17 +251,33 @@ def llm_extract(client: OpenAI, text: str, prompt: str, max_retry: int = 3):
     
 
 
-def extract_md(md: str, theme_pages: Dict[str, List[int]]) -> Dict[str, Any]:
+def extract_md(
+    md: str | PageIndex,
+    theme_pages: Dict[str, List[int]],
+    max_workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Run first-pass extraction for every (theme, page batch).
+    Batches are sent concurrently (`max_workers`, default `llm.max_workers`),
+    but merged in theme → batch order so the output matches the serial run.
+    """
     cli = OpenAI(api_key=GROQ_API_KEY, base_url=GROQ_BASE_URL)
+    index = _as_index(md)  # parse page markers once for every theme / batch
+    jobs = [
+        (theme, index.grab(batch))
+        for theme, pages in theme_pages.items()
+        for batch in index.batches(pages)
+    ]
+    chunks = _map_concurrent(
+        lambda job: llm_extract(cli, job[1], THEME_PROMPTS[job[0]]), jobs, max_workers
+    )
+
     out: Dict[str, Any] = {}
-    for theme, pages in theme_pages.items():
-        for batch in _batches(pages, md):
-            seg = grab_pages(md, batch)
-            chunk = llm_extract(cli, seg, THEME_PROMPTS[theme])
-            if chunk:
-                out.setdefault(theme, {"reported_indicators": [], "commitments": []})
-                for k in ("reported_indicators", "commitments"):
-                    out[theme][k].extend(chunk.get(k, []))
+    for (theme, _), chunk in zip(jobs, chunks):
+        if chunk:
+            out.setdefault(theme, {"reported_indicators": [], "commitments": []})
+            for k in ("reported_indicators", "commitments"):
+                out[theme][k].extend(chunk.get(k, []))
     return out
 
 
@@ -260,9 +305,17 @@ def _refine_theme(
 
     payload = json.dumps({theme: rows}, ensure_ascii=False)
 
+    cached = LLM_CACHE.get(model_chain, REFINEMENT_PROMPT, payload)
+    if cached is not None:
+        try:
+            return _loads_json(cached)[theme]
+        except (ValueError, KeyError):
+            print(f"[WARN] cached refinement for {theme} unusable – calling model")
+
     for model in model_chain:
         for attempt in range(1, retry + 1):
             try:
+                RATE_LIMITER.acquire(model, rough_tokens(REFINEMENT_PROMPT + payload))
                 resp = cli.chat.completions.create(
                     model=model,
                     messages=[
@@ -274,12 +327,10 @@ def _refine_theme(
                 )
                 raw = resp.choices[0].message.content
 
-                # ── 严格解析 ─────────────────────────
-                try:
-                    return json.loads(raw)[theme]
-                except json.JSONDecodeError:
-                    # fallback: 宽松 JSON5 解析
-                    return json5.loads(raw)[theme]
+                # ── 严格解析，失败再用宽松 JSON5 ────────
+                refined = _loads_json(raw)[theme]
+                LLM_CACHE.put(model, REFINEMENT_PROMPT, payload, raw)
+                return refined
 
             except Exception as e:
                 wait = 2 ** (attempt - 1)
@@ -300,21 +351,26 @@ def _refine_theme(
 # 5. Second‑pass refinement – public
 # ──────────────────────────────────────────────────────────────────────────
 
-def refine_extracted(raw_json: Path, out_dir: Path) -> Path | None:
+def refine_extracted(raw_json: Path, out_dir: Path, max_workers: Optional[int] = None) -> Path | None:
     cli = OpenAI(api_key=GROQ_API_KEY, base_url=GROQ_BASE_URL)
     raw = json.loads(raw_json.read_text("utf-8"))
     if not any(raw.values()):
         print("[WARN] raw JSON empty → skip refinement")
         return None
 
-    final: Dict[str, List[Dict[str, Any]]] = {}
-    for theme, rows in raw.items():
-        if not rows:
-            continue
+    def _one(item):
+        theme, rows = item
         try:
-            final[theme] = _refine_theme(cli, theme, rows)
+            return _refine_theme(cli, theme, rows)
         except RuntimeError as e:
             print(f"[WARN] {e} – theme discarded")
+            return None
+
+    todo = [(theme, rows) for theme, rows in raw.items() if rows]
+    final: Dict[str, List[Dict[str, Any]]] = {}
+    for (theme, _), refined in zip(todo, _map_concurrent(_one, todo, max_workers)):
+        if refined is not None:
+            final[theme] = refined
 
     if not final:
         print("[WARN] all themes failed → no output")
@@ -329,12 +385,12 @@ def refine_extracted(raw_json: Path, out_dir: Path) -> Path | None:
 # 6. Orchestrator (called from Main.py)
 # ──────────────────────────────────────────────────────────────────────────
 
-def main(pdf_path: str | Path | None = None):
-    """End‑to‑end run. Return path to extracted_data.json"""
+def _prepare(pdf_path: str | Path | None, out_dir: str | Path | None) -> Dict[str, Any]:
+    """Filter pages and map themes → pages; everything `main` needs before Docling."""
     pdf = Path(pdf_path or PDF_PATH)
     pdf.exists() or (_ := (_ for _ in ()).throw(FileNotFoundError(pdf)))
 
-    OUT = Path(OUTPUT_DIR); OUT.mkdir(exist_ok=True)
+    OUT = Path(out_dir or OUTPUT_DIR); OUT.mkdir(parents=True, exist_ok=True)
     f_pdf, f_md, f_raw = OUT / OUTPUT_PDF, OUT / OUTPUT_MD, OUT / OUTPUT_JSON
 
     flags, sel_idx, labels = filter_pdf(pdf, f_pdf)
@@ -347,16 +403,65 @@ def main(pdf_path: str | Path | None = None):
         all_pg = [labels.get(i, i + 1) for i in sel_idx]
         theme_pg = {t: all_pg for t in THEMES}
 
-    md_path = parse_with_docling(f_pdf, sel_idx, labels, f_md)
-    if not md_path:
-        return None
+    return {"pdf": f_pdf, "orig_idx": sel_idx, "labels": labels, "md": f_md,
+            "raw": f_raw, "theme_pages": theme_pg}
+
 
-    md_txt = md_path.read_text("utf-8")
-    raw_dict = extract_md(md_txt, theme_pg)
+def _extract_from_markdown(job: Dict[str, Any], md_path: Path) -> Path:
+    md_index = PageIndex.from_markdown(md_path.read_text("utf-8"))
+    raw_dict = extract_md(md_index, job["theme_pages"])
+    f_raw = job["raw"]
     f_raw.write_text(json.dumps(raw_dict, indent=2, ensure_ascii=False))
     print(f"[OK] raw JSON → {f_raw}")
     return f_raw
 
+
+def main(pdf_path: str | Path | None = None, out_dir: str | Path | None = None):
+    """
+    End‑to‑end run. Return path to extracted_data.json
+
+    `out_dir` defaults to OUTPUT_DIR; batch workers pass a per-key scratch
+    directory so parallel runs never share the intermediate files.
+    """
+    job = _prepare(pdf_path, out_dir)
+    md_path = parse_with_docling(job["pdf"], job["orig_idx"], job["labels"], job["md"])
+    if not md_path:
+        return None
+    return _extract_from_markdown(job, md_path)
+
+
+def main_many(runs: Dict[str, Tuple[str | Path, str | Path]]) -> Dict[str, Optional[Path]]:
+    """
+    Batch variant of `main` for several PDFs: `runs` = name → (pdf_path, out_dir),
+    each with its own out_dir. Every PDF is filtered first, then all filtered PDFs
+    go through Docling together (`parse_many_with_docling`, one warm converter),
+    then first-pass extraction runs per PDF.
+    Returns name → raw JSON path (None when any stage failed for that PDF).
+    """
+    out: Dict[str, Optional[Path]] = {name: None for name in runs}
+    jobs: Dict[str, Dict[str, Any]] = {}
+    for name, (pdf_path, out_dir) in runs.items():
+        try:
+            jobs[name] = _prepare(pdf_path, out_dir)
+        except Exception as e:
+            print(f"[ERR] {name}: page filtering failed: {e}")
+    if not jobs:
+        return out
+
+    md_paths = parse_many_with_docling(
+        (j["pdf"], j["orig_idx"], j["labels"], j["md"]) for j in jobs.values()
+    )
+    for name, job in jobs.items():
+        md_path = md_paths.get(Path(job["pdf"]))
+        if not md_path:
+            print(f"[ERR] {name}: Docling conversion failed")
+            continue
+        try:
+            out[name] = _extract_from_markdown(job, md_path)
+        except Exception as e:
+            print(f"[ERR] {name}: first-pass extraction failed: {e}")
+    return out
+
 # When run standalone --------------------------------------------------------
 if __name__ == "__main__":
     import argparse
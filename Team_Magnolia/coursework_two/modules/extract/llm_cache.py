@@ -0,0 +1,136 @@
+"""
+Content-addressed LLM response cache (SQLite)
+───────────────────────────────────────────────────────────────────────────────
+Key = sha256(model ‖ system prompt ‖ user input)，值 = 模型原始返回文本。
+同一 PDF 重跑（`run_single` 崩溃后重试、`run_batch` 重跑）时直接命中，
+不再调用 Groq。
+
+* 按总字节数做 LRU 淘汰（`max_bytes`）
+* `hits` / `misses` 计数，便于在批处理结束时打印
+* `bypass=True` 跳过读取（仍写入新结果），`enabled=False` 完全关闭
+"""
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Sequence
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key        TEXT PRIMARY KEY,
+    model      TEXT NOT NULL,
+    response   TEXT NOT NULL,
+    size       INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used);
+"""
+
+
+def cache_key(model: str, system_prompt: str, user_input: str) -> str:
+    h = hashlib.sha256()
+    for part in (model, system_prompt, user_input):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")  # 分隔符，避免拼接歧义
+    return h.hexdigest()
+
+
+class LLMCache:
+    """Thread-safe on-disk cache shared by the extractor's worker threads."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_bytes: int = 512 * 1024 * 1024,
+        enabled: bool = True,
+        bypass: bool = False,
+    ):
+        self.path = Path(path)
+        self.max_bytes = int(max_bytes)
+        self.enabled = enabled
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    # ── connection ───────────────────────────────────────────────
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # timeout: 并行 batch 的多个进程共用同一个库文件
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ── public API ───────────────────────────────────────────────
+    def get(
+        self, models: str | Sequence[str], system_prompt: str, user_input: str
+    ) -> Optional[str]:
+        """
+        Return the cached raw response, or None on miss / bypass.
+        *models* may be a fallback chain: the first model with a cached
+        answer wins, and the lookup counts as a single hit or miss.
+        """
+        if not self.enabled or self.bypass:
+            return None
+        chain = [models] if isinstance(models, str) else list(models)
+        with self._lock:
+            db = self._db()
+            for model in chain:
+                key = cache_key(model, system_prompt, user_input)
+                row = db.execute("SELECT response FROM llm_cache WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    db.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+                    db.commit()
+                    self.hits += 1
+                    return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, model: str, system_prompt: str, user_input: str, response: str) -> None:
+        if not self.enabled:
+            return
+        key = cache_key(model, system_prompt, user_input)
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, response, size, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, len(response.encode("utf-8")), now, now),
+            )
+            self._evict(db)
+            db.commit()
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        """Drop least-recently-used rows until total size ≤ max_bytes."""
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in db.execute(
+            "SELECT key, size FROM llm_cache ORDER BY last_used ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            total -= size
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = (0, 0)
+            if self.enabled:
+                entries, size = self._db().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+                ).fetchone()
+            return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
@@ -3,9 +3,10 @@ MinIO helper
 ────────────────────────────────────────────────────────────────
 • download_pdf(object_name, dest)     单文件下载
 • list_objects(prefix=None)           批量列举
+• list_object_etags(prefix=None)      批量列举 + etag（断点续跑用）
 """
 from pathlib import Path
-from typing import List, Optional, Set   # ← 新增 Set
+from typing import Dict, List, Optional
 
 from minio import Minio
 from minio.error import S3Error
@@ -46,19 +47,14 @@ def download_pdf(object_name: str, dest: Path) -> Path:
 # ──────────────────────────────────────────────────────────────
 # 2) 批量列举（改进：递归 + 去重 + 只取 PDF）
 # ──────────────────────────────────────────────────────────────
-def list_objects(prefix: Optional[str] = None) -> List[str]:
+def list_object_etags(prefix: Optional[str] = None) -> Dict[str, str]:
     """
-    列举 bucket 中的 PDF 对象 key（递归子目录，自动去重）。
-
-    Parameters
-    ----------
-    prefix : str | None
-        仅返回以该前缀开头的对象；None → 列举整个桶。
+    列举 bucket 中的 PDF 对象（递归子目录，自动去重），同时返回 etag。
 
     Returns
     -------
-    list[str]
-        按字母序排序、不重复的 PDF key 列表
+    dict[str, str]
+        key → etag（按 key 字母序插入）；出错时返回空 dict
     """
     try:
         it = _client.list_objects(
@@ -67,18 +63,32 @@ def list_objects(prefix: Optional[str] = None) -> List[str]:
             recursive=True,           # 递归列举
         )
 
-        seen: Set[str] = set()
-        keys: List[str] = []
+        found: Dict[str, str] = {}
         for obj in it:
             key = obj.object_name.strip()
             if not key.lower().endswith(".pdf"):
                 continue
-            if key in seen:           # 处理 MinIO 可能返回的重复项
-                continue
-            seen.add(key)
-            keys.append(key)
+            # 处理 MinIO 可能返回的重复项：保留第一次出现
+            found.setdefault(key, (obj.etag or "").strip('"'))
 
-        return sorted(keys, key=str.lower)
+        return {k: found[k] for k in sorted(found, key=str.lower)}
     except S3Error as e:
         print(f"[ERROR] MinIO list_objects failed: {e}")
-        return []
+        return {}
+
+
+def list_objects(prefix: Optional[str] = None) -> List[str]:
+    """
+    列举 bucket 中的 PDF 对象 key（递归子目录，自动去重）。
+
+    Parameters
+    ----------
+    prefix : str | None
+        仅返回以该前缀开头的对象；None → 列举整个桶。
+
+    Returns
+    -------
+    list[str]
+        按字母序排序、不重复的 PDF key 列表
+    """
+    return list(list_object_etags(prefix))
@@ -0,0 +1,233 @@
+"""
+Page-level theme classifier for `filter_pdf`
+───────────────────────────────────────────────────────────────────────────────
+旧版对每一页、每个主题都把 unit / keyword / goal / extra 正则各跑一遍，
+YEAR_RE.findall 也按主题重复执行 → 每页 themes × patterns 次扫描。
+
+`PageClassifier` 把所有主题里的正则去重成一张 pattern 表：
+* 每页每个不重复的 pattern 最多 search 一次（7 个主题共享同一组 goal
+  keywords），按需计算、主题规则短路；
+* YEAR_RE 每页只数一次，且数到 2 就停；
+结果与 `match_theme()` 完全一致。
+
+注：把所有 pattern 拼成一个大 alternation 反而更慢 —— Python `re` 是回溯
+引擎，没有 DFA / Aho-Corasick，逐位置尝试每个分支且无法提前退出。
+
+`classify_pdf()` 额外支持：
+* 大文档按页区间分给多个进程并行抽取文本 + 分类
+* 按 PDF sha256 缓存每页的 match vector，重跑同一份报告直接读缓存
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+from modules.extract.checkpoint import file_sha256
+from modules.extract.config_loader import (
+    YEAR_RE, THEMES,
+    PAGE_FILTER_WORKERS, PAGE_FILTER_MIN_PAGES_PARALLEL, PAGE_FILTER_CACHE_DIR,
+)
+
+# ──────────────────────────────────────────────────────────────────────────
+# 0. Reference implementation (one theme, one page)
+# ──────────────────────────────────────────────────────────────────────────
+
+def match_theme(text: str, cfg: dict) -> bool:
+    """Return *True* if page text matches the theme config."""
+    goal_hit = cfg.get("goal_kw_re") and all(p.search(text) for p in cfg["goal_kw_re"])
+    if not goal_hit and cfg.get("unit_re") and not cfg["unit_re"].search(text):
+        return False
+
+    yrs = YEAR_RE.findall(text)
+    if cfg.get("require_multiple_year_occurrences", False):
+        if len(yrs) < 2:
+            return False
+    elif not yrs:
+        return False
+
+    if cfg.get("require_all_keywords", False):
+        if not all(p.search(text) for p in cfg["keyword_re"]):
+            return False
+    else:
+        hits = len({p.pattern for p in cfg["keyword_re"] if p.search(text)})
+        if hits < cfg.get("min_keyword_hits", 1):
+            return False
+
+    if cfg.get("extra_re") and not any(p.search(text) for p in cfg["extra_re"]):
+        return False
+    return True
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# 1. Shared-pattern classifier
+# ──────────────────────────────────────────────────────────────────────────
+
+class _PageHits:
+    """Lazy, memoised view of which pattern ids match one page."""
+
+    __slots__ = ("_patterns", "_text", "_memo")
+
+    def __init__(self, patterns: List[re.Pattern], text: str):
+        self._patterns = patterns
+        self._text = text
+        self._memo: Dict[int, bool] = {}
+
+    def hit(self, pid: int) -> bool:
+        res = self._memo.get(pid)
+        if res is None:
+            res = self._memo[pid] = self._patterns[pid].search(self._text) is not None
+        return res
+
+
+class PageClassifier:
+    """Classify page text against all themes, sharing pattern results across themes."""
+
+    def __init__(self, themes: Dict[str, dict] = THEMES, year_re: re.Pattern = YEAR_RE):
+        self.year_re = year_re
+        self._patterns: List[re.Pattern] = []
+        self._ids: Dict[Tuple[str, int], int] = {}
+        self._rules: List[Tuple[str, dict]] = []
+
+        for name, cfg in themes.items():
+            unit = cfg.get("unit_re")
+            self._rules.append((name, {
+                "goal": [self._register(p) for p in cfg.get("goal_kw_re") or []],
+                "unit": self._register(unit) if unit else None,
+                "keyword": [self._register(p) for p in cfg.get("keyword_re", [])],
+                "extra": [self._register(p) for p in cfg.get("extra_re") or []],
+                "multi_year": cfg.get("require_multiple_year_occurrences", False),
+                "all_keywords": cfg.get("require_all_keywords", False),
+                "min_hits": cfg.get("min_keyword_hits", 1),
+            }))
+
+    def _register(self, p: re.Pattern) -> int:
+        key = (p.pattern, p.flags)
+        if key not in self._ids:
+            self._ids[key] = len(self._patterns)
+            self._patterns.append(p)
+        return self._ids[key]
+
+    def fingerprint(self) -> str:
+        """Stable hash of every rule – part of the page-cache key."""
+        h = hashlib.sha256()
+        h.update(f"{self.year_re.pattern}|{self.year_re.flags}".encode())
+        for p in self._patterns:
+            h.update(f"\x00{p.pattern}|{p.flags}".encode())
+        h.update(json.dumps(self._rules, sort_keys=True).encode())
+        return h.hexdigest()
+
+    def classify(self, text: str) -> List[str]:
+        """Return the themes (in config order) whose rules match *text*."""
+        hits = _PageHits(self._patterns, text)
+        years = 0
+        for _ in self.year_re.finditer(text):
+            years += 1
+            if years >= 2:
+                break
+
+        out = []
+        for name, r in self._rules:
+            goal_hit = bool(r["goal"]) and all(hits.hit(i) for i in r["goal"])
+            if not goal_hit and r["unit"] is not None and not hits.hit(r["unit"]):
+                continue
+            if years < (2 if r["multi_year"] else 1):
+                continue
+            if r["all_keywords"]:
+                if not all(hits.hit(i) for i in r["keyword"]):
+                    continue
+            else:
+                n = len({self._patterns[i].pattern for i in r["keyword"] if hits.hit(i)})
+                if n < r["min_hits"]:
+                    continue
+            if r["extra"] and not any(hits.hit(i) for i in r["extra"]):
+                continue
+            out.append(name)
+        return out
+
+
+@lru_cache(maxsize=1)
+def default_classifier() -> PageClassifier:
+    return PageClassifier()
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# 2. Whole-PDF classification (parallel + cached)
+# ──────────────────────────────────────────────────────────────────────────
+
+def _page_label(pg) -> Optional[int]:
+    m = re.search(r"\d+", pg.get_label() or "")
+    return int(m.group()) if m else None
+
+
+def _classify_range(
+    src: str, start: int, stop: int, clf: Optional[PageClassifier] = None
+) -> List[Tuple[int, List[str]]]:
+    """Worker: open the PDF independently and classify pages [start, stop)."""
+    clf = clf or default_classifier()
+    out = []
+    with fitz.open(src) as doc:
+        for idx in range(start, stop):
+            pg = doc[idx]
+            label = _page_label(pg)
+            out.append((label if label is not None else idx + 1, clf.classify(pg.get_text("text") or "")))
+    return out
+
+
+def classify_pdf(
+    src: str | Path,
+    workers: Optional[int] = None,
+    cache_dir: Optional[Path] = PAGE_FILTER_CACHE_DIR,
+    classifier: Optional[PageClassifier] = None,
+) -> Tuple[List[List[str]], Dict[int, int]]:
+    """
+    Return (match vectors, page labels) for every page of *src*.
+
+    vectors[i] = matched theme names for page index i
+    labels[i]  = printed page number (falls back to i + 1)
+
+    workers   : text-extraction processes (None → config / PAGE_FILTER_WORKERS env)
+    cache_dir : directory for per-PDF vector cache; None disables caching
+    """
+    src = str(src)
+    clf = classifier or default_classifier()
+    cache_path = None
+    if cache_dir is not None:
+        cache_path = Path(cache_dir) / f"{file_sha256(src)}_{clf.fingerprint()[:16]}.json"
+        if cache_path.exists():
+            try:
+                cached = json.loads(cache_path.read_text("utf-8"))
+                return cached["vectors"], {i: lb for i, lb in enumerate(cached["labels"])}
+            except (ValueError, KeyError):
+                pass  # 损坏的缓存文件 → 重新计算
+
+    with fitz.open(src) as doc:
+        n_pages = len(doc)
+
+    if workers is None:
+        workers = int(os.getenv("PAGE_FILTER_WORKERS", PAGE_FILTER_WORKERS))
+    if workers > 1 and n_pages >= PAGE_FILTER_MIN_PAGES_PARALLEL:
+        step = -(-n_pages // workers)
+        ranges = [(s, min(s + step, n_pages)) for s in range(0, n_pages, step)]
+        with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+            futs = [pool.submit(_classify_range, src, s, e, classifier) for s, e in ranges]
+            rows = [row for f in futs for row in f.result()]
+    else:
+        rows = _classify_range(src, 0, n_pages, clf)
+
+    labels = {i: lb for i, (lb, _) in enumerate(rows)}
+    vectors = [v for _, v in rows]
+
+    if cache_path is not None:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"labels": [lb for lb, _ in rows], "vectors": vectors}), "utf-8")
+        os.replace(tmp, cache_path)  # 原子替换，并行 batch worker 安全
+    return vectors, labels
@@ -0,0 +1,74 @@
+"""
+Page index for Docling Markdown
+───────────────────────────────────────────────────────────────────────────────
+`parse_with_docling()` 输出的 Markdown 以 ``--- PAGE N ---`` 分隔每一页。
+旧实现里 `grab_pages()` 每次调用都对整篇文档重新 `re.split`，
+`_batches()` 逐页调用一次 → token 预算是 O(pages²)。
+
+`PageIndex` 只解析一次，之后按页号 O(1) 取文本和预估 token 数。
+"""
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterable, List
+
+PAGE_MARKER_RE = re.compile(r"(?:^|\n\n)--- PAGE (\d+) ---\n\n")
+
+
+def rough_tokens(txt: str) -> int:
+    """Cheap token estimate (~4 chars per token, at least 1)."""
+    return len(txt) // 4 or 1
+
+
+def _header(page: int) -> str:
+    return f"--- PAGE {page} ---\n\n"
+
+
+class PageIndex:
+    """Parsed view of a Markdown document, keyed by page label."""
+
+    def __init__(self, pages: Dict[int, str]):
+        self._pages = pages
+        # token 估算包含页眉，与旧版 `_rough_tokens(grab_pages(md, [p]))` 一致
+        self._tokens = {p: rough_tokens(_header(p) + txt) for p, txt in pages.items()}
+
+    @classmethod
+    def from_markdown(cls, md: str) -> "PageIndex":
+        parts = PAGE_MARKER_RE.split(md)
+        return cls({int(parts[i]): parts[i + 1] for i in range(1, len(parts), 2)})
+
+    def __contains__(self, page: int) -> bool:
+        return page in self._pages
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def pages(self) -> List[int]:
+        return list(self._pages)
+
+    def text(self, page: int) -> str:
+        """Raw page body ('' when the page is missing)."""
+        return self._pages.get(page, "")
+
+    def tokens(self, page: int) -> int:
+        """Token estimate of the page *including* its ``--- PAGE N ---`` header."""
+        tks = self._tokens.get(page)
+        return tks if tks is not None else rough_tokens(_header(page))
+
+    def grab(self, pages: Iterable[int]) -> str:
+        """Re-assemble the given pages into a Markdown segment."""
+        return "\n\n".join(_header(p) + self.text(p) for p in pages)
+
+    def batches(self, pages: Iterable[int], max_toks: int = 10_000) -> List[List[int]]:
+        """Greedily pack pages into batches under *max_toks* estimated tokens."""
+        cur, tok, out = [], 0, []
+        for p in pages:
+            tks = self.tokens(p)
+            if cur and tok + tks > max_toks:
+                out.append(cur)
+                cur, tok = [], 0
+            cur.append(p)
+            tok += tks
+        if cur:
+            out.append(cur)
+        return out
@@ -0,0 +1,78 @@
+"""
+Per-model token-bucket rate limiter for Groq calls
+───────────────────────────────────────────────────────────────────────────────
+Groq 对每个模型分别限制 RPM（requests/min）和 TPM（tokens/min）。
+并发抽取时所有线程共享一个 `ModelRateLimiter`，调用前先 `acquire()`，
+超出配额就阻塞等待，而不是打出一堆 429 再指数退避。
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """Thread-safe token bucket: *capacity* tokens, refilled at *rate* per second."""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, n: float = 1.0) -> float:
+        """Block until *n* tokens are available; return seconds spent waiting."""
+        n = min(float(n), self.capacity)  # 超过桶容量的请求按满桶算，避免永久阻塞
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= n:
+                    self._tokens -= n
+                    return waited
+                wait = (n - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+class ModelRateLimiter:
+    """
+    Holds one request bucket and one token bucket per model.
+
+    limits = {"model-name": {"rpm": 30, "tpm": 6000}, "default": {...}}
+    Models without an entry fall back to ``"default"``; if that is missing
+    too, calls for the model are not throttled.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, float]]] = None):
+        self._limits = dict(limits or {})
+        self._buckets: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, model: str):
+        with self._lock:
+            if model not in self._buckets:
+                cfg = self._limits.get(model) or self._limits.get("default") or {}
+                rpm, tpm = cfg.get("rpm"), cfg.get("tpm")
+                self._buckets[model] = (
+                    TokenBucket(rpm, rpm / 60.0) if rpm else None,
+                    TokenBucket(tpm, tpm / 60.0) if tpm else None,
+                )
+            return self._buckets[model]
+
+    def acquire(self, model: str, tokens: int = 0) -> float:
+        """Reserve one request and *tokens* estimated tokens for *model*."""
+        req_bucket, tok_bucket = self._get(model)
+        waited = 0.0
+        if req_bucket:
+            waited += req_bucket.acquire(1)
+        if tok_bucket and tokens:
+            waited += tok_bucket.acquire(tokens)
+        return waited
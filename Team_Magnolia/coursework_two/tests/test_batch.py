@@ -0,0 +1,45 @@
+# tests/test_batch.py
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("docling")
+pytest.importorskip("torch")
+
+from modules.extract import batch
+
+
+def test_batch_worker_converts_its_keys_together(monkeypatch, tmp_path):
+    monkeypatch.setattr(batch, "SCRATCH_DIR", tmp_path / "batch")
+    calls = []
+
+    def fake_download(key, out_dir):
+        if key == "missing.pdf":
+            raise FileNotFoundError(key)
+        return Path(out_dir) / key, f"sha-{key}"
+
+    def fake_extract_many(runs):
+        calls.append(sorted(runs))
+        return {k: (None if k == "empty.pdf" else Path(f"{k}.json")) for k in runs}
+
+    def fake_finish(key, raw_json, sha256, out_dir, results_dir, extract_seconds):
+        return raw_json is not None, sha256
+
+    monkeypatch.setattr(batch, "_download", fake_download)
+    monkeypatch.setattr(batch, "extract_many", fake_extract_many)
+    monkeypatch.setattr(batch, "_finish", fake_finish)
+
+    results, _ = batch._batch_worker(["a.pdf", "missing.pdf", "b.pdf", "empty.pdf"])
+
+    assert calls == [["a.pdf", "b.pdf", "empty.pdf"]]      # 一次 Docling 批量转换
+    assert sorted(results) == [
+        ("a.pdf", True, "sha-a.pdf"),
+        ("b.pdf", True, "sha-b.pdf"),
+        ("empty.pdf", False, "sha-empty.pdf"),
+        ("missing.pdf", False, None),
+    ]
+
+
+def test_chunks():
+    assert batch._chunks(["a", "b", "c"], 2) == [["a", "b"], ["c"]]
+    assert batch._chunks(["a"], 0) == [["a"]]
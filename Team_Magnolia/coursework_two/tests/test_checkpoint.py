@@ -0,0 +1,36 @@
+# tests/test_checkpoint.py
+import hashlib
+
+from modules.extract.checkpoint import CheckpointLedger, file_sha256
+
+
+def test_file_sha256(tmp_path):
+    p = tmp_path / "a.pdf"
+    p.write_bytes(b"%PDF-1.7 test")
+    assert file_sha256(p, chunk=4) == hashlib.sha256(b"%PDF-1.7 test").hexdigest()
+
+
+def test_ledger_resume_and_etag_change(tmp_path):
+    path = tmp_path / "ckpt.jsonl"
+    ledger = CheckpointLedger(path)
+    assert not ledger.is_done("2024/A.pdf")
+    ledger.mark_done("2024/A.pdf", etag="e1", sha256="abc")
+
+    # 新实例从磁盘恢复
+    again = CheckpointLedger(path)
+    assert len(again) == 1
+    assert again.is_done("2024/A.pdf", "e1")
+    assert not again.is_done("2024/A.pdf", "e2")   # MinIO 对象被替换 → 重跑
+    assert again.get("2024/A.pdf")["sha256"] == "abc"
+
+
+def test_ledger_ignores_truncated_line(tmp_path):
+    path = tmp_path / "ckpt.jsonl"
+    CheckpointLedger(path).mark_done("k1")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"key": "k2", "et')               # 进程被杀时写了一半
+    assert CheckpointLedger(path).is_done("k1")
+    assert not CheckpointLedger(path).is_done("k2")
+    ledger = CheckpointLedger(path)
+    ledger.mark_done("k3")
+    assert CheckpointLedger(path).is_done("k3")
@@ -0,0 +1,54 @@
+# tests/test_company_lookup.py
+import os
+
+import mongomock
+import pytest
+
+from modules.db import pools
+from modules.extract import company_lookup as cl
+
+
+@pytest.fixture
+def db(monkeypatch):
+    client = mongomock.MongoClient()
+    monkeypatch.setattr(pools, "_mongo_clients", {os.getpid(): client})
+    cl._cache.clear()
+    yield pools.get_mongo_db()
+    cl._cache.clear()
+
+
+def test_second_lookup_hits_cache(db, monkeypatch):
+    oid = cl.get_company_id("Apple Inc.")
+    assert db.dim_companies.count_documents({}) == 1
+
+    # 之后的查询不应再访问 Mongo
+    monkeypatch.setattr(pools, "get_mongo_db", lambda *a: pytest.fail("Mongo hit"))
+    monkeypatch.setattr(cl, "get_mongo_db", lambda *a: pytest.fail("Mongo hit"))
+    assert cl.get_company_id("  apple inc ") == oid
+
+
+def test_prefetch_loads_dimension(db, monkeypatch):
+    db.dim_companies.insert_many([
+        {"name": "Apple Inc.", "norm_name": "apple inc"},
+        {"name": "Tesla", "norm_name": "tesla"},
+    ])
+    assert cl.prefetch_companies() == 2
+    monkeypatch.setattr(cl, "get_mongo_db", lambda *a: pytest.fail("Mongo hit"))
+    assert cl.get_company_id("Tesla") == db.dim_companies.find_one({"norm_name": "tesla"})["_id"]
+
+
+def test_lru_bound(db, monkeypatch):
+    monkeypatch.setattr(cl, "CACHE_MAX", 2)
+    a = cl.get_company_id("A")
+    cl.get_company_id("B")
+    cl.get_company_id("C")          # 淘汰 A
+    assert "a" not in cl._cache and len(cl._cache) == 2
+    assert cl.get_company_id("A") == a   # 重新从 Mongo 取回同一个 _id
+
+
+def test_prefetch_replaces_stale_entries(db):
+    cl.get_company_id("Gone Corp")
+    db.dim_companies.delete_many({})              # 集合被外部重建
+    db.dim_companies.insert_one({"name": "Tesla", "norm_name": "tesla"})
+    assert cl.prefetch_companies() == 1
+    assert "gone corp" not in cl._cache and "tesla" in cl._cache
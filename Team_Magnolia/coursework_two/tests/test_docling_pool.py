@@ -0,0 +1,97 @@
+# tests/test_docling_pool.py
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("docling")
+
+from modules.extract import docling_pool
+from modules.extract.docling_pool import ConverterPool
+
+
+class FakeOptions:
+    def __init__(self, ocr: bool):
+        self.ocr = ocr
+
+    def model_dump_json(self) -> str:
+        return f'{{"do_ocr": {str(self.ocr).lower()}}}'
+
+
+class FakeConverter:
+    created = []
+
+    def __init__(self, format_options):
+        self.initialized = 0
+        FakeConverter.created.append(self)
+
+    def initialize_pipeline(self, fmt):
+        self.initialized += 1
+
+    def convert(self, path):
+        return SimpleNamespace(document=f"doc:{path}")
+
+    def convert_all(self, paths, raises_on_error=True):
+        for path in paths:
+            ok = "bad" not in path
+            yield SimpleNamespace(
+                input=SimpleNamespace(file=path),
+                status=docling_pool.ConversionStatus.SUCCESS if ok else docling_pool.ConversionStatus.FAILURE,
+                document=f"doc:{path}",
+            )
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    FakeConverter.created = []
+    monkeypatch.setattr(docling_pool, "DocumentConverter", FakeConverter)
+    monkeypatch.setattr(docling_pool, "PdfFormatOption", lambda pipeline_options: pipeline_options)
+    return ConverterPool()
+
+
+def test_converter_reused_per_options(pool):
+    assert pool.convert(FakeOptions(True), "a.pdf") == "doc:a.pdf"
+    assert pool.convert(FakeOptions(True), "b.pdf") == "doc:b.pdf"
+    assert len(FakeConverter.created) == 1
+    assert FakeConverter.created[0].initialized == 1     # 模型只加载一次
+
+    pool.get(FakeOptions(False))                          # 不同 options → 另一个 converter
+    assert len(FakeConverter.created) == 2
+
+
+def test_stats(pool):
+    pool.convert(FakeOptions(True), "a.pdf")
+    pool.convert(FakeOptions(True), "b.pdf")
+    s = pool.stats()
+    assert s["converters"] == 1 and s["documents"] == 2
+    assert s["load_seconds"] >= 0 and s["convert_seconds"] >= 0
+
+
+def test_inherited_pool_is_not_reused_in_child(pool):
+    pool.convert(FakeOptions(True), "a.pdf")
+    pool._pid = -1                                        # 模拟 fork 后的子进程
+    assert pool.stats()["documents"] == 0
+    pool.convert(FakeOptions(True), "b.pdf")
+    assert len(FakeConverter.created) == 2                # 子进程加载自己的一份
+    assert pool.stats()["converters"] == 1
+
+
+def test_convert_many_streams_through_one_converter(pool):
+    out = list(pool.convert_many(FakeOptions(True), ["a.pdf", "bad.pdf", "c.pdf"]))
+    assert out == [(Path("a.pdf"), "doc:a.pdf"), (Path("bad.pdf"), None), (Path("c.pdf"), "doc:c.pdf")]
+    assert len(FakeConverter.created) == 1
+    assert pool.stats()["documents"] == 3
+
+
+def test_concurrent_converts_count_every_document(pool):
+    threads = [
+        threading.Thread(target=lambda: [pool.convert(FakeOptions(True), "a.pdf") for _ in range(200)])
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert pool.stats()["documents"] == 1600
+    assert len(FakeConverter.created) == 1
@@ -0,0 +1,61 @@
+# tests/test_llm_cache.py
+import pytest
+from modules.extract.llm_cache import LLMCache, cache_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = LLMCache(tmp_path / "llm.sqlite", max_bytes=1_000)
+    yield c
+    c.close()
+
+
+def test_key_depends_on_every_part():
+    base = cache_key("m", "sys", "txt")
+    assert base != cache_key("m2", "sys", "txt")
+    assert base != cache_key("m", "sys2", "txt")
+    assert base != cache_key("m", "sys", "txt2")
+    # 分隔符避免 ("ab","c") 与 ("a","bc") 冲突
+    assert cache_key("ab", "c", "") != cache_key("a", "bc", "")
+
+
+def test_hit_miss_counters(cache):
+    assert cache.get("m", "sys", "txt") is None
+    cache.put("m", "sys", "txt", '{"a": 1}')
+    assert cache.get("m", "sys", "txt") == '{"a": 1}'
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_fallback_chain_counts_once(cache):
+    cache.put("fallback", "sys", "txt", "{}")
+    assert cache.get(("primary", "fallback"), "sys", "txt") == "{}"
+    assert cache.get(("primary", "other"), "sys", "txt") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_bypass_skips_reads_but_still_writes(cache):
+    cache.bypass = True
+    cache.put("m", "sys", "txt", "{}")
+    assert cache.get("m", "sys", "txt") is None
+    cache.bypass = False
+    assert cache.get("m", "sys", "txt") == "{}"
+
+
+def test_lru_eviction_by_size(cache):
+    cache.put("m", "s", "old", "x" * 400)
+    cache.put("m", "s", "mid", "x" * 400)
+    cache.get("m", "s", "old")            # old 变成最近使用
+    cache.put("m", "s", "new", "x" * 400)  # 超过 1000 字节 → 淘汰 mid
+    assert cache.get("m", "s", "mid") is None
+    assert cache.get("m", "s", "old") is not None
+    assert cache.stats()["bytes"] <= 1_000
+
+
+def test_persists_across_instances(tmp_path):
+    path = tmp_path / "llm.sqlite"
+    a = LLMCache(path)
+    a.put("m", "s", "t", "{}")
+    a.close()
+    b = LLMCache(path)
+    assert b.get("m", "s", "t") == "{}"
+    b.close()
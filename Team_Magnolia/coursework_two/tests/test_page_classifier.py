@@ -0,0 +1,68 @@
+# tests/test_page_classifier.py
+import random
+import re
+
+import fitz
+import pytest
+
+from modules.extract.config_loader import THEMES
+from modules.extract.page_classifier import PageClassifier, classify_pdf, match_theme
+
+WORDS = [
+    "scope 1", "scope 2", "emissions", "tCO2e", "MWh", "energy", "renewable", "water",
+    "ML", "waste", "tonnes", "recycled", "%", "diversity", "board", "ethics",
+    "2019", "2022", "2023", "FY23", "2030", "2050", "target", "goals", "baseline year",
+    "the", "and", "report", "employees", "safety", "governance", "compliance",
+]
+
+
+def _reference(text):
+    return [t for t, cfg in THEMES.items() if match_theme(text, cfg)]
+
+
+def test_matches_reference_on_random_pages():
+    clf = PageClassifier()
+    rnd = random.Random(0)
+    for _ in range(500):
+        text = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(0, 40)))
+        assert clf.classify(text) == _reference(text), text
+
+
+def test_overlapping_keywords_count_separately():
+    # "scope 1 emissions" 与 "emissions" 重叠，两个 pattern 都应计入命中数
+    themes = {
+        "T": {
+            "unit_re": re.compile(r"x", re.I),
+            "keyword_re": [re.compile(r"scope 1 emissions", re.I), re.compile(r"emissions", re.I)],
+            "goal_kw_re": [],
+            "min_keyword_hits": 2,
+        }
+    }
+    clf = PageClassifier(themes)
+    assert clf.classify("x 2023 scope 1 emissions") == ["T"]
+    assert clf.classify("x 2023 scope 2") == []
+
+
+def _make_pdf(path, pages):
+    doc = fitz.open()
+    for txt in pages:
+        doc.new_page().insert_text((72, 72), txt)
+    doc.save(str(path))
+    doc.close()
+
+
+def test_classify_pdf_parallel_and_cache(tmp_path):
+    pages = ["Scope 1 emissions tCO2e 2022 2023 GHG", "nothing here", "Energy MWh 2022 2023 renewable electricity"] * 30
+    pdf = tmp_path / "r.pdf"
+    _make_pdf(pdf, pages)
+
+    serial, labels = classify_pdf(pdf, workers=1, cache_dir=None)
+    assert len(serial) == len(pages) and labels[0] == 1
+    parallel, _ = classify_pdf(pdf, workers=3, cache_dir=None)
+    assert parallel == serial
+
+    cache = tmp_path / "cache"
+    first, _ = classify_pdf(pdf, workers=1, cache_dir=cache)
+    assert len(list(cache.iterdir())) == 1
+    again, again_labels = classify_pdf(pdf, workers=1, cache_dir=cache)
+    assert again == first == serial and again_labels == labels
@@ -0,0 +1,94 @@
+# tests/test_page_index.py
+import re
+import time
+
+import pytest
+from modules.extract import page_index
+from modules.extract.page_index import PAGE_MARKER_RE, PageIndex, rough_tokens
+
+
+def _legacy_grab_pages(md, pages):
+    # 旧版 extractor.grab_pages：每次调用都重新 split 整篇 Markdown
+    parts = re.split(r"(?:^|\n\n)--- PAGE (\d+) ---\n\n", md)
+    pg_map = {int(parts[i]): parts[i + 1] for i in range(1, len(parts), 2)}
+    return "\n\n".join(f"--- PAGE {p} ---\n\n{pg_map.get(p, '')}" for p in pages)
+
+
+def _legacy_batches(pgs, md, max_toks=10_000):
+    cur, tok, out = [], 0, []
+    for p in pgs:
+        tks = rough_tokens(_legacy_grab_pages(md, [p]))
+        if cur and tok + tks > max_toks:
+            out.append(cur)
+            cur, tok = [], 0
+        cur.append(p); tok += tks
+    if cur:
+        out.append(cur)
+    return out
+
+
+def _synthetic_md(n_pages, body_chars=2_000):
+    body = ("Scope 1 emissions 2023 12,345 tCO2e. " * (body_chars // 36 + 1))[:body_chars]
+    return "\n\n".join(f"--- PAGE {p} ---\n\n{body} p{p}" for p in range(1, n_pages + 1))
+
+
+@pytest.fixture
+def md():
+    return "--- PAGE 3 ---\n\nalpha\n\n--- PAGE 7 ---\n\nbeta text\n\n--- PAGE UNKNOWN ---\n\ngamma"
+
+
+def test_index_matches_legacy_grab(md):
+    idx = PageIndex.from_markdown(md)
+    assert idx.pages() == [3, 7]
+    for pages in ([3], [7], [3, 7], [7, 99]):
+        assert idx.grab(pages) == _legacy_grab_pages(md, pages)
+
+
+def test_index_tokens_match_legacy(md):
+    idx = PageIndex.from_markdown(md)
+    for p in (3, 7, 42):
+        assert idx.tokens(p) == rough_tokens(_legacy_grab_pages(md, [p]))
+
+
+def test_batches_match_legacy():
+    md = _synthetic_md(60)
+    pages = list(range(1, 61))
+    assert PageIndex.from_markdown(md).batches(pages, 2_000) == _legacy_batches(pages, md, 2_000)
+
+
+@pytest.mark.slow
+def test_benchmark_500_pages(monkeypatch):
+    md = _synthetic_md(500)
+    pages = list(range(1, 501))
+
+    # 计的是整篇 Markdown 的 split 次数（工作量），耗时只打印、不断言
+    scans = {"legacy": 0, "index": 0}
+    real_split = re.split
+
+    def counting_split(*args, **kwargs):
+        scans["legacy"] += 1
+        return real_split(*args, **kwargs)
+
+    class CountingPattern:
+        def split(self, string):
+            scans["index"] += 1
+            return PAGE_MARKER_RE.split(string)
+
+    monkeypatch.setattr(re, "split", counting_split)
+    monkeypatch.setattr(page_index, "PAGE_MARKER_RE", CountingPattern())
+
+    t0 = time.perf_counter()
+    legacy = [_legacy_grab_pages(md, b) for b in _legacy_batches(pages, md)]
+    t_legacy = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    idx = PageIndex.from_markdown(md)
+    indexed = [idx.grab(b) for b in idx.batches(pages)]
+    t_index = time.perf_counter() - t0
+
+    print(f"\n[bench] 500 pages: legacy={t_legacy:.3f}s ({scans['legacy']} scans)  "
+          f"index={t_index:.4f}s ({scans['index']} scan)  "
+          f"speedup={t_legacy / max(t_index, 1e-9):.0f}x")
+    assert indexed == legacy
+    assert scans["index"] == 1
+    assert scans["legacy"] >= len(pages) + len(legacy)
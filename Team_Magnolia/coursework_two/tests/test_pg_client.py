@@ -1,5 +1,7 @@
+import types
+
 import pytest
-from modules.db import pg_client
+from modules.db import pg_client, pools
 
 class DummyCursor:
     def __init__(self):
@@ -16,25 +18,61 @@ class DummyCursor:
 class DummyConn:
     def __init__(self):
         self.autocommit = False
+        self.closed = 0
+        self.info = types.SimpleNamespace(transaction_status=0)  # IDLE
+        self.commits = 0
         self.cur = DummyCursor()
     def cursor(self):
         return self.cur
+    def commit(self):
+        self.commits += 1
+    def rollback(self):
+        pass
     def close(self):
         pass
 
 @pytest.fixture(autouse=True)
 def fake_psycopg2_connect(monkeypatch):
-    # 替换 psycopg2.connect → 返回 DummyConn
+    # 替换 psycopg2.connect → 返回同一个 DummyConn；连接池按测试重建
     import psycopg2
-    monkeypatch.setattr(psycopg2, "connect", lambda dsn: DummyConn())
+    conn = DummyConn()
+    monkeypatch.setattr(psycopg2, "connect", lambda *a, **kw: conn)
+    monkeypatch.setattr(pools, "_pg_pools", {})
+    return conn
 
-def test_upsert_company_and_indicator():
+def test_upsert_company_and_indicator(fake_psycopg2_connect):
     cid = pg_client._upsert_company("norm","Display")
     assert cid == 42
     # cursor.queries[0] 是 INSERT SQL
-    insert_sql, params = pg_client._get_default_cursor().queries[0]
+    insert_sql, params = fake_psycopg2_connect.cur.queries[0]
     assert "INSERT INTO" in insert_sql
+    assert fake_psycopg2_connect.commits == 1
 
     iid = pg_client._upsert_indicator("slug","Name","Area")
     assert iid == 42
     # 同理检查 indicator upsert
+    assert "indicator_dim" in fake_psycopg2_connect.cur.queries[1][0]
+
+def test_shared_cursor_is_one_transaction(fake_psycopg2_connect):
+    # 传入 cur 时不再单独借连接 / 提交
+    with pg_client.get_cursor() as cur:
+        pg_client._upsert_company("a", "A", cur=cur)
+        pg_client._upsert_indicator("s", "S", "Env", cur=cur)
+    assert len(fake_psycopg2_connect.cur.queries) == 2
+    assert fake_psycopg2_connect.commits == 1
+
+def test_bulk_upsert_indicators_dedupes_slugs(monkeypatch):
+    calls = []
+    def fake_execute_values(cur, sql, values, page_size=100, fetch=False):
+        calls.append(values)
+        return [(slug, i) for i, (slug, _, _) in enumerate(values, 1)]
+    monkeypatch.setattr(pg_client, "execute_values", fake_execute_values)
+
+    ids = pg_client.bulk_upsert_indicators([
+        ("co2", "CO2", "Environment"),
+        ("water", "Water", "Environment"),
+        ("co2", "CO2 again", "Environment"),
+    ])
+    assert ids == {"co2": 1, "water": 2}
+    assert len(calls) == 1                       # 单次多行 upsert
+    assert calls[0][0] == ("co2", "CO2", "Environment")  # 保留首次出现
@@ -0,0 +1,53 @@
+# tests/test_rate_limit.py
+import threading
+
+from modules.extract import rate_limit
+from modules.extract.rate_limit import ModelRateLimiter, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.lock = threading.Lock()
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, s):
+        with self.lock:
+            self.now += s
+
+
+def _patch_clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(rate_limit.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_bucket_waits_once_capacity_exhausted(monkeypatch):
+    clock = _patch_clock(monkeypatch)
+    b = TokenBucket(capacity=2, rate=1.0)
+    assert b.acquire() == 0 and b.acquire() == 0
+    # 第三次需要等 1 秒补充
+    assert b.acquire() > 0
+    assert clock.now >= 1.0
+
+
+def test_oversized_request_is_capped(monkeypatch):
+    _patch_clock(monkeypatch)
+    b = TokenBucket(capacity=10, rate=1.0)
+    assert b.acquire(50) == 0  # 不会永久阻塞
+
+
+def test_limiter_is_per_model(monkeypatch):
+    _patch_clock(monkeypatch)
+    lim = ModelRateLimiter({"a": {"rpm": 1}, "default": {"rpm": 60}})
+    assert lim.acquire("a") == 0
+    assert lim.acquire("b") == 0        # 另一个模型有独立的桶
+    assert lim.acquire("a") > 0         # a 的 1 rpm 已用完
+
+
+def test_unlimited_model_never_waits():
+    lim = ModelRateLimiter({})
+    assert all(lim.acquire("x", 10_000) == 0 for _ in range(100))
@@ -0,0 +1,128 @@
+# tests/test_viz_index.py
+import json
+import os
+
+import mongomock
+import pytest
+
+from modules.Viz import models
+from modules.Viz.index import RecordIndex
+from modules.Viz.models import DataLoader, LiveRecordView
+
+RECORDS = [
+    {"company_name": "Apple", "indicator_id": "co2", "thematic_area": "Environment"},
+    {"company_name": "Barclays", "indicator_id": "water", "thematic_area": "Environment"},
+    {"company_name": "Apple", "indicator_id": "water", "thematic_area": "Environment"},
+    {"company_name": "Apple", "indicator_id": "board", "thematic_area": "Governance"},
+    {"company_name": "Apple", "indicator_id": "co2", "thematic_area": "Environment"},
+]
+
+
+def test_select_matches_linear_scan():
+    idx = RecordIndex(RECORDS)
+    comps, metrics = ["Apple", "Nope"], ["co2", "water"]
+    expected = [r for r in RECORDS
+                if r["company_name"] in comps and r["indicator_id"] in metrics]
+    assert idx.select(comps, metrics) == expected
+    assert idx.first("Apple", "co2") is RECORDS[0]
+    assert idx.first("Barclays", "board") is None
+
+
+def test_names_areas_and_search():
+    idx = RecordIndex(RECORDS)
+    assert idx.company_names == ["Apple", "Barclays"]
+    assert idx.thematic_area_choices == {
+        "Environment": ["co2", "water"], "Governance": ["board"]}
+    assert idx.search_names("BAR") == ["Barclays"]
+    assert idx.search_names("") == []
+
+
+def test_incremental_add():
+    idx = RecordIndex(RECORDS[:2])
+    assert idx.add(RECORDS[2:]) == 3
+    assert len(idx) == 5
+    assert [r["indicator_id"] for r in idx.select(["Apple"], ["co2"])] == ["co2", "co2"]
+
+
+def test_json_loader_reports_rewrites(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps(RECORDS[:1]), encoding="utf-8")
+    loader = DataLoader(mode="json", json_path=str(path))
+
+    assert loader.fetch_new_records() == (RECORDS[:1], True)
+    assert loader.fetch_new_records() == ([], False)
+
+    path.write_text(json.dumps(RECORDS), encoding="utf-8")
+    st = os.stat(path)
+    os.utime(path, (st.st_atime, st.st_mtime + 5))
+    records, full = loader.fetch_new_records()
+    assert full and records == RECORDS
+
+
+@pytest.fixture
+def mongo_loader(monkeypatch):
+    monkeypatch.setattr(models, "MongoClient", mongomock.MongoClient)
+    loader = DataLoader(mode="mongo", mongo_uri="mongodb://x", db_name="db", collection_name="c")
+    loader.collection.insert_many([dict(r) for r in RECORDS])
+    return loader
+
+
+def test_mongo_pushdown_matches_memory_index(mongo_loader):
+    idx = RecordIndex(RECORDS)
+    live = LiveRecordView(mongo_loader)
+    assert live.company_names == idx.company_names
+    assert live.thematic_area_choices == idx.thematic_area_choices
+    assert list(live.select(["Apple"], ["co2", "water"])) == idx.select(["Apple"], ["co2", "water"])
+    assert live.first("Apple", "water") == RECORDS[2]
+    assert live.search_names("bar") == ["Barclays"]
+
+
+def test_mongo_aggregates_are_ttl_cached(mongo_loader):
+    assert mongo_loader.company_names() == ["Apple", "Barclays"]
+    mongo_loader.collection.insert_one({"company_name": "Cisco", "indicator_id": "co2"})
+    assert mongo_loader.company_names() == ["Apple", "Barclays"]     # 仍在 TTL 内
+    mongo_loader.cache.clear()
+    assert mongo_loader.company_names() == ["Apple", "Barclays", "Cisco"]
+
+
+def test_mongo_incremental_fetch_tolerates_out_of_order_ids(monkeypatch):
+    import datetime as dt
+    from bson import ObjectId
+
+    monkeypatch.setattr(models, "MongoClient", mongomock.MongoClient)
+    loader = DataLoader(mode="mongo", mongo_uri="mongodb://x", db_name="db", collection_name="c",
+                        incremental_lag=60, full_reload_seconds=3600)
+    t0 = dt.datetime(2025, 1, 1, tzinfo=dt.timezone.utc)
+
+    def oid(seconds, n):
+        return ObjectId(ObjectId.from_datetime(t0 + dt.timedelta(seconds=seconds)).binary[:4] + n.to_bytes(8, "big"))
+
+    loader.collection.insert_one({"_id": oid(10, 1), "company_name": "A"})
+    assert loader.fetch_new_records() == ([{"company_name": "A"}], True)
+
+    # 另一个 worker 稍晚写入、但 _id 更小的文档，以及一条新文档
+    loader.collection.insert_one({"_id": oid(5, 2), "company_name": "B"})
+    loader.collection.insert_one({"_id": oid(20, 3), "company_name": "C"})
+    records, full = loader.fetch_new_records()
+    assert not full and sorted(r["company_name"] for r in records) == ["B", "C"]
+    assert loader.fetch_new_records() == ([], False)
+
+    # 定期整体重读：删除也能反映出来
+    loader.collection.delete_one({"company_name": "A"})
+    loader.full_reload_seconds = 0
+    records, full = loader.fetch_new_records()
+    assert full and sorted(r["company_name"] for r in records) == ["B", "C"]
+
+
+def test_mongo_incremental_fetch_after_empty_full_reload(monkeypatch):
+    monkeypatch.setattr(models, "MongoClient", mongomock.MongoClient)
+    loader = DataLoader(mode="mongo", mongo_uri="mongodb://x", db_name="db", collection_name="c",
+                        incremental_lag=60, full_reload_seconds=3600)
+
+    # 集合为空时整体重读没有水位，之后的增量拉取不能报错
+    assert loader.fetch_new_records() == ([], True)
+    assert loader.fetch_new_records() == ([], False)
+
+    loader.collection.insert_one({"company_name": "A"})
+    assert loader.fetch_new_records() == ([{"company_name": "A"}], False)
+    assert loader.fetch_new_records() == ([], False)
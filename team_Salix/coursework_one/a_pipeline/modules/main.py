@@ -19,7 +19,11 @@ The crawler uses a three-step strategy to find reports:
     2. Bing search for company sustainability webpages
     3. Crawling found webpages for PDF links
 
-The module uses threading for parallel processing of different years for each company.
+``process_companies`` flattens the run into one queue of (company, year) tasks served by
+``CRAWL_WORKERS`` threads, so a slow year no longer holds up the next company. All threads
+lease Chrome instances from a shared, bounded ``DriverPool`` instead of launching (and
+quitting) a browser for every company-year pair, and Bing queries are spaced by a shared
+``SearchRateLimiter``.
 
 Dependencies
 -----------
@@ -44,6 +48,11 @@ The module uses several configuration constants:
     DB_PATH (str): Path to the SQLite database containing company names
     OUTPUT_DIR (str): Directory for saving results and logs
     LOG_FILENAME (str): Path to the log file
+    CRAWL_WORKERS (int): Concurrent (company, year) tasks for the whole run (env ``CRAWL_WORKERS``)
+    SEARCH_ENGINE_RPS (dict): Maximum requests per second for each search engine host
+    CHECKPOINT_FILE (str): Finished (company, year) results of an interrupted or partly failed run
+    DRIVER_POOL_SIZE (int): Live Chrome instances in ``DRIVER_POOL`` (env ``DRIVER_POOL_SIZE``)
+    DRIVER_MAX_USES (int): Leases after which a driver is recycled (env ``DRIVER_MAX_USES``)
 
 Example
 -------
@@ -68,6 +77,12 @@ Functions
 .. function:: init_driver()
     Initialize and configure a Chrome WebDriver for web scraping.
 
+.. class:: DriverPool(factory, size, max_uses)
+    Bounded pool of reusable WebDrivers with lease/return semantics.
+
+.. class:: SearchRateLimiter(rates)
+    Per-search-engine request spacing shared by all worker threads.
+
 .. function:: get_search_results(driver, company_name, search_url, search_query, max_trials=2)
     Perform a search using Selenium and return the results.
 
@@ -92,11 +107,11 @@ Functions
 .. function:: process_company_year(company_name, year)
     Process a single company for a specific year.
 
-.. function:: process_company(company_name)
-    Process a single company for all years.
+.. function:: load_checkpoint(checkpoint_file)
+    Load (company, year) pairs finished by an interrupted run.
 
-.. function:: process_companies(companies, results_file)
-    Process multiple companies and save results to CSV.
+.. function:: process_companies(companies, results_file, pool=None, max_workers=CRAWL_WORKERS, resume=True)
+    Process multiple companies through one (company, year) work queue and save results to CSV.
 
 Author: Shijie Zhang
 """
@@ -106,6 +121,7 @@ import time
 import datetime
 import urllib.parse
 import threading
+from contextlib import contextmanager
 from concurrent.futures import ThreadPoolExecutor, wait, as_completed
 import csv
 import pandas as pd
@@ -138,6 +154,31 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)  # Ensure output directory exists
 # Initialize global variables
 LOG_FILENAME = os.path.join(OUTPUT_DIR, f'crawler_log_{datetime.datetime.now().strftime("%Y%m%d_%H%M%S")}.txt')
 
+# Years searched for every company
+YEARS = range(2019, 2025)
+
+# One concurrency cap for the whole crawl (company x year tasks)
+CRAWL_WORKERS = int(os.getenv("CRAWL_WORKERS", "6"))
+
+# Requests per second allowed against each search engine, shared by all threads
+SEARCH_ENGINE_RPS = {
+    "www.bing.com": float(os.getenv("BING_RPS", "2")),
+}
+
+# Finished (company, year) results; lets an interrupted run resume and a run with
+# failed tasks retry them, removed once every task has finished
+CHECKPOINT_FILE = os.path.join(OUTPUT_DIR, "crawl_checkpoint.csv")
+
+# Results are appended to the checkpoint in batches of this size
+FLUSH_EVERY = 20
+
+RESULT_FIELDS = ['company', 'year', 'url', 'source']
+
+# WebDriver pool settings for DRIVER_POOL, recycled every N leases; process_companies
+# sizes its own pool to its worker count
+DRIVER_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", str(CRAWL_WORKERS)))
+DRIVER_MAX_USES = int(os.getenv("DRIVER_MAX_USES", "30"))
+
 def write_log(message: str) -> None:
     """
     Write a timestamped message to the log file.
@@ -248,6 +289,181 @@ def init_driver() -> webdriver.Chrome:
         write_log(f"Failed to initialize Chrome driver: {str(e)}")
         return None
 
+class DriverPool:
+    """
+    Bounded pool of reusable Chrome WebDrivers.
+
+    Launching Chrome costs seconds and hundreds of MB, so instead of creating a
+    driver per company-year, worker threads lease one from this pool and hand it
+    back when they are done. At most ``size`` drivers are alive at any time;
+    ``lease()`` blocks until one is free.
+
+    Args:
+        factory (callable): Zero-argument callable returning a new driver, or None
+                            on failure. Defaults to ``init_driver``.
+        size (int): Maximum number of live drivers.
+        max_uses (int): Number of leases after which a driver is quit and replaced,
+                        which keeps Chrome memory growth in check.
+
+    Lifecycle:
+        1. Drivers are launched lazily on first demand
+        2. On return, a driver is health-checked (``execute_script("return 1")``)
+        3. Drivers that fail the check, raise inside the lease, or hit
+           ``max_uses`` are quit and a fresh one is launched next time
+        4. ``close()`` quits all idle drivers (the pool can be reused afterwards)
+
+    Example:
+        >>> pool = DriverPool(size=2)
+        >>> with pool.lease() as driver:
+        ...     if driver:
+        ...         driver.get("https://example.com")
+        >>> pool.close()
+    """
+
+    def __init__(self, factory=None, size: int = DRIVER_POOL_SIZE, max_uses: int = DRIVER_MAX_USES):
+        self.factory = factory or init_driver
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._idle = []      # [(driver, uses)]
+        self.launches = 0
+        self.launch_seconds = 0.0
+        self.leases = 0
+        self.recycled = 0
+        self.discarded = 0
+
+    def _launch(self):
+        start = time.perf_counter()
+        driver = self.factory()
+        with self._lock:
+            self.launch_seconds += time.perf_counter() - start
+            if driver is not None:
+                self.launches += 1
+        return driver
+
+    @staticmethod
+    def _quit(driver) -> None:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _healthy(driver) -> bool:
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    @contextmanager
+    def lease(self):
+        """
+        Borrow a driver for the duration of a ``with`` block.
+
+        Yields:
+            webdriver.Chrome: A ready driver, or None if Chrome failed to start.
+        """
+        self._slots.acquire()
+        driver, uses = None, 0
+        try:
+            with self._lock:
+                if self._idle:
+                    driver, uses = self._idle.pop()
+                self.leases += 1
+            if driver is None:
+                driver = self._launch()
+            try:
+                yield driver
+            except Exception:
+                # Crashed mid-lease: never hand this browser to another thread
+                if driver is not None:
+                    self._quit(driver)
+                    with self._lock:
+                        self.discarded += 1
+                driver = None
+                raise
+            finally:
+                if driver is not None:
+                    self._release(driver, uses + 1)
+        finally:
+            self._slots.release()
+
+    def _release(self, driver, uses: int) -> None:
+        if uses >= self.max_uses:
+            self._quit(driver)
+            with self._lock:
+                self.recycled += 1
+        elif not self._healthy(driver):
+            write_log("Discarding unresponsive Chrome driver")
+            self._quit(driver)
+            with self._lock:
+                self.discarded += 1
+        else:
+            with self._lock:
+                self._idle.append((driver, uses))
+
+    def close(self) -> None:
+        """Quit every idle driver."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for driver, _ in idle:
+            self._quit(driver)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'launches': self.launches,
+                'leases': self.leases,
+                'recycled': self.recycled,
+                'discarded': self.discarded,
+                'launch_seconds': round(self.launch_seconds, 2),
+            }
+
+# Default pool for process_company_year calls made outside process_companies
+DRIVER_POOL = DriverPool()
+
+class SearchRateLimiter:
+    """
+    Space out requests to each search engine across all worker threads.
+
+    Every host listed in ``rates`` gets its own schedule: a caller reserves the
+    next free slot (``1 / rate`` seconds after the previous one) under a lock and
+    then sleeps until it arrives, so N threads together never exceed the rate.
+    Hosts not listed (company websites) are not throttled.
+
+    Args:
+        rates (dict): Host name -> maximum requests per second.
+
+    Example:
+        >>> limiter = SearchRateLimiter({"www.bing.com": 2})
+        >>> limiter.wait("https://www.bing.com/search?q=apple")  # returns at once
+        >>> limiter.wait("https://www.bing.com/search?q=msft")   # ~0.5s later
+    """
+
+    def __init__(self, rates: dict):
+        self.rates = {host: rate for host, rate in rates.items() if rate and rate > 0}
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> float:
+        """Block until ``url`` may be requested; returns the time slept."""
+        host = urllib.parse.urlparse(url).netloc.lower()
+        rate = self.rates.get(host)
+        if not rate:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + 1.0 / rate
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return max(delay, 0.0)
+
+SEARCH_RATE_LIMITER = SearchRateLimiter(SEARCH_ENGINE_RPS)
+
 def get_search_results(driver: webdriver.Chrome, company_name: str, search_url: str, 
                       search_query: tuple, max_trials: int = 2) -> list:
     """
@@ -274,6 +490,10 @@ def get_search_results(driver: webdriver.Chrome, company_name: str, search_url:
         4. Implement retry logic if needed
         5. Return found elements or None
 
+    Rate Limiting:
+        - Each attempt waits for a slot from ``SEARCH_RATE_LIMITER`` first
+        - Search engine hosts are throttled across all threads
+
     Retry Strategy:
         - Maximum 2 attempts by default
         - 1-second delay between retries
@@ -301,6 +521,7 @@ def get_search_results(driver: webdriver.Chrome, company_name: str, search_url:
     """
     for trial in range(max_trials):
         try:
+            SEARCH_RATE_LIMITER.wait(search_url)
             driver.get(search_url)
             wait = WebDriverWait(driver, 15)
             
@@ -803,7 +1024,7 @@ def find_pdf_in_webpage(driver: webdriver.Chrome, company_name: str, url: str, y
     
     return None
 
-def process_company_year(company_name: str, year: int) -> tuple:
+def process_company_year(company_name: str, year: int, pool: DriverPool = None) -> tuple:
     """
     Process a single company for a specific year.
 
@@ -813,11 +1034,14 @@ def process_company_year(company_name: str, year: int) -> tuple:
     Args:
         company_name (str): Name of the company to process
         year (int): Year to search for (e.g., 2024)
+        pool (DriverPool, optional): Pool to lease the WebDriver from. Defaults to
+                                     the module-level ``DRIVER_POOL``.
 
     Returns:
         tuple: A tuple containing (pdf_url, source) where:
             - pdf_url (str): URL of found PDF or None if not found
-            - source (str): Source of the URL ('Bing direct search', 'Bing webpage search', or 'Not found')
+            - source (str): Source of the URL ('Bing direct search', 'Bing webpage search', or 'Not found'),
+              or None if the search could not run (no driver, or it failed) and should be retried
 
     Raises:
         WebDriverException: If browser automation fails
@@ -825,9 +1049,9 @@ def process_company_year(company_name: str, year: int) -> tuple:
         Exception: For other unexpected errors
 
     Note:
-        - Initializes a new WebDriver for each company-year combination
+        - Leases a WebDriver from the shared pool instead of launching Chrome
         - Implements multiple search strategies in sequence
-        - Handles cleanup of WebDriver resources
+        - Returns the WebDriver to the pool (crashed drivers are discarded)
         - Logs errors and progress
 
     Example:
@@ -835,124 +1059,96 @@ def process_company_year(company_name: str, year: int) -> tuple:
         >>> if url:
         ...     print(f"Found report at {url} via {source}")
     """
-    driver = init_driver()
-    if not driver:
-        return None, None
-    
+    pool = pool or DRIVER_POOL
     try:
-        # Try Bing search
-        pdf_url = search_pdf_in_bing(driver, company_name, year)
-        if pdf_url:
-            driver.quit()
-            return pdf_url, 'Bing direct search'
-        
-        # Try Bing webpage search
-        webpage_urls = search_webpage_in_bing(driver, company_name, year)
-        if webpage_urls:
-            for url in webpage_urls:
-                pdf_url = find_pdf_in_webpage(driver, company_name, url, year)
-                if pdf_url:
-                    driver.quit()
-                    return pdf_url, 'Bing webpage search'
-                    
+        with pool.lease() as driver:
+            if not driver:
+                return None, None
+
+            # Try Bing search
+            pdf_url = search_pdf_in_bing(driver, company_name, year)
+            if pdf_url:
+                return pdf_url, 'Bing direct search'
+
+            # Try Bing webpage search
+            webpage_urls = search_webpage_in_bing(driver, company_name, year)
+            if webpage_urls:
+                for url in webpage_urls:
+                    pdf_url = find_pdf_in_webpage(driver, company_name, url, year)
+                    if pdf_url:
+                        return pdf_url, 'Bing webpage search'
+
     except Exception as e:
         write_log(f"Error processing {company_name} for {year}: {str(e)}")
-    finally:
-        driver.quit()
+        return None, None
     
     return None, 'Not found'
 
-def process_company(company_name: str) -> list:
+def load_checkpoint(checkpoint_file: str = CHECKPOINT_FILE) -> dict:
     """
-    Process a single company for all years.
-
-    This function coordinates the search for sustainability reports across multiple years
-    for a single company. It implements parallel processing for efficiency and provides
-    comprehensive progress tracking and error handling.
+    Load results finished by a previous, interrupted run.
 
     Args:
-        company_name (str): Name of the company to process
+        checkpoint_file (str): Path of the checkpoint CSV (same columns as the results file)
 
     Returns:
-        list: List of dictionaries containing results for each year, sorted by year.
-             Each dictionary contains:
-             - company (str): Company name
-             - year (int): Report year
-             - url (str): Found URL or "Not found"
-             - source (str): Source of the URL or "Not found"
-
-    Processing Strategy:
-        1. Creates a thread pool for parallel processing
-        2. Processes years 2019-2024 simultaneously
-        3. Maximum of 3 concurrent searches
-        4. Collects and sorts results by year
-        5. Saves results incrementally
-
-    Error Handling:
-        - Catches and logs all exceptions
-        - Continues processing remaining years if one fails
-        - Records "Not found" for failed searches
-        - Maintains data integrity through error states
-
-    Progress Tracking:
-        - Prints real-time status updates
-        - Logs all major operations
-        - Reports success/failure for each year
-        - Provides final processing summary
-
-    Example:
-        >>> results = process_company("Apple")
-        >>> print(f"Found {len([r for r in results if r['url'] != 'Not found'])} reports")
-        >>> for result in results:
-        ...     print(f"{result['year']}: {result['url']}")
+        dict: ``{(company, year): row}`` for every finished pair; empty if there is
+              no checkpoint or it cannot be parsed.
 
     Note:
-        The function uses ThreadPoolExecutor for parallel processing, which significantly
-        improves performance while maintaining controlled resource usage.
+        A partially written last line (crash mid-flush) is ignored.
     """
-    print(f"\nProcessing company: {company_name}")
-    results = []
-    
-    # Process all years in parallel
-    with ThreadPoolExecutor(max_workers=3) as executor:  # Process 3 years simultaneously
-        futures = {
-            executor.submit(process_company_year, company_name, year): year 
-            for year in range(2019, 2025)
-        }
-        
-        for future in as_completed(futures):
-            year = futures[future]
-            try:
-                url, source = future.result()
-                results.append({
-                    'company': company_name,
-                    'year': year,
-                    'url': url if url else 'Not found',
-                    'source': source if source else 'Not found'
-                })
-                print(f"  {year}: {'Found' if url else 'Not found'}")
-            except Exception as e:
-                write_log(f"Error processing {company_name} for {year}: {str(e)}")
-                results.append({
-                    'company': company_name,
-                    'year': year,
-                    'url': 'Not found',
-                    'source': 'Not found'
-                })
-    
-    return sorted(results, key=lambda x: x['year'])  # Return results sorted by year
-
-def process_companies(companies: list, results_file: str) -> None:
+    done = {}
+    if not os.path.exists(checkpoint_file):
+        return done
+    try:
+        with open(checkpoint_file, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                if not row.get('source'):
+                    continue
+                try:
+                    year = int(row['year'])
+                except (TypeError, ValueError):
+                    continue
+                row['year'] = year
+                done[(row['company'], year)] = row
+    except (OSError, csv.Error) as e:
+        write_log(f"Ignoring unreadable checkpoint {checkpoint_file}: {str(e)}")
+    return done
+
+def _append_rows(path: str, rows: list) -> None:
+    """Append result rows to a CSV in one write, adding the header to a new file."""
+    new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+    with open(path, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        if new_file:
+            writer.writeheader()
+        writer.writerows(rows)
+        f.flush()
+        os.fsync(f.fileno())
+
+def process_companies(companies: list, results_file: str, pool: DriverPool = None,
+                      max_workers: int = CRAWL_WORKERS, resume: bool = True,
+                      checkpoint_file: str = CHECKPOINT_FILE) -> None:
     """
     Process multiple companies and save results to CSV.
 
-    This function coordinates the processing of multiple companies and manages the
-    saving of results to a CSV file. It implements incremental saving for data safety
-    and provides comprehensive progress tracking.
+    All (company, year) pairs are put on one work queue served by ``max_workers``
+    threads, so throughput scales with the worker count instead of being capped by
+    the per-company year pool. Finished results are appended to a checkpoint file
+    in batches; a restarted run skips every pair already in it.
 
     Args:
         companies (list): List of company names to process
         results_file (str): Path to save results CSV
+        pool (DriverPool, optional): WebDriver pool reused across all tasks; its idle
+                                     drivers are quit when processing ends. Defaults
+                                     to a new pool with ``max_workers`` drivers.
+        max_workers (int, optional): Concurrent (company, year) tasks. Defaults to
+                                     ``CRAWL_WORKERS``.
+        resume (bool, optional): Skip pairs recorded in the checkpoint. With False
+                                 the checkpoint is discarded first. Defaults to True.
+        checkpoint_file (str, optional): Checkpoint path. Defaults to ``CHECKPOINT_FILE``.
 
     File Format:
         The CSV file contains the following columns:
@@ -962,53 +1158,103 @@ def process_companies(companies: list, results_file: str) -> None:
         - source: Source of the URL or "Not found"
 
     Processing Features:
-        1. Creates CSV with headers if not exists
-        2. Processes companies sequentially
-        3. Saves results after each company
-        4. Provides progress updates
-        5. Implements UTF-8 encoding
-        6. Handles file operations safely
+        1. Builds one task per (company, year) not yet in the checkpoint
+        2. Runs tasks on a single thread pool (one global concurrency cap)
+        3. Appends finished results to the checkpoint every ``FLUSH_EVERY`` tasks
+        4. Writes the results CSV once, in company order and sorted by year
+        5. Removes the checkpoint once every task has finished
 
     Data Safety:
-        - Incremental saving after each company
-        - Safe file handling with context managers
+        - The checkpoint is flushed and fsync'ed after every batch
+        - Tasks whose WebDriver failed to start (or that raised) are neither
+          checkpointed nor written to the results CSV; the checkpoint is kept,
+          so the next run retries exactly those tasks
         - UTF-8 encoding for international characters
-        - Error handling for file operations
 
-    Progress Tracking:
-        - Reports start of processing
-        - Updates after each company
-        - Shows completion status
-        - Indicates where results are saved
+    Raises:
+        ValueError: If ``pool`` has fewer drivers than ``max_workers``; the extra
+                    workers would only block waiting for a lease.
 
     Example:
         >>> companies = ["Apple", "Microsoft", "Google"]
-        >>> process_companies(companies, "sustainability_reports.csv")
-        Processing company: Apple
-        Processing company: Microsoft
-        Processing company: Google
+        >>> process_companies(companies, "sustainability_reports.csv", max_workers=8)
+        Queued 18 tasks (0 already done) on 8 workers
         Processing completed. Results saved to sustainability_reports.csv
 
     Note:
-        The function is designed for robustness and data safety, ensuring that
-        partial results are saved even if the process is interrupted.
+        Interrupting the run (Ctrl+C, crash) leaves the checkpoint in place; running
+        again with ``resume=True`` continues where it stopped.
     """
-    # Create results CSV with headers
+    if pool is None:
+        pool = DriverPool(size=max_workers)
+    elif pool.size < max_workers:
+        raise ValueError(f"DriverPool has {pool.size} drivers for {max_workers} workers")
+    companies = list(dict.fromkeys(companies))  # drop duplicate names, keep order
+    if not resume and os.path.exists(checkpoint_file):
+        os.remove(checkpoint_file)
+    done = load_checkpoint(checkpoint_file) if resume else {}
+
+    tasks = [(company, year) for company in companies for year in YEARS
+             if (company, year) not in done]
+    print(f"Queued {len(tasks)} tasks ({len(done)} already done) on {max_workers} workers")
+
+    results = dict(done)
+    pending = []
+    failed = 0
+    remaining = {company: 0 for company in companies}
+    for company, _ in tasks:
+        remaining[company] += 1
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(process_company_year, company, year, pool): (company, year)
+                for company, year in tasks
+            }
+            for future in as_completed(futures):
+                company, year = futures[future]
+                remaining[company] -= 1
+                if remaining[company] == 0:
+                    print(f"Completed processing {company}")
+                try:
+                    url, source = future.result()
+                except Exception as e:
+                    write_log(f"Error processing {company} for {year}: {str(e)}")
+                    url, source = None, None
+                # source None means the driver never started: leave it for a retry
+                if not source:
+                    failed += 1
+                    continue
+                row = {
+                    'company': company,
+                    'year': year,
+                    'url': url if url else 'Not found',
+                    'source': source
+                }
+                results[(company, year)] = row
+                pending.append(row)
+                if len(pending) >= FLUSH_EVERY:
+                    _append_rows(checkpoint_file, pending)
+                    pending = []
+    finally:
+        if pending:
+            _append_rows(checkpoint_file, pending)
+        pool.close()
+        write_log(f"Driver pool stats: {pool.stats()}")
+
+    # Bulk write, grouped by company (input order) and sorted by year
     with open(results_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=['company', 'year', 'url', 'source'])
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
         writer.writeheader()
-
-    # Process each company
-    for company in companies:
-        company_results = process_company(company)
-        
-        # Save results for this company
-        with open(results_file, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=['company', 'year', 'url', 'source'])
-            for result in company_results:
-                writer.writerow(result)
-        
-        print(f"Completed processing {company}")
+        writer.writerows(
+            results[(company, year)] for company in companies for year in YEARS
+            if (company, year) in results
+        )
+
+    if failed:
+        print(f"\n{failed} tasks failed; run again to retry them (checkpoint kept at {checkpoint_file})")
+    elif os.path.exists(checkpoint_file):
+        os.remove(checkpoint_file)
 
     print(f"\nProcessing completed. Results saved to {results_file}")
 
@@ -4,21 +4,93 @@ PDF Validation Module
 This module provides functionality to validate PDF files by checking their integrity,
 readability, and basic structure. It includes functions to scan directories of PDFs
 and generate detailed reports about their status.
+
+Scanning engine:
+    - A cheap header / ``%%EOF`` check rejects truncated downloads before PyPDF2
+      parses anything
+    - Files are checked in a process pool; a file that takes longer than
+      ``PDF_CHECK_TIMEOUT`` seconds is reported as damaged and its worker is killed,
+      so one pathological PDF cannot hang the scan
+    - Results are cached by (path, size, mtime) in ``.pdf_check_cache.v2.json``;
+      re-scans only check new or modified files. Timeouts and crashed checkers
+      are not cached, so those files are checked again on the next scan
 """
 
 import os
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
 import PyPDF2
 from tqdm import tqdm
 import pandas as pd
 from PyPDF2.errors import PdfReadError  # Import error class correctly
 
+# Seconds a single file may take before it is reported as damaged
+PDF_CHECK_TIMEOUT = float(os.getenv("PDF_CHECK_TIMEOUT", "60"))
+
+# Worker processes used to check files
+PDF_CHECK_WORKERS = int(os.getenv("PDF_CHECK_WORKERS", str(os.cpu_count() or 1)))
+
+# Cache file name (stored next to the report)
+# (v2: results of the old tail-only trailer check are not reused)
+CACHE_FILE = ".pdf_check_cache.v2.json"
+
+# Bytes read from the end of a file when looking for the xref trailer
+TRAILER_BYTES = 4096
+
+# Messages of check_many outcomes that say nothing about the file itself
+CHECK_CRASHED = "PDF checker process crashed"
+CHECK_TIMED_OUT = "Check timed out"
+CHECK_ERROR = "PDF checker error"
+INCONCLUSIVE = (CHECK_CRASHED, CHECK_TIMED_OUT, CHECK_ERROR)
+
+def _contains_eof_marker(file, chunk_size=1024 * 1024):
+    """Scan the whole file for ``%%EOF``, as PyPDF2 does before giving up."""
+    file.seek(0)
+    carry = b''
+    for chunk in iter(lambda: file.read(chunk_size), b''):
+        if b'%%EOF' in carry + chunk:
+            return True
+        carry = chunk[-4:]
+    return False
+
+def quick_check(file_path):
+    """
+    Fast structural check that does not parse the PDF.
+
+    Verifies the ``%PDF`` header and looks for ``%%EOF`` in the last
+    ``TRAILER_BYTES`` bytes. Files with trailing padding are scanned in full
+    before being rejected, so only files PyPDF2 would also refuse (no
+    ``%%EOF`` anywhere, e.g. a truncated download) are reported here.
+
+    Args:
+        file_path (str): Path to the PDF file to check
+
+    Returns:
+        str: Error message if the file is clearly damaged, None otherwise
+    """
+    size = os.path.getsize(file_path)
+    if size == 0:
+        return "File size is 0"
+    with open(file_path, 'rb') as file:
+        if file.read(4) != b'%PDF':
+            return "Not a valid PDF file format"
+        file.seek(max(0, size - TRAILER_BYTES))
+        if b'%%EOF' in file.read():
+            return None
+        if not _contains_eof_marker(file):
+            return "Missing %%EOF marker (file truncated)"
+    return None
+
 def check_pdf(file_path):
     """
     Check if a PDF file can be opened and read normally.
     
     This function performs several checks on a PDF file:
     1. Verifies file size is not zero
-    2. Validates PDF header
+    2. Validates PDF header and xref trailer (``quick_check``)
     3. Checks if file is encrypted
     4. Attempts to read pages and extract text
     
@@ -31,18 +103,12 @@ def check_pdf(file_path):
             - str/int: Number of pages if valid, error message if invalid
     """
     try:
-        # First check file size
-        file_size = os.path.getsize(file_path) / (1024 * 1024)  # MB
-        if file_size == 0:
-            return False, "File size is 0"
+        # Size, header and trailer checks before the full parse
+        error = quick_check(file_path)
+        if error:
+            return False, error
             
         with open(file_path, 'rb') as file:
-            # Check if file header is PDF format
-            header = file.read(4)
-            if header != b'%PDF':
-                return False, "Not a valid PDF file format"
-            
-            file.seek(0)  # Reset file pointer to start
             try:
                 # Try to read PDF
                 reader = PyPDF2.PdfReader(file)
@@ -76,61 +142,170 @@ def check_pdf(file_path):
     except Exception as e:
         return False, str(e)
 
-def scan_directory(root_dir):
+def _stop_pool(executor):
+    """Shut a pool down without waiting, killing workers that may be stuck."""
+    for process in list((getattr(executor, "_processes", None) or {}).values()):
+        process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+def check_many(paths, workers=PDF_CHECK_WORKERS, timeout=PDF_CHECK_TIMEOUT, check_fn=check_pdf):
+    """
+    Run ``check_fn`` over many files in a process pool with a per-file timeout.
+
+    At most ``workers`` files are in flight, so a file's timer starts when it is
+    handed to a worker. When a file overruns ``timeout`` it is reported as damaged,
+    the pool is killed and the other in-flight files are retried on a fresh pool.
+
+    Args:
+        paths (list): Files to check
+        workers (int, optional): Worker processes. Defaults to ``PDF_CHECK_WORKERS``.
+        timeout (float, optional): Seconds allowed per file. Defaults to ``PDF_CHECK_TIMEOUT``.
+        check_fn (callable, optional): Picklable ``path -> (bool, info)``. Defaults to ``check_pdf``.
+
+    Yields:
+        tuple: (path, (bool, info)) in completion order
+    """
+    workers = max(1, workers)
+    pending = deque(paths)
+    running = {}  # future -> (path, start time)
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        while pending or running:
+            while pending and len(running) < workers:
+                path = pending.popleft()
+                running[executor.submit(check_fn, path)] = (path, time.monotonic())
+
+            done, _ = wait(running, timeout=min(1.0, timeout), return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                path, _ = running.pop(future)
+                try:
+                    yield path, future.result()
+                except BrokenProcessPool:
+                    broken = True
+                    yield path, (False, CHECK_CRASHED)
+                except Exception as e:
+                    yield path, (False, f"{CHECK_ERROR}: {str(e)}")
+
+            now = time.monotonic()
+            overdue = [f for f, (_, started) in running.items() if now - started > timeout]
+            for future in overdue:
+                path, _ = running.pop(future)
+                yield path, (False, f"{CHECK_TIMED_OUT} after {timeout:.0f}s")
+
+            if overdue or broken:
+                # Retry the innocent in-flight files on a fresh pool
+                pending.extendleft(reversed([path for path, _ in running.values()]))
+                running.clear()
+                _stop_pool(executor)
+                executor = ProcessPoolExecutor(max_workers=workers)
+    finally:
+        _stop_pool(executor)
+
+def load_cache(cache_path):
+    """Load cached results: {abs path: [size, mtime_ns, is_valid, info]}."""
+    if not cache_path:
+        return {}
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_cache(cache_path, cache):
+    """Atomically write the results cache."""
+    if not cache_path:
+        return
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    tmp = cache_path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(cache, f)
+    os.replace(tmp, cache_path)
+
+def scan_directory(root_dir, workers=PDF_CHECK_WORKERS, timeout=PDF_CHECK_TIMEOUT, cache_path=None):
     """
     Scan all PDF files in a directory and check their validity.
     
-    This function recursively traverses a directory structure, identifies PDF files,
-    and validates each one. It maintains progress information and generates detailed
-    reports about the status of each file.
+    This function recursively traverses a directory structure once, identifies PDF
+    files, and validates new or modified ones in parallel. Files whose size and
+    modification time match the cache reuse their previous result; only definite
+    valid / damaged verdicts are cached, not timeouts or crashed checkers.
     
     Args:
         root_dir (str): Root directory to scan for PDF files
+        workers (int, optional): Worker processes. Defaults to ``PDF_CHECK_WORKERS``.
+        timeout (float, optional): Seconds allowed per file. Defaults to ``PDF_CHECK_TIMEOUT``.
+        cache_path (str, optional): Results cache file; None disables caching.
         
     Returns:
         tuple: (list, list) containing:
             - list: All results including both valid and invalid files
             - list: Only damaged files for further processing
     """
+    print("Starting to scan PDF files...")
+    pdf_files = []
+    for root, dirs, files in os.walk(root_dir):
+        for file in files:
+            if file.lower().endswith('.pdf'):
+                pdf_files.append(os.path.join(root, file))
+    pdf_files.sort()
+
+    cache = load_cache(cache_path)
+    stats = {}
+    checked = {}
+    to_check = []
+    for file_path in pdf_files:
+        st = os.stat(file_path)
+        key = os.path.abspath(file_path)
+        stats[file_path] = st
+        hit = cache.get(key)
+        if hit and hit[0] == st.st_size and hit[1] == st.st_mtime_ns:
+            checked[file_path] = (hit[2], hit[3])
+        else:
+            to_check.append(file_path)
+    print(f"{len(pdf_files)} PDF files, {len(pdf_files) - len(to_check)} unchanged since last scan")
+
+    if to_check:
+        with tqdm(total=len(to_check), desc="Checking Progress") as pbar:
+            for file_path, outcome in check_many(to_check, workers, timeout):
+                checked[file_path] = outcome
+                st = stats[file_path]
+                if str(outcome[1]).startswith(INCONCLUSIVE):
+                    cache.pop(os.path.abspath(file_path), None)
+                else:
+                    cache[os.path.abspath(file_path)] = [st.st_size, st.st_mtime_ns, outcome[0], outcome[1]]
+                pbar.update(1)
+
+    # Drop entries for files that no longer exist
+    live = {os.path.abspath(p) for p in pdf_files}
+    save_cache(cache_path, {k: v for k, v in cache.items() if k in live})
+
     results = []
     damaged_files = []
-    
-    # Traverse directory
-    print("Starting to scan PDF files...")
-    total_pdfs = sum([len(files) for _, _, files in os.walk(root_dir) if any(f.endswith('.pdf') for f in files)])
-    
-    with tqdm(total=total_pdfs, desc="Checking Progress") as pbar:
-        for root, dirs, files in os.walk(root_dir):
-            for file in files:
-                if file.lower().endswith('.pdf'):
-                    file_path = os.path.join(root, file)
-                    relative_path = os.path.relpath(file_path, root_dir)
-                    
-                    # Extract company name and year from filename
-                    # Example: ./downloadpdfs/Apple/2020/Apple_2020.pdf
-                    path_parts = relative_path.split(os.sep)
-                    company = path_parts[0]  # First level directory is company name
-                    year = path_parts[1]     # Second level directory is year
-                    
-                    # Check PDF
-                    is_valid, info = check_pdf(file_path)
-                    
-                    result = {
-                        'company': company,
-                        'year': year,
-                        'file_name': file,
-                        'status': 'Valid' if is_valid else 'Damaged',
-                        'pages': info if is_valid else 0,
-                        'error': '' if is_valid else info,
-                        'file_path': file_path,
-                        'file_size': os.path.getsize(file_path) / (1024 * 1024)  # File size (MB)
-                    }
-                    
-                    results.append(result)
-                    if not is_valid:
-                        damaged_files.append(result)
-                    
-                    pbar.update(1)
+    for file_path in pdf_files:
+        relative_path = os.path.relpath(file_path, root_dir)
+
+        # Extract company name and year from filename
+        # Example: ./downloadpdfs/Apple/2020/Apple_2020.pdf
+        path_parts = relative_path.split(os.sep)
+        company = path_parts[0]  # First level directory is company name
+        year = path_parts[1]     # Second level directory is year
+
+        is_valid, info = checked[file_path]
+        result = {
+            'company': company,
+            'year': year,
+            'file_name': os.path.basename(file_path),
+            'status': 'Valid' if is_valid else 'Damaged',
+            'pages': info if is_valid else 0,
+            'error': '' if is_valid else info,
+            'file_path': file_path,
+            'file_size': stats[file_path].st_size / (1024 * 1024)  # File size (MB)
+        }
+
+        results.append(result)
+        if not is_valid:
+            damaged_files.append(result)
 
     return results, damaged_files
 
@@ -163,15 +338,16 @@ def main():
         os.makedirs(root_dir, exist_ok=True)
         return
     
-    # Scan and check PDF files
-    results, damaged_files = scan_directory(root_dir)
+    # Set report file storage in b_pipeline/bresult directory
+    report_dir = os.path.join(b_pipeline_dir, "bresult")  # Use previously defined b_pipeline_dir
+    os.makedirs(report_dir, exist_ok=True)  # Ensure directory exists
+
+    # Scan and check PDF files (unchanged files come from the cache)
+    results, damaged_files = scan_directory(root_dir, cache_path=os.path.join(report_dir, CACHE_FILE))
     
     # Create results DataFrame
     df = pd.DataFrame(results)
     
-    # Set report file storage in b_pipeline/bresult directory
-    report_dir = os.path.join(b_pipeline_dir, "bresult")  # Use previously defined b_pipeline_dir
-    os.makedirs(report_dir, exist_ok=True)  # Ensure directory exists
     report_file = os.path.join(report_dir, "pdf_check_report.csv")
     print(f"Report will be saved to: {report_file}")  # Print path for debugging
     df.to_csv(report_file, index=False, encoding='utf-8')
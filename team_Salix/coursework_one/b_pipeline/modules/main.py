@@ -9,6 +9,22 @@ The module uses asyncio and aiohttp for efficient concurrent downloads, with bui
 to prevent overwhelming servers. It also includes comprehensive error handling and detailed logging
 of both successful and failed downloads.
 
+Download engine:
+    - All rows are scheduled at once with ``asyncio.gather``; a global semaphore caps the
+      number of transfers in flight (``MAX_CONCURRENT_DOWNLOADS``)
+    - ``HostLimiter`` limits concurrent requests per host and spaces request starts to the
+      same host by ``HOST_DELAY`` seconds, replacing the old fixed sleep between rows
+    - Bodies are streamed to disk in ``CHUNK_SIZE`` chunks
+    - A transfer is recorded in the download manifest as partial before it starts and as
+      complete (with its size) as soon as it finishes; the manifest is saved each time, so
+      a killed run loses at most the transfers that were in flight
+    - A partial file is resumed with an HTTP ``Range`` request only when the manifest
+      marks it as partial for the same URL
+    - Files recorded in the download manifest with a matching size (and matching sha256,
+      when the CSV has a ``sha256`` column) are skipped without touching the network
+    - An existing file with no manifest entry is verified (``%PDF`` header, ``%%EOF``
+      trailer) and recorded if valid; otherwise it is downloaded again from scratch
+
 Example:
     To run the downloader::
 
@@ -24,11 +40,15 @@ Note:
 """
 
 import os
+import json
+import hashlib
 import aiohttp
 import asyncio
 import pandas as pd
 import random
 import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
 from tqdm.asyncio import tqdm
 import nest_asyncio  # Compatible with Jupyter Notebook
 
@@ -66,9 +86,18 @@ if not required_columns.issubset(df.columns):
     raise ValueError(f"CSV file missing required columns: {required_columns - set(df.columns)}")
 
 # Limit concurrent downloads (adjustable)
-MAX_CONCURRENT_DOWNLOADS = 1  # Download one at a time
+MAX_CONCURRENT_DOWNLOADS = int(os.getenv("MAX_CONCURRENT_DOWNLOADS", "32"))  # Transfers in flight overall
+PER_HOST_LIMIT = int(os.getenv("PER_HOST_LIMIT", "4"))  # Transfers in flight per host
+HOST_DELAY = float(os.getenv("HOST_DELAY", "0.5"))  # Seconds between request starts to one host
+CHUNK_SIZE = 256 * 1024  # Bytes per disk write
 semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
 
+# Sizes of completed downloads (or ``partial`` markers for transfers in flight),
+# keyed by path relative to DOWNLOAD_ROOT
+MANIFEST_FILE = ".download_manifest.json"
+PDF_TAIL_BYTES = 4096  # Bytes searched for the %%EOF trailer of an unrecorded file
+manifest = {}
+
 # Track download times
 download_times = []
 
@@ -116,80 +145,207 @@ def log_statistics(stats_info: str) -> None:
         log_file.write(stats_info)
         log_file.write("\n" + "="*50 + "\n")
 
-async def download_pdf(session: aiohttp.ClientSession, row: pd.Series, overall_progress: tqdm) -> bool:
+class HostLimiter:
+    """
+    Per-host politeness for concurrent downloads.
+
+    Each host gets its own semaphore (at most ``per_host`` requests in flight) and
+    a schedule that starts requests to that host at least ``delay`` seconds apart.
+    Requests to different hosts never wait on each other.
+
+    Args:
+        per_host (int): Maximum concurrent requests to one host
+        delay (float): Minimum seconds between request starts to one host
+    """
+
+    def __init__(self, per_host: int = PER_HOST_LIMIT, delay: float = HOST_DELAY):
+        self.per_host = max(1, per_host)
+        self.delay = delay
+        self._semaphores = {}
+        self._next_start = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        host = urlparse(url).netloc.lower()
+        sem = self._semaphores.setdefault(host, asyncio.Semaphore(self.per_host))
+        async with sem:
+            # Reserve the next start time for this host, then wait for it
+            loop_time = asyncio.get_running_loop().time()
+            start = max(loop_time, self._next_start.get(host, loop_time))
+            self._next_start[host] = start + self.delay
+            if start > loop_time:
+                await asyncio.sleep(start - loop_time)
+            yield
+
+def _manifest_key(save_path: str) -> str:
+    return os.path.relpath(save_path, DOWNLOAD_ROOT)
+
+def _record(save_path: str, entry: dict) -> None:
+    """Update the manifest entry for ``save_path`` and save the manifest."""
+    manifest[_manifest_key(save_path)] = entry
+    save_manifest()
+
+def file_sha256(path: str) -> str:
+    """Return the hex sha256 of a file, read in CHUNK_SIZE blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_manifest() -> dict:
+    """Load the record of completed downloads from DOWNLOAD_ROOT."""
+    path = os.path.join(DOWNLOAD_ROOT, MANIFEST_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest() -> None:
+    """Atomically write the record of completed downloads."""
+    path = os.path.join(DOWNLOAD_ROOT, MANIFEST_FILE)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, path)
+
+def looks_like_pdf(path: str) -> bool:
+    """Return True if the file has a ``%PDF`` header and ``%%EOF`` near its end."""
+    try:
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            if f.read(4) != b"%PDF":
+                return False
+            f.seek(max(0, size - PDF_TAIL_BYTES))
+            return b"%%EOF" in f.read()
+    except OSError:
+        return False
+
+def is_complete(save_path: str, expected_sha256: str = None) -> bool:
+    """
+    Check whether a file was already downloaded completely.
+
+    A file counts as complete when the manifest has a finished (non-partial)
+    entry for it whose size matches the file on disk and, if
+    ``expected_sha256`` is given, whose content hash matches as well.
+    """
+    entry = manifest.get(_manifest_key(save_path))
+    if not entry or entry.get("partial") or not os.path.exists(save_path):
+        return False
+    if os.path.getsize(save_path) != entry.get("size"):
+        return False
+    if expected_sha256:
+        return file_sha256(save_path) == str(expected_sha256).lower()
+    return True
+
+async def download_pdf(session: aiohttp.ClientSession, row: dict, overall_progress: tqdm,
+                       limiter: HostLimiter = None) -> bool:
     """
     Download a single PDF file asynchronously.
 
     Args:
         session (aiohttp.ClientSession): Active aiohttp session for making requests
-        row (pd.Series): Pandas Series containing company, year, and url information
+        row (dict | pd.Series): Mapping containing company, year, and url information
+                                (optionally sha256)
         overall_progress (tqdm): Progress bar object for tracking overall download progress
+        limiter (HostLimiter, optional): Per-host concurrency/politeness limiter
 
     Returns:
-        bool: True if download was successful, False otherwise
+        bool: True if the file was downloaded or was already complete, False otherwise
 
     Note:
-        This function includes progress tracking for individual files and
-        automatically creates necessary directories for saving the PDF.
-        It also handles various error cases and logs failures appropriately.
+        - Files already recorded as complete are skipped without a request
+        - An existing file without a manifest entry is verified with
+          ``looks_like_pdf`` and recorded if valid, otherwise downloaded again
+        - A file the manifest marks as partial (same URL) is resumed with
+          ``Range: bytes=<size>-``; a 200 reply (server ignores ranges)
+          restarts it from scratch and 416 means it was already complete
+        - The manifest is saved when a transfer starts and when it completes
+        - The body is streamed to disk in ``CHUNK_SIZE`` chunks
     """
     company = row['company']
     year = str(row['year'])
     url = row['url']
-    
+    expected_sha256 = row.get('sha256') if hasattr(row, 'get') else None
+    if isinstance(expected_sha256, float):  # NaN from a partially filled column
+        expected_sha256 = None
+
     save_dir = os.path.join(DOWNLOAD_ROOT, company, year)
     save_path = os.path.join(save_dir, f"{company}_{year}.pdf")
 
-    print(f"\nAttempting to download: {company} {year}")
-    print(f"URL: {url}")
-
-    async with semaphore:
-        start_time = time.time()
-
-        try:
-            async with session.get(url, headers=HEADERS) as response:
-                if response.status == 200:
-                    total_size = int(response.headers.get("content-length", 0))
-                    chunk_size = 1024
-                    downloaded = 0
+    try:
+        if is_complete(save_path, expected_sha256):
+            overall_progress.update(1)
+            return True
+
+        key = _manifest_key(save_path)
+        entry = manifest.get(key)
+        partial = 0
+        if os.path.exists(save_path):
+            if entry is None and looks_like_pdf(save_path) and (
+                    not expected_sha256
+                    or file_sha256(save_path) == str(expected_sha256).lower()):
+                # Downloaded before the manifest existed (or before a kill)
+                _record(save_path, {"size": os.path.getsize(save_path), "url": url})
+                overall_progress.update(1)
+                return True
+            if entry and entry.get("partial") and entry.get("url") == url:
+                partial = os.path.getsize(save_path)
+
+        headers = dict(HEADERS)
+        if partial:
+            headers["Range"] = f"bytes={partial}-"
+
+        async with semaphore:
+            async with (limiter.slot(url) if limiter else _no_limit()):
+                start_time = time.time()
+                async with session.get(url, headers=headers) as response:
+                    if response.status == 416 and partial:
+                        downloaded, mode = 0, None  # Nothing left to fetch
+                    elif response.status == 206 and partial:
+                        downloaded, mode = 0, "ab"
+                    elif response.status == 200:
+                        partial, downloaded, mode = 0, 0, "wb"
+                    else:
+                        error_msg = f"HTTP {response.status}"
+                        print(f"❌ Download failed: {company} {year}: {error_msg}")
+                        log_failed_download(url, error_msg)
+                        return False
 
-                    # Create progress bar for single file
-                    with tqdm(total=total_size, unit='B', unit_scale=True, 
-                            desc=f"Downloading {company}_{year}", leave=True) as file_progress:
-                        
-                        # Only create directory on HTTP 200
+                    if mode:
+                        # Only create directory once the server answered
                         os.makedirs(save_dir, exist_ok=True)
-
-                        with open(save_path, "wb") as f:
-                            async for chunk in response.content.iter_chunked(chunk_size):
+                        _record(save_path, {"partial": True, "url": url})
+                        with open(save_path, mode) as f:
+                            async for chunk in response.content.iter_chunked(CHUNK_SIZE):
                                 f.write(chunk)
                                 downloaded += len(chunk)
-                                file_progress.update(len(chunk))
-
-                    download_time = time.time() - start_time
-                    download_times.append({
-                        'company': company,
-                        'year': year,
-                        'time': download_time,
-                        'size': total_size
-                    })
-                    
-                    speed = total_size / download_time / 1024 / 1024  # MB/s
-                    print(f"✅ Successfully downloaded: {save_path}")
-                    print(f"   Time: {download_time:.1f}s, Speed: {speed:.2f}MB/s")
-                    
-                    overall_progress.update(1)
-                    return True
-                else:
-                    error_msg = f"HTTP {response.status}"
-                    print(f"❌ Download failed: {error_msg}")
-                    log_failed_download(url, error_msg)
-                    return False
-
-        except Exception as e:
-            print(f"⚠️ Download error: {str(e)}")
-            log_failed_download(url, str(e))
-            return False
+
+        total_size = partial + downloaded
+        download_time = max(time.time() - start_time, 1e-6)
+        _record(save_path, {"size": total_size, "url": url})
+        download_times.append({
+            'company': company,
+            'year': year,
+            'time': download_time,
+            'size': downloaded
+        })
+
+        speed = downloaded / download_time / 1024 / 1024  # MB/s
+        resumed = f" (resumed at {partial} bytes)" if partial else ""
+        print(f"✅ Successfully downloaded: {save_path}{resumed} - {download_time:.1f}s, {speed:.2f}MB/s")
+        overall_progress.update(1)
+        return True
+
+    except Exception as e:
+        print(f"⚠️ Download error: {company} {year}: {str(e)}")
+        log_failed_download(url, str(e))
+        return False
+
+@asynccontextmanager
+async def _no_limit():
+    yield
 
 async def main() -> None:
     """
@@ -211,31 +367,28 @@ async def main() -> None:
         - Records of fastest and slowest downloads
 
     Note:
-        The function implements rate limiting through asyncio.sleep()
-        to prevent overwhelming target servers.
+        Rows are downloaded concurrently (``MAX_CONCURRENT_DOWNLOADS`` overall,
+        ``PER_HOST_LIMIT`` per host with ``HOST_DELAY`` between request starts)
+        to stay polite to each server without serialising the whole run.
     """
     start_time = time.time()
-    success_count = 0
-    failed_count = 0
-    
-    async with aiohttp.ClientSession() as session:
-        total_files = len(df)  # Use complete df
+    manifest.update(load_manifest())
+    rows = df.to_dict("records")  # Use complete df
+
+    limiter = HostLimiter()
+    connector = aiohttp.TCPConnector(limit=MAX_CONCURRENT_DOWNLOADS, limit_per_host=PER_HOST_LIMIT)
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=120)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        total_files = len(rows)
         
         # Create overall progress bar
         with tqdm(total=total_files, desc="Overall Progress", unit="file") as overall_progress:
-            for _, row in df.iterrows():  # Use complete df
-                try:
-                    result = await download_pdf(session, row, overall_progress)
-                    if result:
-                        success_count += 1
-                    else:
-                        failed_count += 1
-                    # Add delay to avoid too frequent requests
-                    await asyncio.sleep(1)
-                except Exception as e:
-                    print(f"Processing error: {str(e)}")
-                    failed_count += 1
-                    continue
+            results = await asyncio.gather(
+                *(download_pdf(session, row, overall_progress, limiter) for row in rows),
+                return_exceptions=True
+            )
+        success_count = sum(1 for r in results if r is True)
+        failed_count = total_files - success_count
         
         # Print statistics
         total_time = time.time() - start_time
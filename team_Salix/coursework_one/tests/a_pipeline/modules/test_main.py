@@ -2,6 +2,12 @@
 Tests for Pipeline A main module.
 """
 
+import os
+import time
+import threading
+
+import pandas as pd
+
 import pytest
 from unittest.mock import Mock, patch
 from selenium import webdriver
@@ -11,9 +17,21 @@ from a_pipeline.modules.main import (
     check_pdf_url,
     check_url_year,
     find_pdf_in_webpage,
-    get_search_results
+    get_search_results,
+    process_companies,
+    DriverPool,
+    SearchRateLimiter,
+    YEARS
 )
 
+
+@pytest.fixture(autouse=True)
+def crawler_log(tmp_path, monkeypatch):
+    """Write crawler log lines under tmp_path instead of a_pipeline/aresult."""
+    path = tmp_path / "crawler_log.txt"
+    monkeypatch.setattr("a_pipeline.modules.main.LOG_FILENAME", str(path))
+    return path
+
 def test_check_company_name_in_url():
     """Test company name detection in URLs."""
     test_cases = [
@@ -109,4 +127,170 @@ def test_get_search_results(mock_driver):
     assert results is not None, "Expected search results but got None"
     assert len(results) == 2, "Expected 2 search results"
     assert results[0].text == "Result 1"
-    assert results[1].text == "Result 2" 
\ No newline at end of file
+    assert results[1].text == "Result 2" 
+
+class FakeDriver:
+    """Stand-in for webdriver.Chrome that records its lifecycle."""
+    def __init__(self, launch_delay=0.0):
+        time.sleep(launch_delay)
+        self.quit_called = False
+        self.healthy = True
+    def execute_script(self, script):
+        if not self.healthy:
+            raise Exception("chrome not reachable")
+        return 1
+    def quit(self):
+        self.quit_called = True
+
+def test_driver_pool_reuses_and_recycles():
+    created = []
+    def factory():
+        created.append(FakeDriver())
+        return created[-1]
+    pool = DriverPool(factory, size=1, max_uses=3)
+
+    for _ in range(4):
+        with pool.lease() as driver:
+            assert driver is created[-1]
+
+    # First driver recycled after 3 leases, second launched for the 4th
+    assert len(created) == 2
+    assert created[0].quit_called
+    assert pool.stats()['recycled'] == 1
+
+def test_driver_pool_discards_crashed_drivers():
+    created = []
+    def factory():
+        created.append(FakeDriver())
+        return created[-1]
+    pool = DriverPool(factory, size=1, max_uses=100)
+
+    with pytest.raises(RuntimeError):
+        with pool.lease():
+            raise RuntimeError("tab crashed")
+    with pool.lease() as driver:
+        driver.healthy = False          # fails the health check on return
+    with pool.lease() as driver:
+        assert driver is created[2]
+    assert created[0].quit_called and created[1].quit_called
+    assert pool.stats()['discarded'] == 2
+
+def test_driver_pool_is_bounded():
+    live, peak = [0], [0]
+    lock = threading.Lock()
+    pool = DriverPool(FakeDriver, size=2)
+
+    def work(_):
+        with pool.lease():
+            with lock:
+                live[0] += 1
+                peak[0] = max(peak[0], live[0])
+            time.sleep(0.01)
+            with lock:
+                live[0] -= 1
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=6) as ex:
+        list(ex.map(work, range(12)))
+    assert peak[0] <= 2
+    assert pool.stats()['launches'] <= 2
+
+def test_process_companies_draws_from_pool(temp_dir):
+    pool = DriverPool(FakeDriver, size=3)
+    with patch('a_pipeline.modules.main.search_pdf_in_bing', return_value="http://x/r.pdf"):
+        process_companies(["Example Corp"], os.path.join(temp_dir, "results.csv"), pool,
+                          max_workers=3, checkpoint_file=os.path.join(temp_dir, "checkpoint.csv"))
+    assert pool.stats()['launches'] <= 3
+    assert pool.stats()['leases'] == 6
+
+def test_process_companies_rejects_undersized_pool(temp_dir):
+    with pytest.raises(ValueError):
+        process_companies(["Apple"], os.path.join(temp_dir, "results.csv"), DriverPool(FakeDriver, size=2),
+                          max_workers=4, checkpoint_file=os.path.join(temp_dir, "checkpoint.csv"))
+
+@pytest.mark.integration
+def test_benchmark_driver_launch_overhead():
+    """Driver-launch overhead per 100 lookups: one Chrome each vs. pooled."""
+    launch_delay = 0.02       # stand-in for Chrome start-up cost
+    lookups = 100
+
+    start = time.perf_counter()
+    for _ in range(lookups):
+        driver = FakeDriver(launch_delay)
+        driver.quit()
+    before = time.perf_counter() - start
+
+    pool = DriverPool(lambda: FakeDriver(launch_delay), size=3, max_uses=30)
+    for _ in range(lookups):
+        with pool.lease():
+            pass
+    after = pool.stats()['launch_seconds']
+
+    print(f"\nlaunch overhead per {lookups} lookups: "
+          f"before {before:.2f}s ({lookups} launches), "
+          f"after {after:.2f}s ({pool.stats()['launches']} launches)")
+    assert pool.stats()['launches'] < lookups
+    assert after < before
+
+def test_search_rate_limiter_spaces_requests_per_engine():
+    limiter = SearchRateLimiter({"www.bing.com": 20})
+    start = time.perf_counter()
+    for _ in range(5):
+        limiter.wait("https://www.bing.com/search?q=x")
+    assert time.perf_counter() - start >= 0.19          # 4 gaps of 50ms
+    assert limiter.wait("https://example.com/report.pdf") == 0.0
+
+def test_process_companies_resumes_from_checkpoint(temp_dir):
+    results_file = os.path.join(temp_dir, "results.csv")
+    checkpoint = os.path.join(temp_dir, "checkpoint.csv")
+    pool = DriverPool(FakeDriver, size=4)
+
+    # A previous run finished Apple 2019 before being interrupted
+    with open(checkpoint, 'w', newline='', encoding='utf-8') as f:
+        f.write("company,year,url,source\nApple,2019,http://a/2019.pdf,Bing direct search\n")
+
+    calls = []
+    def fake_year(company, year, pool=None):
+        calls.append((company, year))
+        return (f"http://x/{company}-{year}.pdf", 'Bing direct search') if year == 2024 else (None, 'Not found')
+
+    with patch('a_pipeline.modules.main.process_company_year', side_effect=fake_year):
+        process_companies(["Apple", "Microsoft"], results_file, pool,
+                          max_workers=4, checkpoint_file=checkpoint)
+
+    assert ("Apple", 2019) not in calls
+    assert len(calls) == 11
+    assert not os.path.exists(checkpoint)               # removed after a full run
+
+    df = pd.read_csv(results_file)
+    assert list(df['company']) == ["Apple"] * 6 + ["Microsoft"] * 6
+    assert list(df['year'][:6]) == list(YEARS)
+    assert df['url'][0] == "http://a/2019.pdf"
+    assert (df['url'] != "Not found").sum() == 3
+
+def test_process_companies_keeps_checkpoint_for_failed_tasks(temp_dir):
+    results_file = os.path.join(temp_dir, "results.csv")
+    checkpoint = os.path.join(temp_dir, "checkpoint.csv")
+    driver_ok = [False]
+
+    calls = []
+    def fake_year(company, year, pool=None):
+        calls.append(year)
+        if year == 2020 and not driver_ok[0]:
+            return None, None                           # Chrome failed to start
+        return None, 'Not found'
+
+    with patch('a_pipeline.modules.main.process_company_year', side_effect=fake_year):
+        process_companies(["Apple"], results_file, DriverPool(FakeDriver, size=2),
+                          max_workers=2, checkpoint_file=checkpoint)
+        assert os.path.exists(checkpoint)
+        assert 2020 not in list(pd.read_csv(results_file)['year'])
+
+        calls.clear()
+        driver_ok[0] = True
+        process_companies(["Apple"], results_file, DriverPool(FakeDriver, size=2),
+                          max_workers=2, checkpoint_file=checkpoint)
+
+    assert calls == [2020]
+    assert not os.path.exists(checkpoint)
+    assert list(pd.read_csv(results_file)['year']) == list(YEARS)
@@ -0,0 +1,96 @@
+"""
+Tests for Pipeline B PDF validation.
+"""
+
+import os
+import time
+
+from b_pipeline.modules import check_pdf
+from b_pipeline.modules.check_pdf import check_many, quick_check, scan_directory
+
+VALID_PDF = (
+    b"%PDF-1.4\n"
+    b"1 0 obj\n<<\n/Type /Catalog\n/Pages 2 0 R\n>>\nendobj\n"
+    b"2 0 obj\n<<\n/Type /Pages\n/Kids [3 0 R]\n/Count 1\n>>\nendobj\n"
+    b"3 0 obj\n<<\n/Type /Page\n/Parent 2 0 R\n/MediaBox [0 0 612 792]\n>>\nendobj\n"
+    b"xref\n0 4\n"
+    b"0000000000 65535 f\n"
+    b"0000000009 00000 n\n"
+    b"0000000058 00000 n\n"
+    b"0000000115 00000 n\n"
+    b"trailer\n<<\n/Size 4\n/Root 1 0 R\n>>\n"
+    b"startxref\n186\n%%EOF\n"
+)
+
+def _write(root, company, year, content):
+    folder = root / company / str(year)
+    folder.mkdir(parents=True, exist_ok=True)
+    path = folder / f"{company}_{year}.pdf"
+    path.write_bytes(content)
+    return path
+
+def test_quick_check_rejects_truncated_file(tmp_path):
+    path = _write(tmp_path, "Apple", 2024, VALID_PDF[:60])
+    assert "truncated" in quick_check(str(path))
+    assert quick_check(str(_write(tmp_path, "Apple", 2023, VALID_PDF))) is None
+    assert quick_check(str(_write(tmp_path, "Apple", 2022, b"<html>"))) == "Not a valid PDF file format"
+
+def test_quick_check_accepts_trailing_padding(tmp_path):
+    """PyPDF2 searches the whole file for %%EOF, so padding after it is fine."""
+    path = _write(tmp_path, "Apple", 2024, VALID_PDF + b"\0" * 5000)
+    assert quick_check(str(path)) is None
+    assert check_pdf.check_pdf(str(path)) == (True, 1)
+
+def _slow_check(path):
+    if "slow" in path:
+        time.sleep(30)
+    return True, 1
+
+def test_check_many_times_out_hung_files(tmp_path):
+    paths = [str(tmp_path / name) for name in ("a.pdf", "slow.pdf", "b.pdf", "c.pdf")]
+    start = time.monotonic()
+    results = dict(check_many(paths, workers=2, timeout=1, check_fn=_slow_check))
+    assert time.monotonic() - start < 10
+    assert results[paths[1]][0] is False and "timed out" in results[paths[1]][1]
+    assert all(results[p] == (True, 1) for p in paths if "slow" not in p)
+
+def test_scan_directory_reuses_cache(tmp_path, monkeypatch):
+    root = tmp_path / "reports"
+    _write(root, "Apple", 2024, VALID_PDF)
+    _write(root, "Beta", 2023, b"%PDF-1.4\nbroken")
+    cache_path = str(tmp_path / "cache.json")
+
+    results, damaged = scan_directory(str(root), workers=2, cache_path=cache_path)
+    assert len(results) == 2
+    assert [d['company'] for d in damaged] == ["Beta"]
+
+    # Unchanged files are not checked again
+    def fail(*args, **kwargs):
+        raise AssertionError("unchanged file was re-checked")
+    monkeypatch.setattr(check_pdf, "check_many", fail)
+    again, damaged_again = scan_directory(str(root), workers=2, cache_path=cache_path)
+    assert again == results and damaged_again == damaged
+
+def test_scan_directory_rechecks_timed_out_files(tmp_path, monkeypatch):
+    root = tmp_path / "reports"
+    _write(root, "Apple", 2024, VALID_PDF)
+    _write(root, "Beta", 2023, VALID_PDF)
+    cache_path = str(tmp_path / "cache.json")
+
+    checked = []
+    def flaky_check_many(paths, workers, timeout):
+        for path in paths:
+            checked.append(os.path.basename(path))
+            if "Beta" in path and len(checked) <= 2:
+                yield path, (False, f"{check_pdf.CHECK_TIMED_OUT} after 1s")
+            else:
+                yield path, (True, 1)
+    monkeypatch.setattr(check_pdf, "check_many", flaky_check_many)
+
+    _, damaged = scan_directory(str(root), cache_path=cache_path)
+    assert [d['company'] for d in damaged] == ["Beta"]
+
+    # Only the timed-out file is checked again, and now passes
+    _, damaged = scan_directory(str(root), cache_path=cache_path)
+    assert checked == ["Apple_2024.pdf", "Beta_2023.pdf", "Beta_2023.pdf"]
+    assert damaged == []
@@ -56,6 +56,9 @@ def mock_environment(mock_csv_file, tmp_path, monkeypatch):
     # Create the download directory
     downloads_dir = Path(download_path)
     downloads_dir.mkdir(exist_ok=True)
+
+    # Keep the failure log out of the source tree
+    monkeypatch.setattr('b_pipeline.modules.main.LOG_FILE', str(tmp_path / "download_failed.txt"))
     
     yield
 
@@ -109,7 +112,8 @@ async def test_download_pdf(tmp_path):
     progress = tqdm(total=1)
     
     with patch('os.makedirs') as mock_makedirs, \
-         patch('builtins.open', mock_open()) as mock_file:
+         patch('builtins.open', mock_open()) as mock_file, \
+         patch('b_pipeline.modules.main.save_manifest'):
         result = await download_pdf(mock_session, row, progress)
         assert result is True, "Download should succeed"
         mock_makedirs.assert_called()
@@ -133,7 +137,7 @@ async def test_download_pdf(tmp_path):
 
 @patch('builtins.open', new_callable=mock_open)
 def test_log_failed_download(mock_file):
-    from b_pipeline.modules.main import log_failed_download
+    from b_pipeline.modules.main import log_failed_download, LOG_FILE
     
     # Test data
     url = "http://example.com/test.pdf"
@@ -143,14 +147,15 @@ def test_log_failed_download(mock_file):
     log_failed_download(url, reason)
     
     # Verify file was opened correctly
-    mock_file.assert_called_once_with("download_failed.txt", "a", encoding="utf-8")
+    assert os.path.basename(LOG_FILE) == "download_failed.txt"
+    mock_file.assert_called_once_with(LOG_FILE, "a", encoding="utf-8")
     
     # Verify write call
     mock_file().write.assert_called_once_with(f"Failed: {url} | Reason: {reason}\n")
 
 @patch('builtins.open', new_callable=mock_open)
 def test_log_statistics(mock_file):
-    from b_pipeline.modules.main import log_statistics
+    from b_pipeline.modules.main import log_statistics, LOG_FILE
     
     # Test data
     stats_info = "Test Statistics"
@@ -159,7 +164,8 @@ def test_log_statistics(mock_file):
     log_statistics(stats_info)
     
     # Verify file was opened correctly
-    mock_file.assert_called_once_with("download_failed.txt", "a", encoding="utf-8")
+    assert os.path.basename(LOG_FILE) == "download_failed.txt"
+    mock_file.assert_called_once_with(LOG_FILE, "a", encoding="utf-8")
     
     # Verify write calls
     expected_calls = [
@@ -172,4 +178,95 @@ def test_log_statistics(mock_file):
     
     assert mock_file().write.call_count == len(expected_calls)
     for call, expected in zip(mock_file().write.call_args_list, expected_calls):
-        assert call[0][0] == expected 
\ No newline at end of file
+        assert call[0][0] == expected 
+
+
+class RecordingSession(MockClientSession):
+    """MockClientSession that records request headers."""
+    def __init__(self, response=None):
+        super().__init__(response)
+        self.requests = []
+
+    def get(self, url, **kwargs):
+        self.requests.append(kwargs.get("headers", {}))
+        return MockGet(self.response)
+
+@pytest.mark.asyncio
+async def test_download_pdf_resumes_partial_file(tmp_path):
+    from b_pipeline.modules import main
+
+    save_dir = tmp_path / "Test Company" / "2024"
+    save_dir.mkdir(parents=True)
+    (save_dir / "Test Company_2024.pdf").write_bytes(b"%PDF-1.4 ")
+
+    row = {'company': "Test Company", 'year': 2024, 'url': "http://example.com/test.pdf"}
+    session = RecordingSession(MockResponse(status=206, content=b"rest of file"))
+    key = os.path.join("Test Company", "2024", "Test Company_2024.pdf")
+    with patch.object(main, 'DOWNLOAD_ROOT', str(tmp_path)), \
+         patch.dict(main.manifest, {key: {"partial": True, "url": row['url']}}, clear=True):
+        assert await main.download_pdf(session, row, tqdm(total=1)) is True
+        assert session.requests[0]["Range"] == "bytes=9-"
+        assert (save_dir / "Test Company_2024.pdf").read_bytes() == b"%PDF-1.4 rest of file"
+
+        # Now recorded as complete: no further request is made
+        assert await main.download_pdf(session, row, tqdm(total=1)) is True
+        assert len(session.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_download_pdf_saves_manifest_per_download(tmp_path):
+    from b_pipeline.modules import main
+
+    row = {'company': "Test Company", 'year': 2024, 'url': "http://example.com/test.pdf"}
+    session = RecordingSession(MockResponse(content=b"%PDF-1.4 body %%EOF"))
+    with patch.object(main, 'DOWNLOAD_ROOT', str(tmp_path)), patch.dict(main.manifest, clear=True):
+        assert await main.download_pdf(session, row, tqdm(total=1)) is True
+        saved = main.load_manifest()
+
+    key = os.path.join("Test Company", "2024", "Test Company_2024.pdf")
+    assert saved == {key: {"size": 19, "url": row['url']}}
+
+
+@pytest.mark.asyncio
+async def test_download_pdf_verifies_unrecorded_files(tmp_path):
+    from b_pipeline.modules import main
+
+    save_dir = tmp_path / "Test Company" / "2024"
+    save_dir.mkdir(parents=True)
+    pdf = save_dir / "Test Company_2024.pdf"
+    key = os.path.join("Test Company", "2024", "Test Company_2024.pdf")
+    row = {'company': "Test Company", 'year': 2024, 'url': "http://example.com/test.pdf"}
+
+    with patch.object(main, 'DOWNLOAD_ROOT', str(tmp_path)), patch.dict(main.manifest, clear=True):
+        # A complete file from an earlier run is recorded without a request
+        pdf.write_bytes(b"%PDF-1.4 body %%EOF\n")
+        session = RecordingSession()
+        assert await main.download_pdf(session, row, tqdm(total=1)) is True
+        assert session.requests == []
+        assert main.load_manifest()[key] == {"size": 20, "url": row['url']}
+
+        # A truncated file is downloaded again from scratch, not resumed
+        main.manifest.clear()
+        pdf.write_bytes(b"%PDF-1.4 trunc")
+        session = RecordingSession(MockResponse(content=b"%PDF-1.4 fresh %%EOF"))
+        assert await main.download_pdf(session, row, tqdm(total=1)) is True
+        assert "Range" not in session.requests[0]
+        assert pdf.read_bytes() == b"%PDF-1.4 fresh %%EOF"
+
+
+@pytest.mark.asyncio
+async def test_host_limiter_spaces_same_host_only():
+    from b_pipeline.modules.main import HostLimiter
+
+    limiter = HostLimiter(per_host=2, delay=0.05)
+    starts = {}
+
+    async def hit(url, i):
+        async with limiter.slot(url):
+            starts[(url, i)] = asyncio.get_running_loop().time()
+
+    await asyncio.gather(*(hit("http://a.com/x.pdf", i) for i in range(3)),
+                         hit("http://b.com/y.pdf", 0))
+    a = sorted(t for (u, _), t in starts.items() if "a.com" in u)
+    assert a[1] - a[0] >= 0.045 and a[2] - a[1] >= 0.045
+    assert starts[("http://b.com/y.pdf", 0)] - a[0] < 0.04
@@ -3,6 +3,7 @@ Tests for the MinIO upload module.
 """
 
 import os
+import hashlib
 import pytest
 import boto3
 import psycopg2
@@ -12,7 +13,10 @@ from upload_to_minio import (
     create_minio_client,
     sanitize_name,
     insert_into_db,
-    upload_to_minio
+    insert_many_into_db,
+    upload_to_minio,
+    compute_etag,
+    sync_reports
 )
 
 def test_get_config():
@@ -101,4 +105,97 @@ def test_insert_into_db(mock_connect):
     # Verify database operations
     assert mock_cursor.execute.call_count >= 3  # Schema creation, table creation, and insert
     mock_conn.commit.assert_called()
-    mock_conn.close.assert_called_once() 
\ No newline at end of file
+    mock_conn.close.assert_called_once() 
+
+def test_compute_etag_matches_s3_multipart_format(tmp_path):
+    """Single-part ETag is the MD5; multipart is MD5 of part digests plus part count."""
+    small = tmp_path / "small.pdf"
+    small.write_bytes(b"abc")
+    assert compute_etag(str(small)) == hashlib.md5(b"abc").hexdigest()
+
+    big = tmp_path / "big.pdf"
+    big.write_bytes(b"x" * 10)
+    parts = [hashlib.md5(b"x" * 4).digest()] * 2 + [hashlib.md5(b"x" * 2).digest()]
+    expected = hashlib.md5(b"".join(parts)).hexdigest() + "-3"
+    assert compute_etag(str(big), chunk_size=4) == expected
+
+def _make_report(root, security, year, content):
+    folder = root / security / str(year)
+    folder.mkdir(parents=True, exist_ok=True)
+    path = folder / f"{security}_{year}.pdf"
+    path.write_bytes(content)
+    return path
+
+@patch('upload_to_minio.insert_many_into_db', return_value=0)
+def test_sync_reports_uploads_only_new_or_changed(mock_insert, tmp_path):
+    """Unchanged objects (same size and ETag) are skipped."""
+    import pandas as pd
+    _make_report(tmp_path, "Apple Inc", 2023, b"same")
+    _make_report(tmp_path, "Apple Inc", 2024, b"changed locally")
+    _make_report(tmp_path, "Beta Co", 2024, b"brand new")
+
+    remote_objects = [
+        {"Key": "Apple_Inc/2023/Apple Inc_2023.pdf", "ETag": f'"{hashlib.md5(b"same").hexdigest()}"', "Size": 4},
+        {"Key": "Apple_Inc/2024/Apple Inc_2024.pdf", "ETag": '"stale"', "Size": 15},
+    ]
+    mock_client = Mock()
+    mock_client.get_paginator.return_value.paginate.return_value = [{"Contents": remote_objects}]
+    config = {
+        'local_folder': str(tmp_path),
+        'minio': {'endpoint': 'http://localhost:9000', 'bucket_name': 'test-bucket'}
+    }
+    df_sources = pd.DataFrame({'company': ["Beta Co"], 'year': [2024], 'url': ["http://b/r.pdf"]})
+
+    stats = sync_reports(config, mock_client, df_sources, max_workers=2)
+
+    uploaded = sorted(call.args[2] for call in mock_client.upload_file.call_args_list)
+    assert uploaded == ["Apple_Inc/2024/Apple Inc_2024.pdf", "Beta_Co/2024/Beta Co_2024.pdf"]
+    assert stats['unchanged'] == 1 and stats['uploaded'] == 2
+    records = sorted(mock_insert.call_args.args[1])
+    assert records[1] == ("Beta Co", 2024, "http://localhost:9000/test-bucket/Beta_Co/2024/Beta Co_2024.pdf", "http://b/r.pdf")
+    # the unchanged report is still passed on, so a missing DB row gets filled in
+    assert mock_insert.call_args.kwargs['existing'] == [
+        ("Apple Inc", 2023, "http://localhost:9000/test-bucket/Apple_Inc/2023/Apple Inc_2023.pdf", None)]
+
+@patch('upload_to_minio.execute_values')
+@patch('psycopg2.connect')
+def test_insert_many_into_db_single_batch(mock_connect, mock_execute_values):
+    """All records go through one connection and one upsert statement."""
+    mock_conn = Mock()
+    mock_conn.cursor.return_value.__enter__ = Mock(return_value=Mock())
+    mock_conn.cursor.return_value.__exit__ = Mock(return_value=False)
+    mock_connect.return_value = mock_conn
+    config = {'postgres': {'host': 'h', 'port': '1', 'database': 'd', 'user': 'u', 'password': 'p'}}
+
+    written = insert_many_into_db(config, [
+        ("A", 2023, "m1", "s1"),
+        ("A", 2024, "m2", None),
+        ("A", 2024, "m3", None),   # duplicate key: last one wins
+    ])
+
+    assert written == 2
+    assert mock_connect.call_count == 1
+    assert mock_execute_values.call_count == 2   # company_static + csr_reports
+    report_rows = mock_execute_values.call_args_list[1].args[2]
+    assert [r[2] for r in report_rows] == ["m1", "m3"]
+    mock_conn.commit.assert_called_once()
+    mock_conn.close.assert_called_once()
+
+@patch('upload_to_minio.execute_values')
+@patch('psycopg2.connect')
+def test_insert_many_into_db_fills_missing_rows_for_existing_reports(mock_connect, mock_execute_values):
+    """Reports already in MinIO are inserted without overwriting rows that exist."""
+    mock_conn = Mock()
+    mock_conn.cursor.return_value.__enter__ = Mock(return_value=Mock())
+    mock_conn.cursor.return_value.__exit__ = Mock(return_value=False)
+    mock_connect.return_value = mock_conn
+    config = {'postgres': {'host': 'h', 'port': '1', 'database': 'd', 'user': 'u', 'password': 'p'}}
+
+    written = insert_many_into_db(config, [], existing=[("A", 2023, "m1", None), ("B", 2023, "m2", None)])
+
+    assert written == 2
+    assert mock_execute_values.call_count == 2   # company_static + insert-if-missing
+    sql, rows = mock_execute_values.call_args_list[1].args[1:3]
+    assert "DO NOTHING" in sql
+    assert [r[2] for r in rows] == ["m1", "m2"]
+    mock_conn.commit.assert_called_once()
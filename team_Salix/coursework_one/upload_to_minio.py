@@ -4,14 +4,39 @@ MinIO Upload Module
 This module handles the upload of CSR report PDFs to MinIO storage.
 It includes functionality for connecting to MinIO, creating buckets,
 and uploading files with appropriate metadata.
+
+``main`` runs an incremental sync: local files are compared with the bucket's
+ETags and sizes, only new or changed PDFs are uploaded (in parallel, multipart
+for large files), and the matching PostgreSQL rows are upserted in one batch.
+Re-running over an unchanged folder only lists the bucket, reads a local ETag
+cache and inserts any report rows still missing from PostgreSQL.
 """
 
 import os
+import json
+import hashlib
 import boto3
 import psycopg2
 import datetime
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import NoCredentialsError
+from psycopg2.extras import execute_values
+
+# Multipart settings; ETags of local files are computed with the same part size
+MULTIPART_CHUNKSIZE = 8 * 1024 * 1024
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=MULTIPART_CHUNKSIZE,
+    multipart_chunksize=MULTIPART_CHUNKSIZE,
+    max_concurrency=4
+)
+
+# Parallel file uploads
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", "8"))
+
+# Local ETag cache (relative path -> [size, mtime_ns, etag]) kept in the reports folder
+ETAG_CACHE_FILE = ".etag_cache.json"
 
 def get_config():
     """
@@ -153,6 +178,105 @@ def insert_into_db(config, security, report_year, minio_url, source_url):
     except Exception as e:
         print(f"❌ PostgreSQL Error: {str(e)}")
 
+CREATE_TABLES_SQL = """
+    CREATE SCHEMA IF NOT EXISTS csr_reporting;
+
+    CREATE TABLE IF NOT EXISTS csr_reporting.csr_reports (
+        "id" SERIAL PRIMARY KEY,
+        "security" TEXT NOT NULL,
+        "report_year" INTEGER NOT NULL,
+        "minio_path" TEXT NOT NULL,
+        "source_url" TEXT,
+        "ingestion_timestamp" TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE("security", "report_year")
+    );
+"""
+
+def _report_rows(records, ingestion_timestamp):
+    """One row per (security, report_year): ON CONFLICT cannot touch a row twice."""
+    latest = {}
+    for security, report_year, minio_url, source_url in records:
+        latest[(security, report_year)] = (minio_url, source_url)
+    return [
+        (security, report_year, minio_url, source_url, ingestion_timestamp)
+        for (security, report_year), (minio_url, source_url) in latest.items()
+    ]
+
+def insert_many_into_db(config, records, existing=()):
+    """
+    Upsert many CSR report records over a single connection.
+
+    The schema DDL runs once, missing companies are added to ``company_static``
+    and all report rows are written with one ``execute_values`` statement each,
+    all in a single transaction.
+
+    Args:
+        config (dict): Configuration dictionary containing database settings
+        records (list): Tuples of (security, report_year, minio_url, source_url)
+            for reports uploaded in this run; existing rows are overwritten
+        existing (list, optional): Same tuples for reports already in MinIO;
+            only inserted if their row is missing, so a sync whose database
+            write failed earlier is recorded on the next run
+
+    Returns:
+        int: Number of records written (0 on error)
+    """
+    ingestion_timestamp = datetime.datetime.now()
+    rows = _report_rows(records, ingestion_timestamp)
+    uploaded_keys = {(row[0], row[1]) for row in rows}
+    existing_rows = [
+        row for row in _report_rows(existing, ingestion_timestamp)
+        if (row[0], row[1]) not in uploaded_keys
+    ]
+    if not rows and not existing_rows:
+        return 0
+
+    conn = None
+    try:
+        conn = psycopg2.connect(
+            host=config['postgres']['host'],
+            port=config['postgres']['port'],
+            database=config['postgres']['database'],
+            user=config['postgres']['user'],
+            password=config['postgres']['password']
+        )
+        with conn.cursor() as cursor:
+            cursor.execute(CREATE_TABLES_SQL)
+            execute_values(cursor, """
+                INSERT INTO csr_reporting.company_static (security)
+                VALUES %s
+                ON CONFLICT DO NOTHING
+            """, sorted({(row[0],) for row in rows + existing_rows}))
+            if rows:
+                execute_values(cursor, """
+                    INSERT INTO csr_reporting.csr_reports (security, report_year, minio_path, source_url, ingestion_timestamp)
+                    VALUES %s
+                    ON CONFLICT (security, report_year)
+                    DO UPDATE SET
+                        minio_path = EXCLUDED.minio_path,
+                        source_url = EXCLUDED.source_url,
+                        ingestion_timestamp = EXCLUDED.ingestion_timestamp;
+                """, rows, page_size=1000)
+            if existing_rows:
+                execute_values(cursor, """
+                    INSERT INTO csr_reporting.csr_reports (security, report_year, minio_path, source_url, ingestion_timestamp)
+                    VALUES %s
+                    ON CONFLICT (security, report_year) DO NOTHING;
+                """, existing_rows, page_size=1000)
+        conn.commit()
+        written = len(rows) + len(existing_rows)
+        print(f"✅ Successfully recorded {written} reports in PostgreSQL")
+        return written
+
+    except Exception as e:
+        if conn is not None:
+            conn.rollback()
+        print(f"❌ PostgreSQL Error: {str(e)}")
+        return 0
+    finally:
+        if conn is not None:
+            conn.close()
+
 def upload_to_minio(config, s3_client, file_path, security, report_year, df_sources=None):
     """
     Upload a file to MinIO storage.
@@ -194,6 +318,205 @@ def upload_to_minio(config, s3_client, file_path, security, report_year, df_sour
     except NoCredentialsError:
         print("❌ Cannot access MinIO, please check credentials!")
 
+def build_source_index(df_sources):
+    """
+    Build a (company, year) -> source URL lookup once, instead of filtering
+    the DataFrame for every file.
+
+    Args:
+        df_sources (pd.DataFrame): DataFrame with company, year and url columns, or None
+
+    Returns:
+        dict: {(company, year): url}; the first URL wins for duplicate pairs
+    """
+    if df_sources is None:
+        return {}
+    index = {}
+    for company, year, url in zip(df_sources['company'], df_sources['year'], df_sources['url']):
+        try:
+            index.setdefault((company, int(year)), url)
+        except (TypeError, ValueError):
+            continue
+    return index
+
+def scan_local_reports(local_folder):
+    """
+    Walk ``<local_folder>/<security>/<year>/*.pdf``.
+
+    Args:
+        local_folder (str): Root of the downloaded reports
+
+    Returns:
+        list: Dicts with security, report_year, file_path, minio_path and size
+    """
+    reports = []
+    for security in sorted(os.listdir(local_folder)):
+        security_path = os.path.join(local_folder, security)
+        if not os.path.isdir(security_path):
+            continue
+        for year in sorted(os.listdir(security_path)):
+            year_path = os.path.join(security_path, year)
+            if not os.path.isdir(year_path):
+                continue
+            if not year.isdigit():
+                print(f"⚠️ Found non-numeric year `{year}`, skipping...")
+                continue
+            for file_name in sorted(os.listdir(year_path)):
+                if not file_name.lower().endswith(".pdf"):
+                    continue
+                file_path = os.path.normpath(os.path.join(year_path, file_name))
+                reports.append({
+                    'security': security,
+                    'report_year': int(year),
+                    'file_path': file_path,
+                    'minio_path': f"{sanitize_name(security)}/{year}/{file_name}",
+                    'size': os.path.getsize(file_path)
+                })
+    return reports
+
+def list_remote_objects(s3_client, bucket_name):
+    """
+    List every object in the bucket.
+
+    Returns:
+        dict: {key: (etag, size)} with the ETag quotes stripped; empty if the
+              bucket does not exist yet
+    """
+    remote = {}
+    try:
+        paginator = s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket_name):
+            for obj in page.get("Contents", []):
+                remote[obj["Key"]] = (obj["ETag"].strip('"'), obj["Size"])
+    except s3_client.exceptions.NoSuchBucket:
+        pass
+    return remote
+
+def compute_etag(file_path, chunk_size=MULTIPART_CHUNKSIZE):
+    """
+    Compute the ETag S3/MinIO assigns to ``file_path`` when uploaded with
+    ``TRANSFER_CONFIG``: the MD5 for single-part uploads, otherwise the MD5 of
+    the concatenated part digests followed by ``-<parts>``.
+    """
+    part_digests = []
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            part_digests.append(hashlib.md5(block).digest())
+    if len(part_digests) <= 1 and os.path.getsize(file_path) < chunk_size:
+        return part_digests[0].hex() if part_digests else hashlib.md5(b"").hexdigest()
+    return f"{hashlib.md5(b''.join(part_digests)).hexdigest()}-{len(part_digests)}"
+
+def _load_etag_cache(local_folder):
+    try:
+        with open(os.path.join(local_folder, ETAG_CACHE_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_etag_cache(local_folder, cache):
+    path = os.path.join(local_folder, ETAG_CACHE_FILE)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+    os.replace(tmp, path)
+
+def _cached_etag(report, local_folder, cache):
+    """ETag of a local file, recomputed only when its size or mtime changed."""
+    rel = os.path.relpath(report['file_path'], local_folder)
+    stat = os.stat(report['file_path'])
+    hit = cache.get(rel)
+    if hit and hit[0] == stat.st_size and hit[1] == stat.st_mtime_ns:
+        return hit[2]
+    etag = compute_etag(report['file_path'])
+    cache[rel] = [stat.st_size, stat.st_mtime_ns, etag]
+    return etag
+
+def plan_sync(reports, remote, local_folder, cache):
+    """
+    Select the local reports that are missing from MinIO or differ from it.
+
+    Sizes are compared first; the (cached) ETag is only needed when they match.
+    """
+    changed = []
+    for report in reports:
+        obj = remote.get(report['minio_path'])
+        if obj is None or obj[1] != report['size']:
+            changed.append(report)
+        elif obj[0] != _cached_etag(report, local_folder, cache):
+            changed.append(report)
+    return changed
+
+def sync_reports(config, s3_client, df_sources=None, max_workers=UPLOAD_WORKERS):
+    """
+    Upload new or changed reports to MinIO and record them in PostgreSQL.
+
+    Args:
+        config (dict): Configuration dictionary
+        s3_client: MinIO client instance
+        df_sources (pd.DataFrame, optional): DataFrame containing source URLs
+        max_workers (int, optional): Parallel uploads. Defaults to ``UPLOAD_WORKERS``.
+
+    Returns:
+        dict: Counts of scanned, uploaded, unchanged, failed and recorded files
+    """
+    local_folder = config['local_folder']
+    bucket_name = config['minio']['bucket_name']
+    sources = build_source_index(df_sources)
+
+    reports = scan_local_reports(local_folder)
+    remote = list_remote_objects(s3_client, bucket_name)
+    cache = _load_etag_cache(local_folder)
+    changed = plan_sync(reports, remote, local_folder, cache)
+    print(f"✅ {len(reports)} local reports, {len(changed)} new or changed")
+
+    uploaded, failed = [], 0
+    if changed:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(s3_client.upload_file, report['file_path'], bucket_name,
+                                report['minio_path'], Config=TRANSFER_CONFIG): report
+                for report in changed
+            }
+            for future in as_completed(futures):
+                report = futures[future]
+                try:
+                    future.result()
+                    uploaded.append(report)
+                    print(f"📤 Upload successful: {report['minio_path']}")
+                except NoCredentialsError:
+                    print("❌ Cannot access MinIO, please check credentials!")
+                    failed += 1
+                except Exception as e:
+                    print(f"❌ Upload failed: {report['minio_path']}: {str(e)}")
+                    failed += 1
+
+    # Uploaded files have ETags equal to the ones just computed/cached
+    for report in uploaded:
+        _cached_etag(report, local_folder, cache)
+    _save_etag_cache(local_folder, cache)
+
+    # Every report now in MinIO gets a row: uploads overwrite theirs, unchanged
+    # files are inserted if missing (e.g. the DB write of an earlier run failed)
+    endpoint = config['minio']['endpoint']
+
+    def as_record(report):
+        return (report['security'], report['report_year'],
+                f"{endpoint}/{bucket_name}/{report['minio_path']}",
+                sources.get((report['security'], report['report_year'])))
+
+    changed_paths = {report['minio_path'] for report in changed}
+    unchanged = [report for report in reports if report['minio_path'] not in changed_paths]
+    recorded = insert_many_into_db(config, [as_record(report) for report in uploaded],
+                                   existing=[as_record(report) for report in unchanged])
+
+    return {
+        'scanned': len(reports),
+        'uploaded': len(uploaded),
+        'unchanged': len(reports) - len(changed),
+        'failed': failed,
+        'recorded': recorded
+    }
+
 def main():
     """
     Main function to process and upload CSR reports to MinIO.
@@ -202,8 +525,8 @@ def main():
     1. Loads configuration
     2. Creates MinIO client
     3. Reads source URLs if available
-    4. Processes and uploads PDF files
-    5. Updates database records
+    4. Uploads new or changed PDF files (see ``sync_reports``)
+    5. Updates database records in one batch
     
     Returns:
         None
@@ -235,31 +558,9 @@ def main():
     
     print("✅ Reading local CSR reports folder...")
     
-    for security in os.listdir(config['local_folder']):
-        security_path = os.path.join(config['local_folder'], security)
-        
-        if not os.path.isdir(security_path):
-            continue
-            
-        for year in os.listdir(security_path):
-            year_path = os.path.join(security_path, year)
-            
-            if not os.path.isdir(year_path):
-                continue
-                
-            if not year.isdigit():
-                print(f"⚠️ Found non-numeric year `{year}`, skipping...")
-                continue
-                
-            report_year = int(year)
-            
-            for file_name in os.listdir(year_path):
-                if file_name.lower().endswith(".pdf"):
-                    file_path = os.path.normpath(os.path.join(year_path, file_name))
-                    print(f"📤 Uploading report `{file_name}` for {security} {report_year}...")
-                    upload_to_minio(config, s3_client, file_path, security, report_year, df_sources)
-                    print(f"✅ {file_name} upload completed!")
-    
+    stats = sync_reports(config, s3_client, df_sources)
+    print(f"📊 Uploaded {stats['uploaded']}, unchanged {stats['unchanged']}, "
+          f"failed {stats['failed']}, recorded {stats['recorded']} in PostgreSQL")
     print("🎉 All files have been processed!")
 
 if __name__ == "__main__":
@@ -1,11 +1,63 @@
 import csv
 import glob
+import json
 import os
 import subprocess
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 
 from PyPDF2 import PdfReader, PdfWriter
 from tqdm import tqdm
 
+# Seconds a single file may take before it is reported as unreadable
+PDF_CHECK_TIMEOUT = float(os.getenv("PDF_CHECK_TIMEOUT", "60"))
+# Worker processes used to check files
+PDF_CHECK_WORKERS = int(os.getenv("PDF_CHECK_WORKERS", str(os.cpu_count() or 1)))
+# Results cache, keyed by absolute path and invalidated by size / mtime
+# (v2: results of the old tail-only trailer check are not reused)
+CACHE_FILE = ".pdf_check_cache.v2.json"
+# Bytes read from the end of a file when looking for the xref trailer
+TRAILER_BYTES = 4096
+# check_many outcomes that say nothing about the file itself; they are not cached
+CHECK_CRASHED = "Error reading PDF file: checker process crashed"
+CHECK_TIMED_OUT = "Error reading PDF file: timed out"
+CHECK_ERROR = "Error reading PDF file: checker error"
+INCONCLUSIVE = (CHECK_CRASHED, CHECK_TIMED_OUT, CHECK_ERROR)
+
+
+def _contains_eof_marker(f, chunk_size=1024 * 1024):
+    """Scan the whole file for %%EOF, as PyPDF2 does before giving up."""
+    f.seek(0)
+    carry = b""
+    for chunk in iter(lambda: f.read(chunk_size), b""):
+        if b"%%EOF" in carry + chunk:
+            return True
+        carry = chunk[-4:]
+    return False
+
+
+def quick_check(pdf_path):
+    """
+    Cheap header / %%EOF check; returns an error message or None.
+
+    Only files PyPDF2 would also refuse are rejected: when %%EOF is not in the
+    last TRAILER_BYTES (e.g. trailing padding) the whole file is searched.
+    """
+    size = os.path.getsize(pdf_path)
+    if size == 0:
+        return "file is empty"
+    with open(pdf_path, "rb") as f:
+        if f.read(4) != b"%PDF":
+            return "missing %PDF header"
+        f.seek(max(0, size - TRAILER_BYTES))
+        if b"%%EOF" in f.read():
+            return None
+        if not _contains_eof_marker(f):
+            return "missing %%EOF marker (file truncated)"
+    return None
+
 
 def try_decrypt_pdf(pdf_path):
     """Try to decrypt PDF using pdfcrack."""
@@ -85,6 +137,11 @@ def save_decrypted_pdf(pdf_path, password, output_path):
 def check_pdf_readability(pdf_path):
     """Check if a PDF file can be read and identify specific issues."""
     try:
+        # Reject truncated / non-PDF files before the full parse
+        problem = quick_check(pdf_path)
+        if problem:
+            return False, f"Error reading PDF file: {problem}"
+
         reader = PdfReader(pdf_path)
 
         # Check if PDF is encrypted
@@ -108,41 +165,134 @@ def check_pdf_readability(pdf_path):
         return False, f"Error reading PDF file: {str(e)}"
 
 
-def check_all_pdfs():
-    """Check all PDF files in the reports directory."""
-    # Get base directory
-    base_dir = os.path.dirname(os.path.dirname(__file__))
-    reports_dir = os.path.join(base_dir, "result", "csr_reports")
+def _stop_pool(executor):
+    """Shut a pool down without waiting, killing workers that may be stuck."""
+    for process in list((getattr(executor, "_processes", None) or {}).values()):
+        process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
 
-    results = []
 
-    # Get all company directories
-    company_dirs = [d for d in os.listdir(reports_dir) if os.path.isdir(os.path.join(reports_dir, d))]
+def check_many(paths, workers=PDF_CHECK_WORKERS, timeout=PDF_CHECK_TIMEOUT, check_fn=check_pdf_readability):
+    """
+    Yield (path, (is_readable, message)) for each file, checked in a process pool.
 
-    for company in tqdm(company_dirs, desc="Checking companies"):
-        company_path = os.path.join(reports_dir, company)
+    At most ``workers`` files are in flight; a file running longer than ``timeout``
+    is reported as unreadable, the pool is killed and the other in-flight files are
+    retried on a fresh pool.
+    """
+    workers = max(1, workers)
+    pending = deque(paths)
+    running = {}  # future -> (path, start time)
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        while pending or running:
+            while pending and len(running) < workers:
+                path = pending.popleft()
+                running[executor.submit(check_fn, path)] = (path, time.monotonic())
+
+            done, _ = wait(running, timeout=min(1.0, timeout), return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                path, _ = running.pop(future)
+                try:
+                    yield path, future.result()
+                except BrokenProcessPool:
+                    broken = True
+                    yield path, (False, CHECK_CRASHED)
+                except Exception as e:
+                    yield path, (False, f"{CHECK_ERROR}: {str(e)}")
+
+            now = time.monotonic()
+            overdue = [f for f, (_, started) in running.items() if now - started > timeout]
+            for future in overdue:
+                path, _ = running.pop(future)
+                yield path, (False, f"{CHECK_TIMED_OUT} after {timeout:.0f}s")
+
+            if overdue or broken:
+                pending.extendleft(reversed([path for path, _ in running.values()]))
+                running.clear()
+                _stop_pool(executor)
+                executor = ProcessPoolExecutor(max_workers=workers)
+    finally:
+        _stop_pool(executor)
+
+
+def load_cache(cache_path):
+    """Load cached results: {abs path: [size, mtime_ns, is_readable, message]}."""
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
 
-        # Get all year directories
-        year_dirs = [d for d in os.listdir(company_path) if os.path.isdir(os.path.join(company_path, d))]
 
-        for year in year_dirs:
-            year_path = os.path.join(company_path, year)
+def save_cache(cache_path, cache):
+    """Atomically write the results cache."""
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    tmp = cache_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+    os.replace(tmp, cache_path)
 
-            # Find all PDF files in the year directory
-            pdf_files = glob.glob(os.path.join(year_path, "*.pdf"))
 
-            for pdf_file in pdf_files:
-                is_readable, message = check_pdf_readability(pdf_file)
-                results.append(
-                    {
-                        "company": company,
-                        "year": year,
-                        "filename": os.path.basename(pdf_file),
-                        "is_readable": is_readable,
-                        "message": message,
-                        "file_size": os.path.getsize(pdf_file),  # Add file size for analysis
-                    }
-                )
+def check_all_pdfs(reports_dir=None, cache_path=None, workers=PDF_CHECK_WORKERS, timeout=PDF_CHECK_TIMEOUT):
+    """
+    Check all PDF files in the reports directory.
+
+    Files whose size and mtime match the cache reuse the previous result; the rest
+    are checked in parallel with a per-file timeout. Timeouts and crashed checkers
+    are not cached, so those files are checked again on the next run.
+    """
+    # Get base directory
+    base_dir = os.path.dirname(os.path.dirname(__file__))
+    reports_dir = reports_dir or os.path.join(base_dir, "result", "csr_reports")
+    cache_path = cache_path or os.path.join(base_dir, "result", CACHE_FILE)
+
+    # <company>/<year>/*.pdf, collected in one pass
+    pdf_files = sorted(
+        path
+        for path in glob.glob(os.path.join(reports_dir, "*", "*", "*.pdf"))
+        if os.path.isfile(path)
+    )
+
+    cache = load_cache(cache_path)
+    outcomes, stats, to_check = {}, {}, []
+    for pdf_file in pdf_files:
+        st = stats[pdf_file] = os.stat(pdf_file)
+        hit = cache.get(os.path.abspath(pdf_file))
+        if hit and hit[0] == st.st_size and hit[1] == st.st_mtime_ns:
+            outcomes[pdf_file] = (hit[2], hit[3])
+        else:
+            to_check.append(pdf_file)
+
+    if to_check:
+        for pdf_file, (is_readable, message) in tqdm(
+            check_many(to_check, workers, timeout), total=len(to_check), desc="Checking PDFs"
+        ):
+            outcomes[pdf_file] = (is_readable, message)
+            st = stats[pdf_file]
+            if message.startswith(INCONCLUSIVE):
+                cache.pop(os.path.abspath(pdf_file), None)
+            else:
+                cache[os.path.abspath(pdf_file)] = [st.st_size, st.st_mtime_ns, is_readable, message]
+
+    live = {os.path.abspath(p) for p in pdf_files}
+    save_cache(cache_path, {k: v for k, v in cache.items() if k in live})
+
+    results = []
+    for pdf_file in pdf_files:
+        year_path = os.path.dirname(pdf_file)
+        is_readable, message = outcomes[pdf_file]
+        results.append(
+            {
+                "company": os.path.basename(os.path.dirname(year_path)),
+                "year": os.path.basename(year_path),
+                "filename": os.path.basename(pdf_file),
+                "is_readable": is_readable,
+                "message": message,
+                "file_size": stats[pdf_file].st_size,  # Add file size for analysis
+            }
+        )
 
     return results
 
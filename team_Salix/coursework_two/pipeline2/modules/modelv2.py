@@ -1,27 +1,202 @@
 import csv
 import glob
+import hashlib
+import json
 import os
 import re
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 
 from dotenv import load_dotenv
 from openai import APIError, APITimeoutError, OpenAI
 from PyPDF2 import PdfReader
 
+try:
+    import pymupdf
+except ImportError:  # older PyMuPDF releases only ship the `fitz` name
+    try:
+        import fitz as pymupdf
+    except ImportError:
+        pymupdf = None
+
+# Pages are kept if their lower-cased text contains any of these
+INDICATOR_KEYWORDS = (
+    "scope 1",
+    "scope 2",
+    "energy consumption",
+    "water withdrawal",
+    "waste generated",
+    "employee diversity",
+)
+
+# "pymupdf" (much faster) or "pypdf2"; falls back to PyPDF2 if PyMuPDF is missing
+TEXT_BACKEND = os.getenv("PDF_TEXT_BACKEND", "pymupdf" if pymupdf else "pypdf2")
+# Documents with at least this many pages are split across worker processes
+PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "80"))
+PAGE_WORKERS = int(os.getenv("PDF_PAGE_WORKERS", str(min(8, os.cpu_count() or 1))))
+# Selected-page text per PDF, keyed by file hash; empty to disable
+TEXT_CACHE_DIR = os.getenv(
+    "PDF_TEXT_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "page_text"),
+)
+
+# Concurrent provider calls in run_extraction (threads)
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", "8"))
+# PDFs read concurrently in run_extraction (processes; 0 reads them in the calling thread)
+TEXT_WORKERS = int(os.getenv("PDF_TEXT_WORKERS", str(PAGE_WORKERS)))
+# Requests per minute allowed for each provider
+PROVIDER_RPM = {
+    "grok": float(os.getenv("XAI_RPM", "60")),
+    "deepseek": float(os.getenv("DEEPSEEK_RPM", "60")),
+}
+# Rows buffered by the writer before they are flushed to disk
+WRITE_BATCH = 20
+
+CSV_HEADER = [
+    "Company Name",
+    "Year",
+    "Scope 1 Emissions (tCO2e)",
+    "Scope 2 Emissions (tCO2e)",
+    "Total Energy Consumption (MWh)",
+    "Total Water Withdrawal (m³)",
+    "Total Waste Generated (Metric tons)",
+    "Employee Diversity (%)",
+]
+
+INDICATORS = [
+    ("Scope 1 Emissions", "tCO2e"),
+    ("Scope 2 Emissions", "tCO2e"),
+    ("Total Energy Consumption", "MWh"),
+    ("Total Water Withdrawal", "m³"),
+    ("Total Waste Generated", "Metric tons"),
+    ("Employee Diversity", "%"),
+]
+
+
+class RateLimiter:
+    """Thread-safe request spacing: at most `rpm` calls per minute across all workers."""
+
+    def __init__(self, rpm):
+        self.interval = 60.0 / rpm if rpm and rpm > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+RATE_LIMITERS = {name: RateLimiter(rpm) for name, rpm in PROVIDER_RPM.items()}
+
+
+class StageTimer:
+    """Collects per-stage wall-clock timings (count / total / max) from many threads."""
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            count, total, worst = self._stats.get(stage, (0, 0.0, 0.0))
+            self._stats[stage] = (count + 1, total + seconds, max(worst, seconds))
+
+    def timed(self, stage, fn, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def summary(self):
+        with self._lock:
+            lines = ["Stage timings (count / total s / mean s / max s):"]
+            for stage, (count, total, worst) in self._stats.items():
+                lines.append(f"  {stage:<14} {count:>5} {total:>9.1f} {total / count:>7.2f} {worst:>7.2f}")
+            return "\n".join(lines)
+
+
+def _page_texts(pdf_path, backend, start=0, stop=None):
+    """Yield the text of pages [start, stop) using the chosen backend."""
+    if backend == "pymupdf" and pymupdf is not None:
+        with pymupdf.open(pdf_path) as doc:
+            for i in range(start, doc.page_count if stop is None else stop):
+                yield doc[i].get_text()
+    else:
+        reader = PdfReader(pdf_path)
+        pages = reader.pages
+        for i in range(start, len(pages) if stop is None else stop):
+            yield pages[i].extract_text()
+
+
+def _page_count(pdf_path, backend):
+    if backend == "pymupdf" and pymupdf is not None:
+        with pymupdf.open(pdf_path) as doc:
+            return doc.page_count
+    return len(PdfReader(pdf_path).pages)
+
+
+def select_pages(pdf_path, backend=TEXT_BACKEND, start=0, stop=None):
+    """Return the texts of pages in [start, stop) that mention an indicator keyword."""
+    selected = []
+    for page_text in _page_texts(pdf_path, backend, start, stop):
+        if page_text:
+            page_text_lower = page_text.lower()
+            if any(keyword in page_text_lower for keyword in INDICATOR_KEYWORDS):
+                selected.append(page_text)
+    return selected
+
+
+def _select_pages_parallel(pdf_path, backend, n_pages, workers):
+    """Split the page range into one chunk per worker; results keep page order."""
+    step = -(-n_pages // workers)
+    ranges = [(start, min(start + step, n_pages)) for start in range(0, n_pages, step)]
+    with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+        chunks = executor.map(
+            select_pages,
+            [pdf_path] * len(ranges),
+            [backend] * len(ranges),
+            [r[0] for r in ranges],
+            [r[1] for r in ranges],
+        )
+        return [text for chunk in chunks for text in chunk]
+
+
+def _cache_path(pdf_path, backend, cache_dir):
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    # Different backends / keyword lists select different text
+    digest.update(f"|{backend}|{'|'.join(INDICATOR_KEYWORDS)}".encode("utf-8"))
+    return os.path.join(cache_dir, f"{digest.hexdigest()}.json")
 
-def extract_text_from_pdf(pdf_path):
+
+def extract_text_from_pdf(pdf_path, backend=None, cache_dir=None, parallel=True):
     """
     Extract text from PDF pages containing indicator keywords.
 
     Args:
         pdf_path (str): Path to the PDF file
+        backend (str, optional): "pymupdf" or "pypdf2". Defaults to TEXT_BACKEND.
+        cache_dir (str, optional): Selected-text cache directory. Defaults to
+            TEXT_CACHE_DIR; pass "" to disable caching.
+        parallel (bool, optional): Split large documents across worker processes.
+            Must be False when already running inside a worker process.
 
     Returns:
         str: Extracted text containing ESG indicators, or None if no relevant text is found
 
     This function:
-    1. Opens and reads the PDF file
-    2. Extracts text from each page
+    1. Returns the cached selection if this exact file was processed before
+    2. Extracts text from each page (in parallel for large documents)
     3. Filters pages containing ESG indicator keywords
     4. Combines relevant text from all pages
 
@@ -29,33 +204,34 @@ def extract_text_from_pdf(pdf_path):
         The function only extracts text from pages containing specific ESG-related keywords
         to improve processing efficiency.
     """
+    backend = backend or TEXT_BACKEND
+    cache_dir = TEXT_CACHE_DIR if cache_dir is None else cache_dir
     try:
-        reader = PdfReader(pdf_path)
-        text = ""
-        indicator_keywords = [
-            "scope 1",
-            "scope 2",
-            "energy consumption",
-            "water withdrawal",
-            "waste generated",
-            "employee diversity",
-        ]
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                page_text_lower = page_text.lower()
-                if any(
-                    keyword in page_text_lower 
-                    for keyword in indicator_keywords
-                ):
-                    text += page_text
-        return text if text else None
+        cache_file = _cache_path(pdf_path, backend, cache_dir) if cache_dir else None
+        if cache_file and os.path.exists(cache_file):
+            with open(cache_file, "r", encoding="utf-8") as f:
+                return json.load(f)["text"]
+
+        n_pages = _page_count(pdf_path, backend)
+        if parallel and n_pages >= PARALLEL_MIN_PAGES and PAGE_WORKERS > 1:
+            selected = _select_pages_parallel(pdf_path, backend, n_pages, PAGE_WORKERS)
+        else:
+            selected = select_pages(pdf_path, backend)
+        text = "".join(selected) or None
+
+        if cache_file:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp = cache_file + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"source": os.path.basename(pdf_path), "text": text}, f)
+            os.replace(tmp, cache_file)
+        return text
     except Exception as e:
         print(f"Error processing PDF {pdf_path}: {e}")
         return None
 
 
-def call_api_with_retry(client, messages, model, max_retries=2, timeout=20):
+def call_api_with_retry(client, messages, model, max_retries=2, timeout=20, limiter=None):
     """
     Helper function to make API calls with retry mechanism.
 
@@ -65,6 +241,7 @@ def call_api_with_retry(client, messages, model, max_retries=2, timeout=20):
         model (str): Name of the model to use
         max_retries (int, optional): Maximum number of retry attempts. Defaults to 2.
         timeout (int, optional): Timeout in seconds for API calls. Defaults to 20.
+        limiter (RateLimiter, optional): Provider rate limiter awaited before every attempt.
 
     Returns:
         OpenAI response object
@@ -77,6 +254,8 @@ def call_api_with_retry(client, messages, model, max_retries=2, timeout=20):
     This function implements exponential backoff between retry attempts.
     """
     for attempt in range(max_retries):
+        if limiter is not None:
+            limiter.wait()
         try:
             response = client.chat.completions.create(
                 model=model,
@@ -171,7 +350,7 @@ def find_data_in_text_grok(company_name, pdf_text):
             {"role": "user", "content": prompt},
         ]
 
-        response = call_api_with_retry(client, messages, "grok-3-mini")
+        response = call_api_with_retry(client, messages, "grok-3-mini", limiter=RATE_LIMITERS["grok"])
 
         # Log token usage
         usage = response.usage
@@ -250,7 +429,7 @@ def find_data_in_text_deepseek(company_name, pdf_text):
             {"role": "user", "content": prompt},
         ]
 
-        response = call_api_with_retry(client, messages, "deepseek-chat")
+        response = call_api_with_retry(client, messages, "deepseek-chat", limiter=RATE_LIMITERS["deepseek"])
 
         return response.choices[0].message.content.strip()
     except Exception as e:
@@ -330,69 +509,105 @@ def data_formatting(text, expected_unit):
         return "N/A"
 
 
-def process_esg_data(company_name, year, log_file_path, csv_file_path):
+def extract_esg_record(company_name, year, reports_dir="./pipeline1/result/csr_reports", timer=None):
     """
-    Process ESG data for a single company and year.
+    Run the extraction for one company and year without writing any files.
 
     Args:
         company_name (str): Name of the company
         year (str): Year of the CSR report
-        log_file_path (str): Path to the log file
-        csv_file_path (str): Path to the output CSV file
+        reports_dir (str, optional): Root of the downloaded reports
+        timer (StageTimer, optional): Collects per-stage timings
 
     Returns:
-        dict: Processed ESG data, or None if processing fails
-
-    This function:
-    1. Locates the PDF file for the given company and year
-    2. Extracts text from the PDF
-    3. Processes the text using both Grok and DeepSeek APIs
-    4. Formats and validates the extracted data
-    5. Writes results to CSV and log files
+        tuple: (status, formatted_data, log_text) where status is "ok", "no_pdf",
+            "no_text" or "no_data" and formatted_data is None unless status is "ok"
     """
-    pdf_path = os.path.join("./pipeline1/result/csr_reports", company_name, year, "*.pdf")
-    files_path = glob.glob(pdf_path)
-    file_path = files_path[0] if files_path else None
+    timer = timer or StageTimer()
+    file_path = find_report_pdf(company_name, year, reports_dir)
     if not file_path:
         print(f"No PDF found for {company_name} in year {year}")
-        return None
+        return "no_pdf", None, ""
+
+    pdf_text = timer.timed("extract_text", extract_text_from_pdf, file_path)
+    return extract_esg_from_text(company_name, year, pdf_text, timer)
 
-    pdf_text = extract_text_from_pdf(file_path)
+
+def find_report_pdf(company_name, year, reports_dir="./pipeline1/result/csr_reports"):
+    """First PDF under reports_dir/company/year, or None."""
+    files_path = glob.glob(os.path.join(reports_dir, company_name, year, "*.pdf"))
+    return files_path[0] if files_path else None
+
+
+def extract_esg_from_text(company_name, year, pdf_text, timer=None):
+    """
+    Ask the providers for the indicators in already extracted report text.
+
+    Args:
+        company_name (str): Name of the company
+        year (str): Year of the CSR report
+        pdf_text (str): Output of extract_text_from_pdf (None if nothing was found)
+        timer (StageTimer, optional): Collects per-stage timings
+
+    Returns:
+        tuple: (status, formatted_data, log_text) as for extract_esg_record
+    """
+    timer = timer or StageTimer()
     if not pdf_text:
         print(f"No relevant text extracted for {company_name} in year {year}")
-        return None
+        return "no_text", None, ""
 
-    with open(log_file_path, "a", encoding="utf-8") as log_file:
-        log_file.write(f"\n=========={company_name} - {year}==========\n")
+    log_parts = [f"\n=========={company_name} - {year}==========\n"]
 
     # Try Grok-3-mini first, fallback to DeepSeek
-    data_in_text = find_data_in_text_grok(company_name, pdf_text)
+    data_in_text = timer.timed("grok", find_data_in_text_grok, company_name, pdf_text)
     if not data_in_text:
-        data_in_text = find_data_in_text_deepseek(company_name, pdf_text)
+        data_in_text = timer.timed("deepseek", find_data_in_text_deepseek, company_name, pdf_text)
     if not data_in_text:
         print(f"No data extracted for {company_name} in year {year}")
-        return None
+        return "no_data", None, "".join(log_parts)
 
-    with open(log_file_path, "a", encoding="utf-8") as log_file:
-        log_file.write(f"【Raw Data】\n{data_in_text}\n")
+    log_parts.append(f"【Raw Data】\n{data_in_text}\n")
 
     # Parse and format data
-    indicators = [
-        ("Scope 1 Emissions", "tCO2e"),
-        ("Scope 2 Emissions", "tCO2e"),
-        ("Total Energy Consumption", "MWh"),
-        ("Total Water Withdrawal", "m³"),
-        ("Total Waste Generated", "Metric tons"),
-        ("Employee Diversity", "%"),
-    ]
+    start = time.perf_counter()
     formatted_data = []
-    for indicator, unit in indicators:
+    for indicator, unit in INDICATORS:
         match = re.search(rf"{indicator}:\s*([^\n]+)", data_in_text)
         value = data_formatting(match.group(1) if match else "N/A", unit)
         formatted_data.append(value)
+    timer.record("format", time.perf_counter() - start)
+
+    log_parts.append(f"【Formatted Data】\n{', '.join(formatted_data)}\n")
+    return "ok", formatted_data, "".join(log_parts)
 
-    with open(log_file_path, "a", encoding="utf-8") as log_file:
-        log_file.write(f"【Formatted Data】\n{', '.join(formatted_data)}\n")
+
+def process_esg_data(company_name, year, log_file_path, csv_file_path):
+    """
+    Process ESG data for a single company and year.
+
+    Args:
+        company_name (str): Name of the company
+        year (str): Year of the CSR report
+        log_file_path (str): Path to the log file
+        csv_file_path (str): Path to the output CSV file
+
+    Returns:
+        dict: Processed ESG data, or None if processing fails
+
+    This function:
+    1. Locates the PDF file for the given company and year
+    2. Extracts text from the PDF
+    3. Processes the text using both Grok and DeepSeek APIs
+    4. Formats and validates the extracted data
+    5. Writes results to CSV and log files
+    """
+    status, formatted_data, log_text = extract_esg_record(company_name, year)
+    if log_text:
+        with open(log_file_path, "a", encoding="utf-8") as log_file:
+            log_file.write(log_text)
+    if status != "ok":
+        return None
 
     with open(csv_file_path, "a", encoding="utf-8") as csv_file:
         writer = csv.writer(csv_file)
@@ -401,6 +616,190 @@ def process_esg_data(company_name, year, log_file_path, csv_file_path):
     return formatted_data
 
 
+def load_ledger(ledger_path):
+    """Return {(company, year): status} from a JSON-lines ledger (missing file -> {})."""
+    done = {}
+    if not ledger_path or not os.path.exists(ledger_path):
+        return done
+    with open(ledger_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+                done[(entry["company"], entry["year"])] = entry["status"]
+            except (ValueError, KeyError):
+                continue  # partially written last line
+    return done
+
+
+class ResultWriter:
+    """
+    Single writer for run_extraction: buffers rows from all workers and flushes them
+    to the CSV, the log and the resume ledger in batches. The ledger is written after
+    the CSV, so a pair is only marked done once its row is on disk.
+    """
+
+    def __init__(self, csv_file_path, log_file_path, ledger_path, batch_size=WRITE_BATCH):
+        self.csv_file_path = csv_file_path
+        self.log_file_path = log_file_path
+        self.ledger_path = ledger_path
+        self.batch_size = batch_size
+        self._rows, self._logs, self._ledger = [], [], []
+
+    def add(self, company_name, year, status, formatted_data, log_text):
+        if status == "ok":
+            self._rows.append([company_name, year] + formatted_data)
+        if log_text:
+            self._logs.append(log_text)
+        self._ledger.append({"company": company_name, "year": year, "status": status})
+        if len(self._ledger) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self._rows:
+            with open(self.csv_file_path, "a", encoding="utf-8", newline="") as csv_file:
+                csv.writer(csv_file).writerows(self._rows)
+        if self._logs:
+            with open(self.log_file_path, "a", encoding="utf-8") as log_file:
+                log_file.write("".join(self._logs))
+        if self._ledger and self.ledger_path:
+            with open(self.ledger_path, "a", encoding="utf-8") as ledger:
+                ledger.write("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in self._ledger))
+                ledger.flush()
+                os.fsync(ledger.fileno())
+        self._rows, self._logs, self._ledger = [], [], []
+
+
+def list_report_jobs(reports_dir):
+    """All (company, year) folder pairs under reports_dir, sorted."""
+    jobs = []
+    for company_name in sorted(os.listdir(reports_dir)):
+        company_path = os.path.join(reports_dir, company_name)
+        if os.path.isdir(company_path):
+            for year in sorted(os.listdir(company_path)):
+                if os.path.isdir(os.path.join(company_path, year)):
+                    jobs.append((company_name, year))
+    return jobs
+
+
+def _read_report_text(file_path):
+    """Process-pool task: (selected text, seconds) for one PDF, read without nested pools."""
+    start = time.perf_counter()
+    text = extract_text_from_pdf(file_path, parallel=False)
+    return text, time.perf_counter() - start
+
+
+def run_extraction(
+    reports_dir,
+    csv_file_path,
+    log_file_path,
+    ledger_path=None,
+    workers=EXTRACT_WORKERS,
+    parquet_path=None,
+    text_workers=TEXT_WORKERS,
+):
+    """
+    Extract ESG data for every report concurrently.
+
+    PDFs are read in one process pool (PyMuPDF is not thread-safe, and each worker
+    handles whole documents rather than starting pools of its own); only the
+    rate-limited provider calls run on threads. The process pool is started before
+    the thread pool, so no worker is forked from a parent with live API clients.
+
+    Args:
+        reports_dir (str): Root of the downloaded reports (company/year/*.pdf)
+        csv_file_path (str): Output CSV (header written if the file is new)
+        log_file_path (str): Log file for raw and formatted model output
+        ledger_path (str, optional): Resume ledger; pairs already recorded as "ok",
+            "no_pdf" or "no_text" are skipped, failed ones are retried
+        workers (int, optional): Concurrent provider calls. These are additionally
+            throttled by RATE_LIMITERS.
+        parquet_path (str, optional): Also write the final CSV as Parquet (needs pyarrow)
+        text_workers (int, optional): Processes reading PDFs; 0 reads them one at a
+            time in the calling thread
+
+    Returns:
+        dict: Count of reports per status, plus "skipped"
+    """
+    all_jobs = list_report_jobs(reports_dir)
+    done = load_ledger(ledger_path)
+    jobs = [job for job in all_jobs if done.get(job) not in ("ok", "no_pdf", "no_text")]
+    print(f"{len(jobs)} reports to process, {len(done)} already in ledger")
+
+    if not os.path.exists(csv_file_path) or os.path.getsize(csv_file_path) == 0:
+        with open(csv_file_path, "w", encoding="utf-8", newline="") as csv_file:
+            csv.writer(csv_file).writerow(CSV_HEADER)
+
+    timer = StageTimer()
+    writer = ResultWriter(csv_file_path, log_file_path, ledger_path)
+    counts = {"skipped": len(all_jobs) - len(jobs)}
+
+    def record(company_name, year, status, formatted_data=None, log_text=""):
+        counts[status] = counts.get(status, 0) + 1
+        writer.add(company_name, year, status, formatted_data, log_text)
+
+    pdf_jobs = []
+    for company_name, year in jobs:
+        file_path = find_report_pdf(company_name, year, reports_dir)
+        if file_path:
+            pdf_jobs.append((company_name, year, file_path))
+        else:
+            print(f"No PDF found for {company_name} in year {year}")
+            record(company_name, year, "no_pdf")
+
+    run_start = time.perf_counter()
+    text_pool = ProcessPoolExecutor(max_workers=text_workers) if text_workers > 0 and pdf_jobs else None
+    try:
+        pending = {}
+        if text_pool is not None:
+            # Submitting forks every worker now, before any thread or API client exists
+            for company_name, year, file_path in pdf_jobs:
+                pending[text_pool.submit(_read_report_text, file_path)] = ("text", company_name, year)
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as llm_pool:
+            if text_pool is None:
+                for company_name, year, file_path in pdf_jobs:
+                    pdf_text = timer.timed("extract_text", extract_text_from_pdf, file_path)
+                    pending[llm_pool.submit(extract_esg_from_text, company_name, year, pdf_text, timer)] = (
+                        "llm", company_name, year)
+
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    stage, company_name, year = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"Error processing {company_name} {year}: {e}")
+                        record(company_name, year, "failed")
+                        continue
+                    if stage == "text":
+                        pdf_text, seconds = result
+                        timer.record("extract_text", seconds)
+                        pending[llm_pool.submit(extract_esg_from_text, company_name, year, pdf_text, timer)] = (
+                            "llm", company_name, year)
+                    else:
+                        record(company_name, year, *result)
+    finally:
+        if text_pool is not None:
+            text_pool.shutdown(cancel_futures=True)
+        writer.flush()
+
+    timer.record("total", time.perf_counter() - run_start)
+    summary = timer.summary()
+    print(summary)
+    with open(log_file_path, "a", encoding="utf-8") as log_file:
+        log_file.write(f"\n{summary}\n")
+
+    if parquet_path:
+        try:
+            import pandas as pd
+
+            pd.read_csv(csv_file_path).to_parquet(parquet_path, index=False)
+        except ImportError as e:
+            print(f"Skipping Parquet output ({e})")
+    return counts
+
+
 if __name__ == "__main__":
     # Create logs directory if it doesn't exist
     os.makedirs("./logs", exist_ok=True)
@@ -410,30 +809,17 @@ if __name__ == "__main__":
         number += 1
     log_file_path = f"./logs/esg_extract_log_{number}.txt"
     csv_file_path = f"./logs/esg_indicators.csv"
-
-    # Write CSV header
-    with open(csv_file_path, "w", encoding="utf-8") as csv_file:
-        writer = csv.writer(csv_file)
-        writer.writerow(
-            [
-                "Company Name",
-                "Year",
-                "Scope 1 Emissions (tCO2e)",
-                "Scope 2 Emissions (tCO2e)",
-                "Total Energy Consumption (MWh)",
-                "Total Water Withdrawal (m³)",
-                "Total Waste Generated (Metric tons)",
-                "Employee Diversity (%)",
-            ]
-        )
-
-    reports_dir = "./pipeline1/result/csr_reports"
-    # Process each company folder
-    for company_name in os.listdir(reports_dir):
-        company_path = os.path.join(reports_dir, company_name)
-        if os.path.isdir(company_path):
-            # Process each year folder
-            for year in os.listdir(company_path):
-                year_path = os.path.join(company_path, year)
-                if os.path.isdir(year_path):
-                    process_esg_data(company_name, year, log_file_path, csv_file_path)
+    ledger_path = "./logs/esg_extract_ledger.jsonl"
+
+    # A run without a ledger starts a fresh CSV; otherwise rows are appended
+    if not os.path.exists(ledger_path) and os.path.exists(csv_file_path):
+        os.remove(csv_file_path)
+
+    counts = run_extraction(
+        "./pipeline1/result/csr_reports",
+        csv_file_path,
+        log_file_path,
+        ledger_path=ledger_path,
+        parquet_path=os.getenv("ESG_PARQUET_PATH"),
+    )
+    print(f"Extraction finished: {counts}")
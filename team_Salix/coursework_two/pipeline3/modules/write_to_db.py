@@ -8,7 +8,9 @@ The script performs the following operations:
 1. Connects to the PostgreSQL database
 2. Reads ESG indicators from a CSV file
 3. Cleans and standardizes the data
-4. Writes the processed data to the database
+4. Upserts the processed data into the database (COPY into a staging table,
+   then INSERT ... ON CONFLICT (company, year)), so the table stays queryable
+   during a load and unchanged rows are not rewritten
 
 Note:
     - The CSV file should be located at 'logs/esg_indicators.csv'
@@ -16,29 +18,146 @@ Note:
     - The data is written to the 'csr_reporting' schema
 """
 
+import io
+
 import pandas as pd
 from sqlalchemy import create_engine
 from sqlalchemy.exc import SQLAlchemyError
 from pandas.errors import EmptyDataError
 from psycopg2 import OperationalError
 
+CSV_PATH = "logs/esg_indicators.csv"
+SCHEMA = "csr_reporting"
+TABLE = "esg_indicators"
+
+# Column name mapping
+COLUMN_MAPPING = {
+    "Company Name": "company",
+    "Year": "year",
+    "Scope 1 Emissions (tCO2e)": "scope1_emissions",
+    "Scope 2 Emissions (tCO2e)": "scope2_emissions",
+    "Total Energy Consumption (MWh)": "total_energy_consumption",
+    "Total Water Withdrawal (m³)": "total_water_withdrawal",
+    "Total Waste Generated (Metric tons)": "total_waste_generated",
+    "Employee Diversity (%)": "employee_diversity",
+}
+KEY_COLUMNS = ["company", "year"]
+VALUE_COLUMNS = [c for c in COLUMN_MAPPING.values() if c not in KEY_COLUMNS]
+
+
+def clean_esg_frame(df):
+    """
+    Rename and type the raw CSV columns.
+
+    'N/A', empty strings and anything else that is not a number become NULL.
+    Rows without a company or year are dropped, and if the CSV holds the same
+    (company, year) more than once the last row wins.
+
+    Args:
+        df (pd.DataFrame): Frame as read from esg_indicators.csv
+
+    Returns:
+        pd.DataFrame: Columns in COLUMN_MAPPING order, year as Int64, values as float
+    """
+    df = df.rename(columns=COLUMN_MAPPING)[list(COLUMN_MAPPING.values())].copy()
+    df["company"] = df["company"].astype("string").str.strip().replace("", pd.NA)
+    df["year"] = pd.to_numeric(df["year"], errors="coerce").floordiv(1).astype("Int64")
+    for col in VALUE_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+    df = df.dropna(subset=KEY_COLUMNS)
+    return df.drop_duplicates(subset=KEY_COLUMNS, keep="last").reset_index(drop=True)
+
+
+def ensure_table(cur):
+    """
+    Create the target table if needed and make sure (company, year) is unique.
+
+    Tables created by the old `to_sql(if_exists="replace")` loader have no key,
+    so duplicate rows are removed once before the unique index is added.
+    """
+    cur.execute(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA}")
+    value_defs = ", ".join(f"{col} DOUBLE PRECISION" for col in VALUE_COLUMNS)
+    cur.execute(f"CREATE TABLE IF NOT EXISTS {SCHEMA}.{TABLE} (company TEXT, year BIGINT, {value_defs})")
+    cur.execute(
+        "SELECT 1 FROM pg_indexes WHERE schemaname = %s AND indexname = %s",
+        (SCHEMA, f"{TABLE}_company_year_key"),
+    )
+    if cur.fetchone() is None:
+        cur.execute(
+            f"""
+            DELETE FROM {SCHEMA}.{TABLE} a
+            USING {SCHEMA}.{TABLE} b
+            WHERE a.company = b.company AND a.year = b.year AND a.ctid < b.ctid
+            """
+        )
+        cur.execute(f"CREATE UNIQUE INDEX {TABLE}_company_year_key ON {SCHEMA}.{TABLE} (company, year)")
+
 
-def write_esg_to_db():
+def upsert_esg_frame(conn, df):
+    """
+    Load a cleaned frame with COPY into a temporary staging table and merge it
+    into csr_reporting.esg_indicators in one transaction.
+
+    Rows whose values did not change are left untouched, so the work done is
+    proportional to new or changed rows.
+
+    Args:
+        conn: psycopg2 connection (e.g. engine.raw_connection())
+        df (pd.DataFrame): Output of clean_esg_frame
+
+    Returns:
+        int: Number of rows inserted or updated
+    """
+    columns = list(COLUMN_MAPPING.values())
+    col_list = ", ".join(columns)
+    updates = ", ".join(f"{col} = EXCLUDED.{col}" for col in VALUE_COLUMNS)
+    changed = " OR ".join(f"t.{col} IS DISTINCT FROM EXCLUDED.{col}" for col in VALUE_COLUMNS)
+
+    buf = io.StringIO()
+    df.to_csv(buf, index=False, header=False, na_rep="")
+    buf.seek(0)
+
+    try:
+        with conn.cursor() as cur:
+            ensure_table(cur)
+            cur.execute(
+                f"CREATE TEMP TABLE {TABLE}_stage (LIKE {SCHEMA}.{TABLE} INCLUDING DEFAULTS) ON COMMIT DROP"
+            )
+            cur.copy_expert(f"COPY {TABLE}_stage ({col_list}) FROM STDIN WITH (FORMAT csv, NULL '')", buf)
+            cur.execute(
+                f"""
+                INSERT INTO {SCHEMA}.{TABLE} AS t ({col_list})
+                SELECT {col_list} FROM {TABLE}_stage
+                ON CONFLICT (company, year) DO UPDATE SET {updates}
+                WHERE {changed}
+                """
+            )
+            affected = cur.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return affected
+
+
+def write_esg_to_db(csv_path=CSV_PATH, engine=None):
     """
     Write ESG indicators from CSV to PostgreSQL database.
 
     This function:
     1. Establishes a connection to the PostgreSQL database
     2. Reads and processes the ESG indicators CSV file
-    3. Performs data cleaning and type conversion
-    4. Writes the processed data to the database
+    3. Performs vectorised data cleaning and type conversion
+    4. Upserts the processed data into the database keyed on (company, year)
     5. Handles various exceptions and provides appropriate error messages
 
-    The function performs the following data processing steps:
-    - Renames columns to match database schema
-    - Converts 'N/A' and empty values to NULL
-    - Converts numeric values to appropriate types
-    - Handles type conversion errors gracefully
+    Args:
+        csv_path (str, optional): CSV produced by pipeline2. Defaults to CSV_PATH.
+        engine (sqlalchemy.engine.Engine, optional): Engine to use instead of the
+            default local connection; it is not disposed when passed in.
+
+    Returns:
+        int: Number of rows inserted or updated, or None on error
 
     Raises:
         FileNotFoundError: If the CSV file is not found
@@ -49,80 +168,38 @@ def write_esg_to_db():
 
     Note:
         The function automatically disposes of the database connection
-        when finished, regardless of success or failure.
+        it created when finished, regardless of success or failure.
     """
+    owns_engine = engine is None
     try:
-        # Set PostgreSQL connection information
-        db_config = {
-            "host": "localhost",
-            "port": 5439,
-            "database": "fift",
-            "user": "postgres",
-            "password": "postgres",
-        }
-
-        # Create engine using SQLAlchemy
-        engine = create_engine(
-            f"postgresql+psycopg2://{db_config['user']}:{db_config['password']}@"
-            f"{db_config['host']}:{db_config['port']}/{db_config['database']}"
-        )
-
-        # Read CSV file
-        df = pd.read_csv("logs/esg_indicators.csv")
-
-        # Column name mapping
-        column_mapping = {
-            "Company Name": "company",
-            "Year": "year",
-            "Scope 1 Emissions (tCO2e)": "scope1_emissions",
-            "Scope 2 Emissions (tCO2e)": "scope2_emissions",
-            "Total Energy Consumption (MWh)": "total_energy_consumption",
-            "Total Water Withdrawal (m³)": "total_water_withdrawal",
-            "Total Waste Generated (Metric tons)": "total_waste_generated",
-            "Employee Diversity (%)": "employee_diversity",
-        }
-        df.rename(columns=column_mapping, inplace=True)
-        df = df[list(column_mapping.values())]
-
-        # Standardize handling of N/A, empty strings as None, and perform type conversion
-        def clean_value(val, dtype="float"):
-            if pd.isna(val) or str(val).strip().upper() == "N/A" or str(val).strip() == "":
-                return None
-            if dtype == "int":
-                try:
-                    return int(float(val))
-                except (ValueError, TypeError):
-                    return None
-            if dtype == "float":
-                try:
-                    return float(val)
-                except (ValueError, TypeError):
-                    return None
-            return str(val).strip()
-
-        df["year"] = df["year"].apply(lambda x: clean_value(x, "int"))
-        for col in [
-            "scope1_emissions",
-            "scope2_emissions",
-            "total_energy_consumption",
-            "total_water_withdrawal",
-            "total_waste_generated",
-            "employee_diversity",
-        ]:
-            df[col] = df[col].apply(lambda x: clean_value(x, "float"))
-
-        # Write to PostgreSQL (schema: csr_reporting)
-        df.to_sql(
-            "esg_indicators",
-            engine,
-            schema="csr_reporting",
-            if_exists="replace",
-            index=False,
-        )
-
-        print("✅ ESG indicators successfully written to PostgreSQL.")
+        if owns_engine:
+            # Set PostgreSQL connection information
+            db_config = {
+                "host": "localhost",
+                "port": 5439,
+                "database": "fift",
+                "user": "postgres",
+                "password": "postgres",
+            }
+
+            # Create engine using SQLAlchemy
+            engine = create_engine(
+                f"postgresql+psycopg2://{db_config['user']}:{db_config['password']}@"
+                f"{db_config['host']}:{db_config['port']}/{db_config['database']}"
+            )
+
+        df = clean_esg_frame(pd.read_csv(csv_path, dtype=str, keep_default_na=False))
+
+        conn = engine.raw_connection()
+        try:
+            affected = upsert_esg_frame(conn, df)
+        finally:
+            conn.close()
+
+        print(f"✅ ESG indicators written to PostgreSQL ({affected} of {len(df)} rows inserted or updated).")
+        return affected
     except FileNotFoundError:
-        print("❌ Error: CSV file not found at 'logs/esg_indicators.csv'")
+        print(f"❌ Error: CSV file not found at '{csv_path}'")
     except EmptyDataError:
         print("❌ Error: CSV file is empty")
     except OperationalError as e:
@@ -132,7 +209,7 @@ def write_esg_to_db():
     except Exception as e:
         print(f"❌ Unexpected error: {e}")
     finally:
-        if 'engine' in locals():
+        if owns_engine and engine is not None:
             engine.dispose()
 
 
@@ -31,7 +31,7 @@ def test_complete_pipeline(db_engine, sample_pdf_path, tmp_path):
         assert os.path.exists(pdf_path)
 
         # Step 2: Text Extraction
-        extracted_text = extract_text_from_pdf(pdf_path)
+        extracted_text = extract_text_from_pdf(pdf_path, cache_dir=str(tmp_path / "cache"))
         assert isinstance(extracted_text, str)
         assert len(extracted_text) > 0
 
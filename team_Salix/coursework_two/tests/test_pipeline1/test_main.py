@@ -83,10 +83,17 @@ class MockClientSession:
         return self.mock_response
 
 
+def make_downloader(tmp_path):
+    """PDFDownloader that keeps downloads and its failure log under tmp_path"""
+    downloader = PDFDownloader(download_root=str(tmp_path / "downloads"))
+    downloader.log_file = str(tmp_path / "download_failed.txt")
+    return downloader
+
+
 @pytest.fixture
-def downloader():
+def downloader(tmp_path):
     """Create a PDFDownloader instance for testing"""
-    return PDFDownloader()
+    return make_downloader(tmp_path)
 
 
 @pytest.fixture
@@ -192,7 +199,7 @@ async def test_full_pipeline_integration(tmp_path, monkeypatch):
     monkeypatch.setattr("os.makedirs", lambda *args, **kwargs: None)
 
     # Create downloader
-    downloader = PDFDownloader()
+    downloader = make_downloader(tmp_path)
 
     # Execute test
     await downloader.download_pdfs(test_data)
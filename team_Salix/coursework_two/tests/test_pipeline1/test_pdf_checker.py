@@ -6,7 +6,7 @@ import os
 
 import pytest
 
-from pipeline1.modules.pdf_checker import check_pdf_readability
+from pipeline1.modules.pdf_checker import check_pdf_readability, quick_check
 
 
 def test_check_pdf_valid(tmp_path):
@@ -120,3 +120,83 @@ def test_check_pdf_corrupted(tmp_path):
     is_readable, message = check_pdf_readability(str(corrupted_pdf))
     assert not is_readable
     assert "error" in message.lower()
+
+
+def test_check_pdf_truncated_fast_path(tmp_path):
+    """Truncated downloads are rejected by the trailer check"""
+    truncated = tmp_path / "truncated.pdf"
+    truncated.write_bytes(b"%PDF-1.4\n1 0 obj\n<<\n/Type /Catalog\n")
+
+    is_readable, message = check_pdf_readability(str(truncated))
+    assert not is_readable
+    assert "truncated" in message.lower()
+
+
+def test_check_pdf_trailing_padding_is_not_truncated(tmp_path):
+    """%%EOF followed by padding still opens in PyPDF2, so it is not rejected early"""
+    from PyPDF2 import PdfWriter
+
+    padded = tmp_path / "padded.pdf"
+    writer = PdfWriter()
+    writer.add_blank_page(width=612, height=792)
+    with open(padded, "wb") as f:
+        writer.write(f)
+        f.write(b"\0" * 5000)
+
+    assert quick_check(str(padded)) is None
+    # a blank page: rejected only for having no text, after PyPDF2 opened it
+    is_readable, message = check_pdf_readability(str(padded))
+    assert "truncated" not in message.lower()
+
+
+def test_check_all_pdfs_uses_cache(tmp_path, monkeypatch):
+    """Unchanged files are not checked again on a re-scan"""
+    from pipeline1.modules import pdf_checker
+
+    reports = tmp_path / "csr_reports"
+    for company in ("Apple", "Beta"):
+        folder = reports / company / "2024"
+        folder.mkdir(parents=True)
+        (folder / f"{company}_2024.pdf").write_bytes(b"%PDF-1.4\nbroken")
+    cache_path = str(tmp_path / "cache.json")
+
+    first = pdf_checker.check_all_pdfs(str(reports), cache_path, workers=2)
+    assert [r["company"] for r in first] == ["Apple", "Beta"]
+    assert not any(r["is_readable"] for r in first)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("unchanged file was re-checked")
+
+    monkeypatch.setattr(pdf_checker, "check_many", fail)
+    assert pdf_checker.check_all_pdfs(str(reports), cache_path, workers=2) == first
+
+
+def test_check_all_pdfs_rechecks_timed_out_files(tmp_path, monkeypatch):
+    """A timeout is not cached, so the file is checked again on the next run"""
+    from pipeline1.modules import pdf_checker
+
+    reports = tmp_path / "csr_reports"
+    for company in ("Apple", "Beta"):
+        folder = reports / company / "2024"
+        folder.mkdir(parents=True)
+        (folder / f"{company}_2024.pdf").write_bytes(b"%PDF-1.4\nbroken")
+    cache_path = str(tmp_path / "cache.json")
+
+    checked = []
+
+    def flaky_check_many(paths, workers, timeout):
+        for path in paths:
+            checked.append(os.path.basename(path))
+            if "Beta" in path and len(checked) <= 2:
+                yield path, (False, f"{pdf_checker.CHECK_TIMED_OUT} after 1s")
+            else:
+                yield path, (True, "PDF is readable")
+
+    monkeypatch.setattr(pdf_checker, "check_many", flaky_check_many)
+
+    first = pdf_checker.check_all_pdfs(str(reports), cache_path, workers=2)
+    assert [r["is_readable"] for r in first] == [True, False]
+
+    second = pdf_checker.check_all_pdfs(str(reports), cache_path, workers=2)
+    assert checked == ["Apple_2024.pdf", "Beta_2024.pdf", "Beta_2024.pdf"]
+    assert [r["is_readable"] for r in second] == [True, True]
@@ -14,9 +14,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from pipeline2.modules.modelv2 import data_formatting, extract_text_from_pdf
 
 
-def test_text_extraction(sample_pdf_path):
+def test_text_extraction(sample_pdf_path, tmp_path):
     """Test text extraction from PDF"""
-    text = extract_text_from_pdf(sample_pdf_path)
+    text = extract_text_from_pdf(sample_pdf_path, cache_dir=str(tmp_path))
     assert isinstance(text, str)
     assert len(text) > 0
 
@@ -48,10 +48,10 @@ def test_data_formatting():
 
 
 @pytest.mark.integration
-def test_complete_extraction_pipeline(sample_pdf_path):
+def test_complete_extraction_pipeline(sample_pdf_path, tmp_path):
     """Integration test for the complete text extraction pipeline"""
     # Test the complete process
-    text = extract_text_from_pdf(sample_pdf_path)
+    text = extract_text_from_pdf(sample_pdf_path, cache_dir=str(tmp_path))
     assert isinstance(text, str)
     assert len(text) > 0
 
@@ -68,3 +68,124 @@ def test_complete_extraction_pipeline(sample_pdf_path):
             "employee diversity",
         ]
     )
+
+
+def test_text_extraction_parallel_matches_serial(sample_pdf_path, monkeypatch):
+    """Splitting pages across workers keeps the same pages in the same order"""
+    from pipeline2.modules import modelv2
+
+    serial = extract_text_from_pdf(sample_pdf_path, cache_dir="")
+    monkeypatch.setattr(modelv2, "PARALLEL_MIN_PAGES", 2)
+    monkeypatch.setattr(modelv2, "PAGE_WORKERS", 3)
+    assert extract_text_from_pdf(sample_pdf_path, cache_dir="") == serial
+
+
+def test_text_extraction_cache(sample_pdf_path, tmp_path, monkeypatch):
+    """A second run for the same file is served from the cache"""
+    from pipeline2.modules import modelv2
+
+    cache_dir = str(tmp_path / "cache")
+    first = extract_text_from_pdf(sample_pdf_path, cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError("PDF was parsed again")
+
+    monkeypatch.setattr(modelv2, "_page_texts", fail)
+    monkeypatch.setattr(modelv2, "_page_count", fail)
+    assert extract_text_from_pdf(sample_pdf_path, cache_dir=cache_dir) == first
+
+
+def _fake_reports(root, pairs):
+    for company, year in pairs:
+        folder = root / company / year
+        folder.mkdir(parents=True)
+        (folder / "report.pdf").write_bytes(b"%PDF-1.4")
+
+
+def test_run_extraction_concurrent_and_resumable(tmp_path, monkeypatch):
+    """All reports end up in the CSV once; a rerun only retries failed ones"""
+    import csv
+    import threading
+
+    from pipeline2.modules import modelv2
+
+    reports = tmp_path / "reports"
+    _fake_reports(reports, [("Acme", "2022"), ("Acme", "2023"), ("Beta", "2023")])
+    csv_path, log_path = tmp_path / "out.csv", tmp_path / "log.txt"
+    ledger = tmp_path / "ledger.jsonl"
+
+    calls = []
+    lock = threading.Lock()
+
+    def fake_grok(company_name, text):
+        with lock:
+            calls.append(company_name)
+        if company_name == "Beta":
+            return None
+        return "Scope 1 Emissions: 100 tCO2e\nEmployee Diversity: 40%"
+
+    monkeypatch.setattr(modelv2, "extract_text_from_pdf", lambda path, **kw: "emissions text")
+    monkeypatch.setattr(modelv2, "find_data_in_text_grok", fake_grok)
+    monkeypatch.setattr(modelv2, "find_data_in_text_deepseek", lambda *a: None)
+
+    counts = modelv2.run_extraction(
+        str(reports), str(csv_path), str(log_path), ledger_path=str(ledger), workers=3, text_workers=0
+    )
+    assert counts == {"skipped": 0, "ok": 2, "no_data": 1}
+    with open(csv_path, encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == modelv2.CSV_HEADER
+    assert sorted(r[:3] for r in rows[1:]) == [["Acme", "2022", "100"], ["Acme", "2023", "100"]]
+
+    calls.clear()
+    counts = modelv2.run_extraction(
+        str(reports), str(csv_path), str(log_path), ledger_path=str(ledger), workers=3, text_workers=0
+    )
+    assert calls == ["Beta"]
+    assert counts == {"skipped": 2, "no_data": 1}
+    with open(csv_path, encoding="utf-8") as f:
+        assert len(list(csv.reader(f))) == 3
+
+
+def test_run_extraction_reads_pdfs_in_process_pool(sample_pdf_path, tmp_path, monkeypatch):
+    """PDF text comes from the process pool, without nested pools; provider calls stay in-process"""
+    import shutil
+
+    from pipeline2.modules import modelv2
+
+    reports = tmp_path / "reports"
+    for company in ("Acme", "Beta"):
+        folder = reports / company / "2023"
+        folder.mkdir(parents=True)
+        shutil.copy(sample_pdf_path, folder / "report.pdf")
+    (reports / "Gamma" / "2023").mkdir(parents=True)
+
+    def no_nested_pool(*args):
+        raise AssertionError("page pool started inside a text worker")
+
+    texts = []
+    monkeypatch.setattr(modelv2, "TEXT_CACHE_DIR", "")
+    monkeypatch.setattr(modelv2, "PARALLEL_MIN_PAGES", 1)
+    monkeypatch.setattr(modelv2, "_select_pages_parallel", no_nested_pool)
+    monkeypatch.setattr(modelv2, "find_data_in_text_grok", lambda company, text: texts.append(text) or "Scope 1 Emissions: 5")
+    monkeypatch.setattr(modelv2, "find_data_in_text_deepseek", lambda *a: None)
+
+    counts = modelv2.run_extraction(
+        str(reports), str(tmp_path / "out.csv"), str(tmp_path / "log.txt"), workers=2, text_workers=2
+    )
+    assert counts == {"skipped": 0, "no_pdf": 1, "ok": 2}
+    assert texts == [extract_text_from_pdf(sample_pdf_path, cache_dir="")] * 2
+
+
+def test_rate_limiter_spaces_calls():
+    """Calls through a shared limiter are spaced by 60 / rpm seconds"""
+    import time
+
+    from pipeline2.modules.modelv2 import RateLimiter
+
+    limiter = RateLimiter(rpm=1200)  # 0.05 s apart
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.wait()
+    assert time.monotonic() - start >= 0.19
@@ -9,6 +9,7 @@ from dotenv import load_dotenv
 from loguru import logger
 from typing import List
 import team_adansonia.coursework_one.a_link_retrieval.modules.validation.validation as validation
+import team_adansonia.coursework_one.a_link_retrieval.modules.validation.pdf_preview as pdf_preview
 # Load environment variables
 load_dotenv()
 
@@ -165,12 +166,15 @@ def _score_esg_report(pdf_url: str, company_name: str, target_year: str) -> int:
     This function's logic remains unchanged.
     """
     try:
-        response = requests.get(pdf_url, timeout=10)
-        response.raise_for_status()
-
-        pdf_document = fitz.open(stream=response.content, filetype="pdf")
-        text = "".join(pdf_document[page_num].get_text("text").lower() for page_num in range(min(3, len(pdf_document))))
-        pdf_document.close()
+        # Only the first pages are needed; shared (cached) with validation
+        preview = pdf_preview.get_pdf_preview(pdf_url)
+        if preview is None or not preview.ok:
+            logger.error(f"Failed to fetch PDF: {pdf_url}")
+            return None
+        if not preview.has_text:
+            logger.warning(f"❌ No extractable text in the first pages of {pdf_url}.")
+            return None
+        text = preview.text(3)
 
         score = 0
         esg_keywords = ["esg", "sustainability", "environmental", "social", "governance"]
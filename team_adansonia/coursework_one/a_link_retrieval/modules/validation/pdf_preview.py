@@ -0,0 +1,207 @@
+"""
+Partial PDF fetching for candidate scoring and validation.
+
+Both the Google API crawler (`_score_esg_report`) and `is_valid_esg_report_from_url`
+only look at the first few pages of a candidate PDF, but used to download the whole
+file (often 50-100 MB). `get_pdf_preview` fetches as little as possible:
+
+1. `Range: bytes=0-…` for the leading bytes; linearized PDFs (and many others)
+   have their first pages there.
+2. If those pages cannot be read yet, `Range: bytes=-…` for the trailer / xref
+   region, parsed together with the head.
+3. Otherwise (or when the server ignores Range) stream the body and stop as soon
+   as the first pages parse, or at `STREAM_LIMIT_BYTES`.
+
+Results are cached in-process by URL, so scoring and validating the same
+candidate downloads it once. TLS certificates are verified unless the caller
+passes `verify=False`.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import fitz  # PyMuPDF
+import requests
+from loguru import logger
+
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+TIMEOUT = (10, 30)  # connect, read
+MAX_PAGES = 3
+HEAD_BYTES = 1024 * 1024
+TAIL_BYTES = 256 * 1024
+STREAM_LIMIT_BYTES = 32 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+CACHE_SIZE = 512
+
+_CONTENT_RANGE_RE = re.compile(r"bytes \d+-\d+/(\d+)")
+
+
+@dataclass
+class PdfPreview:
+    """Text of the first `MAX_PAGES` pages of a PDF plus what it took to get it."""
+
+    url: str
+    status_code: int
+    content_type: str = ""
+    pages: List[str] = field(default_factory=list)
+    bytes_read: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code in (200, 206) and bool(self.pages)
+
+    @property
+    def has_text(self) -> bool:
+        return any(p.strip() for p in self.pages)
+
+    def text(self, max_pages: int = MAX_PAGES) -> str:
+        """Lower-cased text of the first `max_pages` pages."""
+        return "".join(self.pages[:max_pages]).lower()
+
+
+_cache: "OrderedDict[tuple, Optional[PdfPreview]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+def _content_present(doc, page) -> bool:
+    """True if every content stream of `page` is in the data (it may still draw no text)."""
+    xrefs = page.get_contents()
+    if not xrefs:
+        return False
+    try:
+        return all(doc.xref_stream(xref) is not None for xref in xrefs)
+    except Exception:  # object cut off by the truncation
+        return False
+
+
+def _first_pages(data: bytes, max_pages: int = MAX_PAGES, partial: bool = True) -> Optional[List[str]]:
+    """
+    Page texts of the first `max_pages` pages, or None if they cannot be read yet.
+
+    For `partial` (truncated) data every one of those pages must be complete: MuPDF's
+    repair happily returns a document whose later pages are empty because their
+    content lies beyond the bytes read so far. A page counts as complete when it has
+    text or all of its content streams are present (e.g. an image-only cover). For
+    complete data the pages are returned as they are, even without text.
+    """
+    try:
+        with fitz.open(stream=data, filetype="pdf") as doc:
+            count = min(max_pages, len(doc))
+            pages = [doc[i].get_text("text") for i in range(count)]
+            if partial and not all(p.strip() or _content_present(doc, doc[i]) for i, p in enumerate(pages)):
+                return None
+    except Exception:
+        return None
+    return pages or None
+
+
+def _total_size(response) -> Optional[int]:
+    match = _CONTENT_RANGE_RE.match(response.headers.get("Content-Range", ""))
+    return int(match.group(1)) if match else None
+
+
+def _get(url: str, byte_range: Optional[str] = None, stream: bool = False, verify: bool = True):
+    headers = dict(HEADERS)
+    if byte_range:
+        headers["Range"] = f"bytes={byte_range}"
+    return requests.get(url, headers=headers, stream=stream, verify=verify, timeout=TIMEOUT)
+
+
+def _stream_until_parsed(response, buf: bytearray, preview: PdfPreview) -> Optional[List[str]]:
+    """Append the response body to `buf`, re-trying the parse each time the buffer doubles."""
+    next_try = max(len(buf) * 2, HEAD_BYTES)
+    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+        buf.extend(chunk)
+        preview.bytes_read += len(chunk)
+        if len(buf) >= next_try:
+            pages = _first_pages(bytes(buf))
+            if pages:
+                return pages
+            next_try = len(buf) * 2
+        if len(buf) >= STREAM_LIMIT_BYTES:
+            logger.warning(f"Stopped reading {preview.url} at {len(buf)} bytes before all first pages parsed.")
+            return _first_pages(bytes(buf), partial=False)
+    return _first_pages(bytes(buf), partial=False)
+
+
+def _fetch(url: str, verify: bool = True) -> Optional[PdfPreview]:
+    with _get(url, byte_range=f"0-{HEAD_BYTES - 1}", stream=True, verify=verify) as response:
+        preview = PdfPreview(url, response.status_code, response.headers.get("Content-Type", ""))
+        if response.status_code not in (200, 206):
+            return preview
+
+        if response.status_code == 200:
+            # Range ignored: stream the whole body with an early cut-off
+            preview.pages = _stream_until_parsed(response, bytearray(), preview) or []
+            return preview
+
+        head = response.content
+        preview.bytes_read += len(head)
+        total = _total_size(response)
+
+    if total is not None and total <= len(head):
+        preview.pages = _first_pages(head, partial=False) or []
+        return preview
+    pages = _first_pages(head)
+    if pages:
+        preview.pages = pages
+        return preview
+
+    # First pages not in the head: try again with the trailer / xref region
+    with _get(url, byte_range=f"-{TAIL_BYTES}", verify=verify) as tail_response:
+        if tail_response.status_code == 206:
+            tail = tail_response.content
+            preview.bytes_read += len(tail)
+            pages = _first_pages(head + tail)
+    if pages:
+        preview.pages = pages
+        return preview
+
+    # Last resort: stream the rest of the file until the first pages parse
+    with _get(url, byte_range=f"{len(head)}-", stream=True, verify=verify) as rest:
+        buf = bytearray(head)
+        if rest.status_code == 200:
+            buf = bytearray()  # server sent the whole file again
+        elif rest.status_code != 206:
+            return preview
+        preview.pages = _stream_until_parsed(rest, buf, preview) or []
+    return preview
+
+
+def get_pdf_preview(url: str, verify: bool = True) -> Optional[PdfPreview]:
+    """
+    Fetch (or return the cached) preview of the first pages of the PDF at `url`.
+
+    :param url: URL of the PDF.
+    :param verify: Verify the server's TLS certificate. An unverified lookup may
+        reuse a preview fetched with verification, but not the other way round.
+    :return: PdfPreview (check `.ok` and `.has_text`), or None if the request itself failed.
+    """
+    key = (url, verify)
+    with _cache_lock:
+        for candidate in (key,) if verify else (key, (url, True)):
+            if candidate in _cache and (candidate == key or _cache[candidate] is not None):
+                _cache.move_to_end(candidate)
+                return _cache[candidate]
+
+    try:
+        preview = _fetch(url, verify=verify)
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Failed to fetch PDF: {url}, Error: {e}")
+        preview = None
+
+    if preview is not None:
+        logger.debug(f"Read {preview.bytes_read} bytes of {url} ({len(preview.pages)} pages)")
+    with _cache_lock:
+        _cache[key] = preview
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return preview
@@ -6,6 +6,7 @@ from Crypto.SelfTest.Hash.test_cSHAKE import descr
 import requests
 import fitz  # PyMuPDF
 import urllib3
+from .pdf_preview import get_pdf_preview
 # Disable SSL warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -89,23 +90,20 @@ def is_valid_esg_report_from_url(pdf_url: str, company_name: str, year: str) ->
     stripped_name = company_name.lower().split()[0]
 
     try:
-        # Fetch the PDF into memory
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(pdf_url, headers=headers, verify=False, timeout=30)
+        # Fetch only the first pages of the PDF (Range requests, cached by URL);
+        # validation has always skipped certificate checks
+        preview = get_pdf_preview(pdf_url, verify=False)
 
         # Check if the request was successful
-        if response.status_code != 200 or "pdf" not in response.headers.get("Content-Type", ""):
+        if preview is None or not preview.ok or "pdf" not in preview.content_type:
             print(f"Failed to fetch PDF: {pdf_url}")
             return False
-
-        # Open PDF from memory stream
-        pdf_document = fitz.open(stream=response.content, filetype="pdf")
+        if not preview.has_text:
+            print(f"No extractable text in the first pages of PDF: {pdf_url}")
+            return False
 
         # Extract text from the first 2 pages (or fewer if the document is shorter)
-        num_pages = min(2, len(pdf_document))
-        text = "".join(pdf_document[page].get_text("text").lower() for page in range(num_pages))
-
-        pdf_document.close()
+        text = preview.text(2)
 
         # Check for ESG keywords
         if not any(keyword in text.lower() for keyword in ESG_KEYWORDS):
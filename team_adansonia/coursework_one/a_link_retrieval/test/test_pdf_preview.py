@@ -0,0 +1,206 @@
+import os
+import threading
+from functools import partial
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+from socketserver import ThreadingMixIn
+
+import fitz
+import pytest
+
+from team_adansonia.coursework_one.a_link_retrieval.modules.validation import pdf_preview
+
+
+class RangeHandler(SimpleHTTPRequestHandler):
+    """Static file server with single-range support (or none, if support_range is False)."""
+    support_range = True
+    requests_seen = []
+
+    def do_GET(self):
+        path = self.translate_path(self.path)
+        with open(path, "rb") as f:
+            data = f.read()
+        self.requests_seen.append(self.headers.get("Range"))
+        rng = self.headers.get("Range") if self.support_range else None
+        if rng:
+            spec = rng.split("=", 1)[1]
+            start, end = spec.split("-")
+            if start == "":
+                start, end = len(data) - int(end), len(data) - 1
+            else:
+                start, end = int(start), min(int(end) if end else len(data) - 1, len(data) - 1)
+            body = data[start:end + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        else:
+            body = data
+            self.send_response(200)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+class Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def large_pdf(tmp_path):
+    """~5 MB report whose first page mentions the company and year."""
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), "Acme Corp 2023 Sustainability Report - ESG and governance")
+    for i in range(60):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Appendix page {i}")
+        page.insert_image(page.rect, stream=_noise_png(), keep_proportion=False)
+    path = tmp_path / "report.pdf"
+    doc.save(str(path))
+    return path
+
+
+def _noise_png():
+    pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 160, 160), False)
+    pix.set_rect(pix.irect, (0, 0, 0))
+    samples = bytearray(os.urandom(len(pix.samples)))
+    return fitz.Pixmap(fitz.csRGB, 160, 160, bytes(samples), False).tobytes("png")
+
+
+@pytest.fixture
+def serve(large_pdf):
+    servers = []
+
+    def start(support_range=True):
+        handler = type("H", (RangeHandler,), {"support_range": support_range, "requests_seen": []})
+        server = Server(("127.0.0.1", 0), partial(handler, directory=str(large_pdf.parent)))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}/report.pdf", handler
+
+    pdf_preview.clear_cache()
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def test_range_preview_reads_a_fraction_of_the_file(serve, large_pdf):
+    url, handler = serve()
+    preview = pdf_preview.get_pdf_preview(url)
+
+    assert preview.ok and preview.status_code == 206
+    assert "acme corp 2023 sustainability report" in preview.text(2)
+    assert preview.bytes_read < large_pdf.stat().st_size / 2
+    assert all(r is not None for r in handler.requests_seen)
+
+
+def test_head_with_only_the_first_page_falls_through_to_tail(serve, large_pdf):
+    """A large image on page 1 pushes pages 2-3 out of the head; they must not come back empty."""
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), "Acme Corp 2023")
+    pix = fitz.Pixmap(fitz.csRGB, 700, 700, os.urandom(700 * 700 * 3), False)
+    page.insert_image(page.rect, stream=pix.tobytes("png"))
+    for text in ("Sustainability report", "Governance"):
+        doc.new_page().insert_text((72, 72), text)
+    doc.save(str(large_pdf.parent / "cover.pdf"))
+
+    url, _ = serve()
+    preview = pdf_preview.get_pdf_preview(url.replace("report.pdf", "cover.pdf"))
+
+    assert preview.ok
+    assert "sustainability report" in preview.text(2)
+
+
+def test_preview_is_cached_by_url(serve):
+    url, handler = serve()
+    first = pdf_preview.get_pdf_preview(url)
+    n_requests = len(handler.requests_seen)
+    assert pdf_preview.get_pdf_preview(url) is first
+    assert len(handler.requests_seen) == n_requests
+
+
+def test_server_without_range_support_streams_with_cutoff(serve, large_pdf, monkeypatch):
+    url, _ = serve(support_range=False)
+    preview = pdf_preview.get_pdf_preview(url)
+    assert preview.status_code == 200
+    assert "acme corp" in preview.text()
+
+    pdf_preview.clear_cache()
+    monkeypatch.setattr(pdf_preview, "STREAM_LIMIT_BYTES", 64 * 1024)
+    monkeypatch.setattr(pdf_preview, "_first_pages", lambda data, max_pages=3, partial=True: None)
+    preview = pdf_preview.get_pdf_preview(url)
+    assert not preview.ok
+    assert preview.bytes_read < large_pdf.stat().st_size
+
+
+def test_validation_uses_preview(serve):
+    from team_adansonia.coursework_one.a_link_retrieval.modules.validation.validation import (
+        is_valid_esg_report_from_url,
+    )
+
+    url, _ = serve()
+    assert is_valid_esg_report_from_url(url, "Acme Corp", "2023")
+    assert not is_valid_esg_report_from_url(url, "Globex Inc", "2023")
+
+
+def test_image_only_cover_is_read_from_the_head(serve, large_pdf):
+    """A cover with no text but a readable content stream counts as downloaded, so no streaming."""
+    doc = fitz.open()
+    pix = fitz.Pixmap(fitz.csRGB, 200, 200, os.urandom(200 * 200 * 3), False)
+    doc.new_page().insert_image(fitz.Rect(0, 0, 595, 842), stream=pix.tobytes("png"))
+    for text in ("Acme Corp 2023 Sustainability report", "Governance"):
+        doc.new_page().insert_text((72, 72), text)
+    for i in range(60):
+        page = doc.new_page()
+        page.insert_image(page.rect, stream=_noise_png(), keep_proportion=False)
+    path = large_pdf.parent / "image_cover.pdf"
+    doc.save(str(path))
+
+    url, handler = serve()
+    preview = pdf_preview.get_pdf_preview(url.replace("report.pdf", "image_cover.pdf"))
+
+    assert preview.ok and "sustainability report" in preview.text()
+    assert handler.requests_seen == [
+        f"bytes=0-{pdf_preview.HEAD_BYTES - 1}",
+        f"bytes=-{pdf_preview.TAIL_BYTES}",
+    ]
+    assert preview.bytes_read < path.stat().st_size / 2
+
+
+def test_pdf_without_text_is_fetched_but_has_no_text(serve, large_pdf, capsys):
+    from team_adansonia.coursework_one.a_link_retrieval.modules.validation.validation import (
+        is_valid_esg_report_from_url,
+    )
+
+    doc = fitz.open()
+    doc.new_page().draw_rect(fitz.Rect(10, 10, 100, 100), fill=(0, 0, 0))
+    doc.save(str(large_pdf.parent / "blank.pdf"))
+
+    url, _ = serve()
+    url = url.replace("report.pdf", "blank.pdf")
+    preview = pdf_preview.get_pdf_preview(url)
+    assert preview.ok and not preview.has_text
+
+    assert not is_valid_esg_report_from_url(url, "Acme Corp", "2023")
+    out = capsys.readouterr().out
+    assert "No extractable text" in out and "Failed to fetch" not in out
+
+
+def test_tls_verification_is_on_by_default(monkeypatch):
+    seen = []
+
+    def fake_fetch(url, verify=True):
+        seen.append(verify)
+        return None
+
+    pdf_preview.clear_cache()
+    monkeypatch.setattr(pdf_preview, "_fetch", fake_fetch)
+    pdf_preview.get_pdf_preview("https://example.com/a.pdf")
+    pdf_preview.get_pdf_preview("https://example.com/a.pdf", verify=False)
+    assert seen == [True, False]  # a failed verified fetch is not reused unverified
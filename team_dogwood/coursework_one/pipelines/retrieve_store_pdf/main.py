@@ -1,13 +1,19 @@
 """
 Retrieves each row from csr_reporting.company_csr_reports and downloads/stores
-the PDF in MinIO. Bypasses local storage by streaming to memory.
+the PDF in MinIO. Bypasses local storage by streaming each HTTP response
+straight into a MinIO multipart upload.
 
+Downloads run in a thread pool fed from per-host queues, so at most a few
+requests hit the same host and no worker ever waits on a busy host. Objects
+already in the bucket (one listing up front) are skipped.
 """
 
-import io
 import os
 import sys
-from typing import List
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import List, Optional
+from urllib.parse import urlparse
 
 import requests
 from loguru import logger
@@ -49,60 +55,162 @@ def get_all_report_urls(db: PostgreSQLDB) -> List[dict]:
     return companies_list
 
 
-def retrieve_and_store_pdf(records: List[Company]) -> None:
+# Concurrent downloads overall / per host, and bytes held per upload
+MAX_WORKERS = int(os.getenv("PDF_MAX_WORKERS", "16"))
+PER_HOST_LIMIT = int(os.getenv("PDF_PER_HOST_LIMIT", "4"))
+PART_SIZE = 10 * 1024 * 1024
+# (connect, read) timeouts in seconds
+REQUEST_TIMEOUT = (10, 60)
+
+
+class HostQueues:
+    """
+    Planned downloads queued per host and handed out round-robin.
+
+    ``next_ready`` only returns work for hosts with fewer than ``per_host``
+    downloads in flight, so the caller never submits a task that would have to
+    wait on a busy host and one slow server cannot take every worker. Call
+    ``done`` with the host once its download finishes.
     """
-    Downloads all known CSR PDFs from 'csr_reporting.company_csr_reports' for a given symbol,
-    and stores them in MinIO under {symbol}/{report_year}/pdf_name.
+
+    def __init__(self, planned: List[tuple], per_host: int = PER_HOST_LIMIT):
+        self.per_host = max(1, per_host)
+        self._queues = OrderedDict()
+        self._in_flight = Counter()
+        for item in planned:
+            host = urlparse(item[1].url).netloc.lower()
+            self._queues.setdefault(host, deque()).append(item)
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def next_ready(self) -> Optional[tuple]:
+        """(host, planned item) from the next host below its limit, or None if every queued host is busy."""
+        for _ in range(len(self._queues)):
+            host, queue = next(iter(self._queues.items()))
+            self._queues.move_to_end(host)
+            if self._in_flight[host] < self.per_host:
+                item = queue.popleft()
+                if not queue:
+                    del self._queues[host]
+                self._in_flight[host] += 1
+                return host, item
+        return None
+
+    def done(self, host: str) -> None:
+        self._in_flight[host] -= 1
+
+
+def plan_downloads(records: List[Company], existing: set) -> List[tuple]:
     """
-    # Initialize the MinIO filesystem wrapper
-    minio_fs = MinioFileSystem()
+    (company, report, file_name, object_name) for every report not yet stored in MinIO.
 
-    # 3. Iterate over each record and download/store the PDF
+    Reports mapping to the same object name are only downloaded once.
+    """
+    planned, seen = [], set(existing)
     for company in records:
         for report in company.esg_reports:
+            if not report.url:
+                continue
             # Derive a filename from the URL or fallback
             file_name = report.url.split("/")[-1] or "report.pdf"
-
-            logger.info(f"Attempting to download PDF from: {report.url}")
-            try:
-                # Stream-download to in-memory buffer
-                response = requests.get(report.url, stream=True, timeout=15)
-                if response.status_code != 200:
-                    logger.warning(
-                        f"Failed to download {report.url} [status={response.status_code}]. Skipping."
-                    )
-                    continue
-
-                pdf_buffer = io.BytesIO()
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        pdf_buffer.write(chunk)
-
-                # Get the size of the data in BytesIO object
-                pdf_buffer.seek(0, io.SEEK_END)  # Move to the end
-                file_size = pdf_buffer.tell()  # Get size of data
-                pdf_buffer.seek(0)  # Reset the pointer back to the start
-
-            except Exception as e:
-                logger.error(f"Error downloading {report.url}: {e}. Skipping.")
+            object_name = f"{company.security}/{report.year}/{file_name}"
+            if object_name in seen:
                 continue
-
-            # Upload to MinIO
-            logger.info(
-                f"Uploading '{file_name}' for {company.security}, year={report.year} to MinIO..."
-            )
-            try:
-                object_name = minio_fs.write_pdf_bytes(
-                    pdf_bytes=pdf_buffer,
-                    company_id=company.security,
-                    report_year=report.year,
-                    file_name=file_name,
-                    file_size=file_size,
+            seen.add(object_name)
+            planned.append((company, report, file_name, object_name))
+    return planned
+
+
+def store_report(
+    minio_fs: MinioFileSystem,
+    session: requests.Session,
+    company: Company,
+    report: ESGReport,
+    file_name: str,
+) -> str:
+    """
+    Stream one report from its URL into MinIO. Returns "stored", "http_error" or "failed".
+    """
+    logger.info(f"Attempting to download PDF from: {report.url}")
+    try:
+        with session.get(report.url, stream=True, timeout=REQUEST_TIMEOUT) as response:
+            if response.status_code != 200:
+                logger.warning(
+                    f"Failed to download {report.url} [status={response.status_code}]. Skipping."
                 )
-                logger.info(f"Successfully uploaded to MinIO path: {object_name}")
-            except Exception as e:
-                logger.error(f"Error uploading to MinIO: {e}")
-                raise Exception("Failed to upload PDF to MinIO.")
+                return "http_error"
+            # undo gzip/deflate transfer encoding while streaming
+            response.raw.decode_content = True
+            object_name = minio_fs.write_pdf_stream(
+                response.raw,
+                company_id=company.security,
+                report_year=report.year,
+                file_name=file_name,
+                part_size=PART_SIZE,
+            )
+    except Exception as e:
+        logger.error(f"Error storing {report.url}: {e}. Skipping.")
+        return "failed"
+
+    logger.info(f"Successfully uploaded to MinIO path: {object_name}")
+    return "stored"
+
+
+def retrieve_and_store_pdf(
+    records: List[Company],
+    max_workers: int = MAX_WORKERS,
+    per_host: int = PER_HOST_LIMIT,
+    minio_fs: MinioFileSystem = None,
+) -> Counter:
+    """
+    Downloads all known CSR PDFs from 'csr_reporting.company_csr_reports'
+    and stores them in MinIO under {security}/{report_year}/pdf_name.
+
+    Objects already in the bucket are skipped. Downloads run concurrently
+    (at most ``per_host`` per host, scheduled from ``HostQueues`` so workers
+    only ever get hosts with a free slot) and each response is streamed into
+    a multipart upload, so memory stays flat at about ``max_workers`` parts.
+
+    Returns:
+        Counter: number of reports per outcome ("stored", "skipped", "http_error", "failed").
+    """
+    # Initialize the MinIO filesystem wrapper
+    minio_fs = minio_fs or MinioFileSystem()
+    minio_fs.create_bucket(minio_fs.bucket_name)
+
+    existing = minio_fs.list_all_files()
+    planned = plan_downloads(records, existing)
+    total = sum(len(company.esg_reports) for company in records)
+    counts = Counter(skipped=total - len(planned))
+    logger.info(f"{len(planned)} reports to download, {counts['skipped']} already stored or duplicated.")
+
+    queues = HostQueues(planned, per_host)
+    running, done = {}, 0
+    with requests.Session() as session:
+        adapter = requests.adapters.HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while queues or running:
+                # Fill free workers with reports from hosts that have a free slot
+                while len(running) < max_workers:
+                    ready = queues.next_ready()
+                    if ready is None:
+                        break
+                    host, (company, report, file_name, _) = ready
+                    future = executor.submit(store_report, minio_fs, session, company, report, file_name)
+                    running[future] = host
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    queues.done(running.pop(future))
+                    counts[future.result()] += 1
+                    done += 1
+                    if done % 100 == 0:
+                        logger.info(f"Progress: {done}/{len(planned)} {dict(counts)}")
+
+    logger.info(f"Finished: {dict(counts)}")
+    return counts
 
 
 def main() -> None:
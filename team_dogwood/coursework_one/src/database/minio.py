@@ -59,6 +59,20 @@ class MinioFileSystem(MinioFileSystemRepo):
         )
         return [obj.object_name for obj in objects]
 
+    def list_all_files(self, prefix: str = "") -> set:
+        """Lists every object under ``prefix`` in a single recursive listing.
+
+        Args:
+            prefix (str, optional): Only list objects under this prefix. Defaults to the whole bucket.
+
+        Returns:
+            set: Object names, e.g. {"Apple Inc./2023/report.pdf", ...}.
+        """
+        objects = self.client.list_objects(
+            self.bucket_name, prefix=prefix or None, recursive=True
+        )
+        return {obj.object_name for obj in objects}
+
     def view_pdf(self, object_name: str, expiry_hours: int = 1):
         """Generates a presigned URL to view the PDF in a web browser.
 
@@ -149,6 +163,41 @@ class MinioFileSystem(MinioFileSystemRepo):
 
         return object_name
 
+    def write_pdf_stream(
+        self,
+        stream,
+        company_id: str,
+        report_year: str,
+        file_name: str,
+        part_size: int = 10 * 1024 * 1024,
+    ):
+        """Uploads a PDF from a file-like stream of unknown length as a multipart upload.
+
+        Only one part (``part_size`` bytes) is held in memory at a time, so an HTTP response
+        body can be piped straight into MinIO without buffering the whole file. The bucket
+        is expected to exist (see `create_bucket`).
+
+        Args:
+            stream: Readable file-like object, e.g. ``requests.Response.raw``.
+            company_id (str): The ID of the company for which the PDF is being uploaded.
+            report_year (str): The year of the CSR report.
+            file_name (str): The name of the file to be saved.
+            part_size (int, optional): Multipart chunk size in bytes (minimum 5 MiB). Defaults to 10 MiB.
+
+        Returns:
+            str: The object name (MinIO path), e.g., "123/2024/report.pdf".
+        """
+        object_name = f"{company_id}/{report_year}/{file_name}"
+        self.client.put_object(
+            bucket_name=self.bucket_name,
+            object_name=object_name,
+            data=stream,
+            length=-1,
+            part_size=part_size,
+            content_type="application/pdf",
+        )
+        return object_name
+
 
 if __name__ == "__main__":
     minio = MinioFileSystem()
@@ -0,0 +1,109 @@
+import importlib.util
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../.."))
+
+pytest.importorskip("ift_global")
+
+from src.data_models.company import Company, ESGReport
+
+MAIN_PATH = os.path.join(
+    os.path.dirname(__file__), "../../pipelines/retrieve_store_pdf/main.py"
+)
+spec = importlib.util.spec_from_file_location("retrieve_store_pdf_main", MAIN_PATH)
+pipeline = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(pipeline)
+
+
+def make_company(name, *reports):
+    return Company(
+        security=name,
+        esg_reports=[ESGReport(url=url, year=year) for url, year in reports],
+    )
+
+
+def planned_item(url, name="Apple Inc.", year="2023"):
+    company = make_company(name, (url, year))
+    report = company.esg_reports[0]
+    return (company, report, url.split("/")[-1], f"{name}/{year}/{url.split('/')[-1]}")
+
+
+def test_plan_downloads_skips_existing_duplicate_and_missing_urls():
+    records = [
+        make_company(
+            "Apple Inc.",
+            ("https://a.com/esg_2023.pdf", "2023"),
+            ("https://a.com/esg_2022.pdf", "2022"),
+            (None, "2021"),
+        ),
+        # Same object name as an earlier report: only downloaded once
+        make_company("Apple Inc.", ("https://mirror.com/esg_2023.pdf", "2023")),
+        make_company("Microsoft", ("https://m.com/", "2023")),
+    ]
+    existing = {"Apple Inc./2022/esg_2022.pdf"}
+
+    planned = pipeline.plan_downloads(records, existing)
+
+    assert [item[3] for item in planned] == [
+        "Apple Inc./2023/esg_2023.pdf",
+        "Microsoft/2023/report.pdf",
+    ]
+    assert planned[0][1].url == "https://a.com/esg_2023.pdf"
+    assert existing == {"Apple Inc./2022/esg_2022.pdf"}
+
+
+def test_host_queues_round_robin_and_per_host_limit():
+    planned = [planned_item(f"https://a.com/{i}.pdf") for i in range(3)]
+    planned.append(planned_item("https://b.com/0.pdf"))
+    queues = pipeline.HostQueues(planned, per_host=1)
+
+    first = queues.next_ready()
+    second = queues.next_ready()
+    assert (first[0], second[0]) == ("a.com", "b.com")
+    # a.com is at its limit and b.com has nothing left
+    assert queues.next_ready() is None
+    assert len(queues) == 2
+
+    queues.done("a.com")
+    host, item = queues.next_ready()
+    assert host == "a.com" and item[1].url == "https://a.com/1.pdf"
+
+
+def test_busy_host_does_not_hold_up_other_hosts():
+    # Slow host first, so a blocking per-host limit inside the workers would fill
+    # every worker with slow.com reports before fast.com got a turn
+    records = [
+        make_company("Slow Co", *[(f"https://slow.com/{i}.pdf", "2023") for i in range(6)]),
+        make_company("Fast Co", *[(f"https://fast.com/{i}.pdf", "2023") for i in range(6)]),
+    ]
+    lock = threading.Lock()
+    in_flight, peak, finished = Counter(), Counter(), []
+
+    def fake_store(minio_fs, session, company, report, file_name):
+        host = report.url.split("/")[2]
+        with lock:
+            in_flight[host] += 1
+            peak[host] = max(peak[host], in_flight[host])
+        time.sleep(0.2 if host == "slow.com" else 0.01)
+        with lock:
+            in_flight[host] -= 1
+            finished.append(host)
+        return "stored"
+
+    minio_fs = MagicMock()
+    minio_fs.list_all_files.return_value = set()
+    with patch.object(pipeline, "store_report", side_effect=fake_store):
+        counts = pipeline.retrieve_and_store_pdf(
+            records, max_workers=4, per_host=2, minio_fs=minio_fs
+        )
+
+    assert counts["stored"] == 12 and counts["skipped"] == 0
+    assert peak == Counter({"slow.com": 2, "fast.com": 2})
+    assert finished[:6] == ["fast.com"] * 6
@@ -0,0 +1,67 @@
+import io
+import os
+import sys
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../.."))
+
+pytest.importorskip("ift_global")
+
+from src.database.minio import MinioFileSystem
+
+
+@pytest.fixture
+def minio_fs():
+    with patch("src.database.minio.Minio"):
+        fs = MinioFileSystem()
+    fs.bucket_name = "csr-reports"
+    return fs
+
+
+def test_list_all_files_uses_one_recursive_listing(minio_fs):
+    minio_fs.client.list_objects.return_value = [
+        SimpleNamespace(object_name="Apple Inc./2023/report.pdf"),
+        SimpleNamespace(object_name="Apple Inc./2022/report.pdf"),
+    ]
+
+    assert minio_fs.list_all_files() == {
+        "Apple Inc./2023/report.pdf",
+        "Apple Inc./2022/report.pdf",
+    }
+    minio_fs.client.list_objects.assert_called_once_with(
+        "csr-reports", prefix=None, recursive=True
+    )
+
+
+def test_list_all_files_with_prefix(minio_fs):
+    minio_fs.client.list_objects.return_value = []
+
+    assert minio_fs.list_all_files("Apple Inc./") == set()
+    minio_fs.client.list_objects.assert_called_once_with(
+        "csr-reports", prefix="Apple Inc./", recursive=True
+    )
+
+
+def test_write_pdf_stream_uploads_unknown_length_in_parts(minio_fs):
+    stream = io.BytesIO(b"%PDF-1.7")
+
+    object_name = minio_fs.write_pdf_stream(
+        stream,
+        company_id="Apple Inc.",
+        report_year="2023",
+        file_name="report.pdf",
+        part_size=5 * 1024 * 1024,
+    )
+
+    assert object_name == "Apple Inc./2023/report.pdf"
+    minio_fs.client.put_object.assert_called_once_with(
+        bucket_name="csr-reports",
+        object_name="Apple Inc./2023/report.pdf",
+        data=stream,
+        length=-1,
+        part_size=5 * 1024 * 1024,
+        content_type="application/pdf",
+    )
@@ -0,0 +1,37 @@
+from dotenv import load_dotenv
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+# Load environment variables from .env file
+# loaded manually due to subdirectory structure of this project
+#       (config dict unable to locate .env file)
+load_dotenv()
+
+
+class DisplaySettings(BaseSettings):
+    """Configuration for the display (dashboard) app.
+
+    Attributes:
+        CHART_CACHE_SIZE (int): Number of rendered charts kept in memory (LRU).
+        VERSION_CHECK_SECONDS (float): How often the app asks Postgres whether the metrics changed.
+        PRERENDER (bool): Render every company's chart in the background whenever new data is loaded.
+
+    Example:
+        >>> display_settings = DisplaySettings()
+        >>> print(display_settings.CHART_CACHE_SIZE)
+        256
+    """
+
+    CHART_CACHE_SIZE: int = 256
+    VERSION_CHECK_SECONDS: float = 5.0
+    PRERENDER: bool = False
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        env_prefix="DISPLAY_",
+        case_sensitive=True,
+        extra="ignore",
+    )
+
+
+display_settings = DisplaySettings()
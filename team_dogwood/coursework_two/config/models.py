@@ -1,3 +1,5 @@
+from typing import Optional
+
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -21,6 +23,17 @@ class ModelSettings(BaseSettings):
 
     # Embedding model name
     EMBEDDINGS_MODEL_NAME: str
+    # On-disk embedding cache (src/extract/vector_store.py) and texts per embedding call
+    EMBEDDINGS_CACHE_DIR: str = "data/embedding_cache"
+    EMBEDDINGS_BATCH_SIZE: int = 64
+
+    # Text extraction (src/extract/parse.py)
+    #   reports in flight at once; bounds temp files on disk
+    PARSE_MAX_CONCURRENCY: int = 8
+    #   concurrent LlamaParse jobs (API rate limit)
+    PARSE_MAX_UPLOADS: int = 4
+    #   only process the first N companies; None processes the whole universe
+    PARSE_COMPANY_LIMIT: Optional[int] = None
 
     model_config = SettingsConfigDict(
         env_file=".env",
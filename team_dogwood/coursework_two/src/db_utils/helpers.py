@@ -8,9 +8,11 @@ sys.path.append(os.path.join(os.path.dirname(__file__), "../.."))
 from src.data_models.company import Company, ESGReport
 from src.db_utils.postgres import PostgreSQLDB
 
-def get_all_companies(db: PostgreSQLDB) -> list[Company]:
+def get_all_companies(db: PostgreSQLDB, limit: int | None = None) -> list[Company]:
     """
     Get all companies from the database.
+
+    Pass ``limit`` to only return the first N companies (e.g. for a test run).
     """
     companies = db.fetch("SELECT * FROM csr_reporting.company_static")
     logger.debug(f"Companies Preview: {companies[:1]}")
@@ -19,7 +21,7 @@ def get_all_companies(db: PostgreSQLDB) -> list[Company]:
         exit()
 
     companies_list = []
-    for company_data in companies[:20]:  # TODO - remove this limit
+    for company_data in companies[:limit]:
         logger.debug(f"Processing company: {company_data['security']}")
         company = Company(**company_data)
         companies_list.append(company)
@@ -62,6 +62,22 @@ class MinioFileSystem(MinioFileSystemRepo):
         )
         return [obj.object_name for obj in objects]
 
+    def list_all_files(self, prefix: str = "") -> set:
+        """Lists every object under ``prefix`` in a single recursive listing.
+
+        Use this instead of calling `list_files_by_company` once per report.
+
+        Args:
+            prefix (str, optional): Only list objects under this prefix. Defaults to the whole bucket.
+
+        Returns:
+            set: Object names, e.g. {"Apple Inc./2023/report.pdf", ...}.
+        """
+        objects = self.client.list_objects(
+            self.bucket_name, prefix=prefix or None, recursive=True
+        )
+        return {obj.object_name for obj in objects}
+
     def view_pdf(self, object_name: str, expiry_hours: int = 1):
         """Generates a presigned URL to view the PDF in a web browser.
 
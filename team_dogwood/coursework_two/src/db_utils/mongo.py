@@ -6,9 +6,9 @@ import os
 import sys
 from datetime import datetime
 
-from typing import List, Union
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
 from loguru import logger
-from pymongo import MongoClient
+from pymongo import ASCENDING, DESCENDING, MongoClient
 from llama_index.core import Document
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "../.."))
@@ -20,8 +20,18 @@ from src.data_models.company import Company, ESGReport
 class MongCollection:
     """
     MongoDB collection class for interacting with the MongoDB database.
+
+    Reports are looked up by the scalar ``company.security`` / ``company.symbol`` fields plus
+    ``report_metadata.year``; the matching compound indexes are created on ``__enter__``
+    (see :meth:`ensure_indexes`).
     """
 
+    # (name, keys) of the indexes serving the report lookups below
+    INDEXES = [
+        ("company_security_year", [("company.security", ASCENDING), ("report_metadata.year", DESCENDING)]),
+        ("company_symbol_year", [("company.symbol", ASCENDING), ("report_metadata.year", DESCENDING)]),
+    ]
+
     def __init__(self):
         self.client = MongoClient(database_settings.MONGO_URI)
         self.db = self.client[database_settings.MONGO_DB_NAME]
@@ -34,6 +44,7 @@ class MongCollection:
         :return: The instance of the MongoCollection class.
         :rtype: MongoCollection
         """
+        self.ensure_indexes()
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
@@ -51,6 +62,16 @@ class MongCollection:
             # Return False to propagate the exception
             return False
     
+    def ensure_indexes(self) -> None:
+        """
+        Create the report lookup indexes if they do not exist yet (idempotent).
+        """
+        for name, keys in self.INDEXES:
+            try:
+                self.collection.create_index(keys, name=name)
+            except Exception as e:
+                logger.warning(f"Could not create index {name}: {e}")
+
     def insert_report(self, company: Company, report_metadata: ESGReport, report: List[Document]) -> None:
         """
         Insert a report document into the MongoDB collection.
@@ -69,9 +90,60 @@ class MongCollection:
         except Exception as e:
             logger.error(f"Error inserting document: {e}")
     
+    @staticmethod
+    def _year_filter(years: Iterable[Union[int, str]]) -> dict:
+        """Match years stored either as int or str (ESGReport.year accepts both)."""
+        values = []
+        for year in years:
+            values.append(year)
+            try:
+                values.extend({int(year), str(int(year))} - {year})
+            except (TypeError, ValueError):
+                continue
+        return {"$in": values}
+
+    def iter_reports_by_company(
+        self, company: Company, years: Optional[Iterable[Union[int, str]]] = None
+    ) -> Iterator[Tuple[Union[int, str], List[Document]]]:
+        """
+        Lazily yield ``(year, pages)`` for a company's parsed reports, newest first.
+
+        Uses the ``company.security`` + ``report_metadata.year`` index and projects only the
+        year and pages, so one report is fetched and converted to Documents at a time.
+        Years are normalised to int before sorting, so reports stored with int and str
+        years are still ordered newest first.
+
+        :param company: The company to get the reports for.
+        :type company: Company
+        :param years: Only yield these report years.
+        :type years: Iterable[int | str], optional
+        :return: Iterator of (year, list of Documents).
+        :rtype: Iterator[tuple]
+        """
+        query = {"company.security": company.security}
+        if years is not None:
+            query["report_metadata.year"] = self._year_filter(years)
+        year_int = {"$convert": {"input": "$report_metadata.year", "to": "int", "onError": None, "onNull": None}}
+        pipeline = [
+            {"$match": query},
+            {"$project": {"_id": 0, "report_metadata.year": 1, "report": 1, "year_int": year_int}},
+            {"$sort": {"year_int": DESCENDING}},
+        ]
+        cursor = self.collection.aggregate(pipeline, allowDiskUse=True, batchSize=1)
+        try:
+            for report in cursor:
+                year = report.get("year_int")
+                if year is None:
+                    year = report["report_metadata"]["year"]
+                yield year, [Document(**doc) for doc in report.get("report", [])]
+        finally:
+            cursor.close()
+
     def get_reports_by_company(self, company: Company) -> dict[Union[Union[int, str], Document]]:
         """
-        Get a report document by company and its metadata.
+        Get all report documents of a company keyed by report year.
+
+        Prefer :meth:`iter_reports_by_company`, which does not hold every report in memory.
 
         :param company: The company to get the report for.
         :type company: Company
@@ -80,13 +152,9 @@ class MongCollection:
         """
         try:
             all_reports = {}
-            reports = self.collection.find({"company": company.model_dump(exclude={"esg_reports"})})
-            for report in reports:
-                report_parsed = [Document(**doc) for doc in report["report"]]
-                report_metadata = ESGReport(**report["report_metadata"])
-                if report:
-                    logger.info(f"Report found for {company.security}.")
-                    all_reports[report_metadata.year] = report_parsed
+            for year, report_parsed in self.iter_reports_by_company(company):
+                logger.info(f"Report found for {company.security}.")
+                all_reports.setdefault(year, report_parsed)
             if not all_reports:
                 logger.warning(f"No reports found for {company.security}.")
                 return None
@@ -103,8 +171,11 @@ class MongCollection:
         """
         try:
             pipeline = [
-                {"$group": {"_id": "$company", "company": {"$first": "$company"}}},
-                {"$replaceRoot": {"newRoot": "$company"}}
+                {"$project": {"_id": 0, "company": 1}},
+                {"$sort": {"company.security": 1}},
+                {"$group": {"_id": "$company.security", "company": {"$first": "$company"}}},
+                {"$replaceRoot": {"newRoot": "$company"}},
+                {"$sort": {"security": 1}},
             ]
             company_dicts = list(self.collection.aggregate(pipeline))
             return [Company.model_validate(company) for company in company_dicts]
@@ -5,10 +5,10 @@ Methods for interacting with postgres database.
 import os
 import sys
 
-from typing import List, Dict
+from typing import List, Dict, Optional
 import psycopg2
 from loguru import logger
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 from sqlalchemy import create_engine, engine
 from sqlalchemy.orm import sessionmaker
 
@@ -18,6 +18,12 @@ sys.path.append(os.path.join(os.path.dirname(__file__), "../.."))
 
 from config.db import database_settings
 
+# Version counter readers poll to detect new csr_metrics data
+DATA_VERSION_DDL = (
+    "CREATE TABLE IF NOT EXISTS csr_metrics.data_version ("
+    "id INTEGER PRIMARY KEY, version BIGINT NOT NULL, updated_at TIMESTAMP DEFAULT NOW());"
+)
+
 
 class PostgreSQLDB:
     """
@@ -161,29 +167,94 @@ class PostgreSQLDB:
         """
         self.execute(query, (report_id,))
     
-    def upsert_metrics(self, table: str, rows: List[Dict]) -> None:
+    def upsert_metrics(self, table: str, rows: List[Dict], page_size: int = 1000) -> int:
         """
-        Create required schema and tables if they do not exist
         Bulk UPSERT a list of metrics into the specified Postgres table.
 
-        :param db: PostgreSQLDB instance (open transaction).
+        All rows go through multi-row ``INSERT ... VALUES`` statements (``execute_values``,
+        ``page_size`` rows each) in a single transaction, instead of one round-trip and
+        commit per metric. Rows repeating an (indicator_id, year) key are collapsed to the
+        last one, as a single statement cannot update the same row twice.
+
         :param table: Table name ('emissions', 'energy', or 'waste').
-        :param rows: List of metric dicts containing matching columns.
+        :param rows: List of metric dicts containing matching columns; keys missing from
+            a row are written as NULL.
+        :param page_size: Rows per INSERT statement.
+        :return: Number of rows upserted (0 on error, after rollback).
+        :rtype: int
         """
         if not rows:
-            return
-        cols = list(rows[0].keys())
+            return 0
+        cols = list(dict.fromkeys(c for r in rows for c in r))
+        unique = {(r.get("indicator_id"), r.get("year")): r for r in rows}
+        values = [tuple(r.get(c) for c in cols) for r in unique.values()]
+
         cols_csv = ", ".join(cols)
-        placeholders = ", ".join(["%s"] * len(cols))
-        updates = ", ".join(f"{c}=EXCLUDED.{c}" for c in cols if c != "indicator_id")
-        
-        # Upsert the data
+        updates = ", ".join(f"{c}=EXCLUDED.{c}" for c in cols if c not in ("indicator_id", "year"))
+        conflict = f"DO UPDATE SET {updates}" if updates else "DO NOTHING"
         sql = (
-            f"INSERT INTO csr_metrics.{table} ({cols_csv}) VALUES ({placeholders}) "
-            f"ON CONFLICT (indicator_id, year) DO UPDATE SET {updates};"
+            f"INSERT INTO csr_metrics.{table} ({cols_csv}) VALUES %s "
+            f"ON CONFLICT (indicator_id, year) {conflict};"
+        )
+        try:
+            logger.info(f"Upserting {len(values)} rows into csr_metrics.{table}...")
+            with self.conn.cursor() as cursor:
+                execute_values(cursor, sql, values, page_size=page_size)
+                self._bump_data_version(cursor)
+            self.conn.commit()
+            return len(values)
+        except Exception as e:
+            logger.error(f"Database error: {e}")
+            # Rollback on error
+            self.conn.rollback()
+            return 0
+
+    def create_data_version_table(self) -> None:
+        """
+        Create csr_metrics.data_version (starting at version 0) if it does not exist.
+
+        Run at startup by readers that poll `get_data_version`, so polling works before
+        the first `upsert_metrics` call has written any metrics.
+        """
+        self.execute("CREATE SCHEMA IF NOT EXISTS csr_metrics;")
+        self.execute(DATA_VERSION_DDL)
+        self.execute(
+            "INSERT INTO csr_metrics.data_version (id, version, updated_at) VALUES (1, 0, NOW()) "
+            "ON CONFLICT (id) DO NOTHING;"
         )
-        for r in rows:
-            self.execute(sql, tuple(r[c] for c in cols))
+
+    @staticmethod
+    def _bump_data_version(cursor) -> None:
+        """
+        Increment the csr_metrics data version inside the caller's transaction.
+
+        Readers (e.g. the display app) compare this counter with the version they loaded
+        to know when their cached metrics are stale.
+        """
+        cursor.execute(DATA_VERSION_DDL)
+        cursor.execute(
+            "INSERT INTO csr_metrics.data_version (id, version, updated_at) VALUES (1, 1, NOW()) "
+            "ON CONFLICT (id) DO UPDATE SET version = csr_metrics.data_version.version + 1, updated_at = NOW();"
+        )
+
+    def get_data_version(self) -> Optional[int]:
+        """
+        Current csr_metrics data version; bumped by every `upsert_metrics` call.
+
+        :return: The version counter, 0 if no metrics have been written yet, or None if
+            the check itself failed (callers should treat that as "unchanged").
+        :rtype: Optional[int]
+        """
+        try:
+            with self.conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("SELECT version FROM csr_metrics.data_version WHERE id = 1;")
+                row = cursor.fetchone()
+            self.conn.commit()
+        except Exception as e:
+            logger.warning(f"Data version check failed: {e}")
+            self.conn.rollback()
+            return None
+        return row["version"] if row else 0
 
     @staticmethod
     def _conn_postgres():
@@ -3,18 +3,19 @@ import os
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "../.."))
 
-from flask import Flask, request, jsonify, send_from_directory
-from src.display.load_and_visualize import load_all_esg_data, plot_company_all_three_categories, compare_companies_metrics
-
-import io
-import base64
 import matplotlib
 matplotlib.use('Agg')
-import matplotlib.pyplot as plt
+
+from flask import Flask, request, jsonify, send_from_directory
+from src.display.chart_cache import ChartService
+from src.display.load_and_visualize import create_display_schema
 
 app = Flask(__name__, static_folder="static")
 
-df_all = load_all_esg_data()
+# Metrics DataFrame + rendered charts, refreshed when upsert_metrics bumps the data version
+create_display_schema()
+charts = ChartService()
+charts.data()
 
 # Serve the frontend
 @app.route("/", methods=["GET"])
@@ -31,13 +32,7 @@ def plot_company_api():
         if not company_name:
             return jsonify({"error": "No company name provided"}), 400
 
-        plt.clf()
-        plot_company_all_three_categories(df_all, company_name)
-
-        img_buffer = io.BytesIO()
-        plt.savefig(img_buffer, format="png", bbox_inches='tight')
-        img_buffer.seek(0)
-        img_base64 = base64.b64encode(img_buffer.read()).decode('utf-8')
+        img_base64 = charts.company_chart(company_name)
 
         return jsonify({"image": img_base64})
 
@@ -55,13 +50,7 @@ def compare_companies_api():
         if not company_names or not indicators:
             return jsonify({"error": "Company names or indicators missing"}), 400
 
-        plt.clf()
-        compare_companies_metrics(df_all, company_names, indicators)
-
-        img_buffer = io.BytesIO()
-        plt.savefig(img_buffer, format="png", bbox_inches='tight')
-        img_buffer.seek(0)
-        img_base64 = base64.b64encode(img_buffer.read()).decode('utf-8')
+        img_base64 = charts.comparison_chart(company_names, indicators)
 
         return jsonify({"image": img_base64})
 
@@ -69,5 +58,12 @@ def compare_companies_api():
         print(f"Error in /compare-companies: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/cache', methods=["GET", "DELETE"])
+def cache_api():
+    # DELETE forces a reload of the metrics and drops every rendered chart
+    if request.method == "DELETE":
+        charts.invalidate()
+    return jsonify(charts.stats())
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5550, debug=True)
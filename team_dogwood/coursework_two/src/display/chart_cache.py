@@ -0,0 +1,190 @@
+"""
+Cached chart rendering for the display app.
+
+Every request used to re-query all three csr_metrics tables and render a fresh PNG.
+``ChartService`` keeps:
+
+* the metrics DataFrame, reloaded only when the csr_metrics data version changes
+  (``upsert_metrics`` bumps it in the same transaction as the write), checked at most
+  every ``check_interval`` seconds; a failed check (version ``None``) counts as unchanged;
+* an LRU of rendered charts keyed by (chart, companies, indicators, data version);
+* optionally, a background thread that pre-renders every company's chart whenever new
+  data is loaded, so the first dashboard user after a pipeline run also gets a cache hit.
+
+Matplotlib's pyplot state is global, so renders are serialised with a lock; cache hits
+never touch it.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
+from loguru import logger
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../.."))
+
+from config.display import display_settings
+from src.display.load_and_visualize import (
+    compare_companies_metrics,
+    get_data_version,
+    load_all_esg_data,
+    plot_company_all_three_categories,
+)
+
+
+class ChartService:
+    """
+    Thread-safe DataFrame and rendered-chart cache.
+
+    :param loader: Returns the full metrics DataFrame.
+    :param version_fn: Returns the current data version (any comparable value), or None
+        if it could not be checked.
+    :param max_charts: Rendered charts kept in the LRU.
+    :param check_interval: Minimum seconds between data version checks.
+    :param prerender: Pre-render per-company charts in the background after each reload.
+
+    Example:
+        >>> charts = ChartService()
+        >>> png_base64 = charts.company_chart("Accenture plc")
+    """
+
+    def __init__(
+        self,
+        loader: Callable = load_all_esg_data,
+        version_fn: Callable = get_data_version,
+        max_charts: int = display_settings.CHART_CACHE_SIZE,
+        check_interval: float = display_settings.VERSION_CHECK_SECONDS,
+        prerender: bool = display_settings.PRERENDER,
+    ):
+        self._loader = loader
+        self._version_fn = version_fn
+        self.max_charts = max_charts
+        self.check_interval = check_interval
+        self.prerender_enabled = prerender
+
+        self._df = None
+        self._version = None
+        self._checked_at = 0.0
+        self._data_lock = threading.Lock()
+        self._render_lock = threading.Lock()
+        self._charts: "OrderedDict[tuple, str]" = OrderedDict()
+        self._charts_lock = threading.Lock()
+        self._prerender_thread: Optional[threading.Thread] = None
+        self.hits = 0
+        self.misses = 0
+
+    # ── data ─────────────────────────────────────────────────────
+    def invalidate(self) -> None:
+        """Drop the cached DataFrame and every rendered chart."""
+        with self._data_lock:
+            self._df = None
+            self._version = None
+            self._checked_at = 0.0
+        with self._charts_lock:
+            self._charts.clear()
+
+    def data(self):
+        """
+        The metrics DataFrame and its data version, reloading it if the version changed.
+
+        :return: (DataFrame, version)
+        :rtype: tuple
+        """
+        now = time.monotonic()
+        if self._df is not None and now - self._checked_at < self.check_interval:
+            return self._df, self._version
+
+        reloaded = False
+        with self._data_lock:
+            if self._df is None or time.monotonic() - self._checked_at >= self.check_interval:
+                version = self._version_fn()
+                if version is None and self._df is not None:
+                    version = self._version  # check failed: keep serving the cached data
+                if self._df is None or version != self._version:
+                    logger.info(f"Loading ESG metrics (data version {version})")
+                    self._df = self._loader()
+                    self._version = version
+                    reloaded = True
+                self._checked_at = time.monotonic()
+            df, version = self._df, self._version
+
+        if reloaded:
+            with self._charts_lock:
+                for key in [k for k in self._charts if k[-1] != version]:
+                    del self._charts[key]
+            if self.prerender_enabled:
+                self.prerender()
+        return df, version
+
+    # ── charts ───────────────────────────────────────────────────
+    def _cached(self, key: tuple, render: Callable) -> str:
+        with self._charts_lock:
+            image = self._charts.get(key)
+            if image is not None:
+                self._charts.move_to_end(key)
+                self.hits += 1
+                return image
+        with self._render_lock:
+            # another request may have rendered it while we waited
+            with self._charts_lock:
+                image = self._charts.get(key)
+            if image is None:
+                image = render()
+                self.misses += 1
+        with self._charts_lock:
+            self._charts[key] = image
+            self._charts.move_to_end(key)
+            while len(self._charts) > self.max_charts:
+                self._charts.popitem(last=False)
+        return image
+
+    def company_chart(self, company_name: str) -> str:
+        """Base64 PNG of all three metric categories for one company."""
+        df, version = self.data()
+        return self._cached(
+            ("company", (company_name,), (), version),
+            lambda: plot_company_all_three_categories(df, company_name),
+        )
+
+    def comparison_chart(self, company_names: Iterable[str], indicators: Iterable[str]) -> str:
+        """Base64 PNG comparing ``indicators`` across ``company_names``."""
+        company_names, indicators = list(company_names), list(indicators)
+        df, version = self.data()
+        return self._cached(
+            ("compare", tuple(company_names), tuple(indicators), version),
+            lambda: compare_companies_metrics(df, company_names, indicators),
+        )
+
+    # ── background pre-rendering ─────────────────────────────────
+    def prerender(self, company_names: Optional[Iterable[str]] = None) -> threading.Thread:
+        """
+        Render per-company charts for the current data in a daemon thread.
+
+        :param company_names: Companies to render; defaults to every company in the data.
+        :return: The running (or already running) thread.
+        """
+        if self._prerender_thread is not None and self._prerender_thread.is_alive():
+            return self._prerender_thread
+
+        def run():
+            df, _ = self.data()
+            names = list(company_names) if company_names is not None else sorted(df["company_name"].dropna().unique())
+            start = time.perf_counter()
+            for name in names[:self.max_charts]:
+                try:
+                    self.company_chart(name)
+                except Exception as e:
+                    logger.warning(f"Pre-rendering chart for {name} failed: {e}")
+            logger.info(f"Pre-rendered {len(names[:self.max_charts])} company charts in {time.perf_counter() - start:.1f}s")
+
+        self._prerender_thread = threading.Thread(target=run, name="chart-prerender", daemon=True)
+        self._prerender_thread.start()
+        return self._prerender_thread
+
+    def stats(self) -> dict:
+        with self._charts_lock:
+            cached = len(self._charts)
+        return {"data_version": self._version, "charts_cached": cached, "hits": self.hits, "misses": self.misses}
@@ -42,6 +42,23 @@ def load_all_esg_data():
     return df_all
 
 
+def create_display_schema():
+    """
+    Create the tables the display app polls (csr_metrics.data_version) if missing.
+    """
+    with PostgreSQLDB() as db:
+        db.create_data_version_table()
+
+
+def get_data_version():
+    """
+    Return the csr_metrics data version (bumped by every upsert_metrics call),
+    or None if the check failed.
+    """
+    with PostgreSQLDB() as db:
+        return db.get_data_version()
+
+
 def plot_company_all_three_categories(df_all, company_name):
     """
     Plot all three categories of ESG metrics for a given company. Return a base64 encoded image.
@@ -40,6 +40,12 @@ class LLamaTextExtractor(BaseModel):
         description="Path to the PDF document to extract text from.",
     )
 
+    # pages to send to LlamaParse; detected from the PDF when not given
+    key_pages: Optional[List[int]] = Field(
+        None,
+        description="Zero-based page numbers containing report keywords.",
+    )
+
     # parsed documents
     documents: Optional[List[Document]] = Field(
         None,
@@ -72,7 +78,9 @@ class LLamaTextExtractor(BaseModel):
             list[Document]: per page extracted text from the PDF document.
                 text can be accessed via documents[0].text
         """
-        key_pages = self.find_pages_with_keywords(self.pdf_path)
+        key_pages = self.key_pages
+        if key_pages is None:
+            key_pages = self.find_pages_with_keywords(self.pdf_path)
         # Initialize LlamaParse with the API key
         parser = LlamaParse(
             api_key=self._llama_api_key,
@@ -98,63 +106,106 @@ Return a summary of the extracted text. Return metrics and figures in a table fo
         return documents
 
 
-# Main function to run the script
-async def main():
-    # 1. initialise postegres db, minio, and mongo client
-    postgres = PostgreSQLDB()
-    minio = MinioFileSystem()
-    mongo = MongCollection()
+async def process_reports(
+    companies: list,
+    minio: MinioFileSystem,
+    mongo: MongCollection,
+    available_files: set,
+    max_concurrency: int = model_settings.PARSE_MAX_CONCURRENCY,
+    max_uploads: int = model_settings.PARSE_MAX_UPLOADS,
+) -> dict:
+    """
+    Run every (company, report) pair through fetch -> keyword detection -> LlamaParse -> MongoDB.
 
-    # 2. get all company and report data from postgres
-    companies = get_all_companies(postgres)
-    companies = append_reports_to_companies(companies, postgres)
+    A fixed pool of ``max_concurrency`` workers pulls reports from a queue, so at most that many
+    PDFs are in flight (each streamed to a temp file, never held in memory). Workers sit at
+    different stages at any time, which overlaps MinIO downloads, page detection (in a thread)
+    and LlamaParse uploads; the latter are additionally capped at ``max_uploads``.
 
-    # 3. For each company, process each report from minio
-    async def process_report(company, report):
-        company_name = company.security
-        report_path = f"{company.security}/{report.year}/{os.path.basename(report.url)}"
-        if not report_path:
-            return
-        logger.info(f"Processing report {report_path} for company {company_name}")
+    Returns:
+        dict: number of reports per outcome ("parsed", "missing", "fetch_failed", "failed").
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    for company in companies:
+        for report in company.esg_reports:
+            queue.put_nowait((company, report))
+    total = queue.qsize()
+    upload_slots = asyncio.Semaphore(max_uploads)
+    counts = {"parsed": 0, "missing": 0, "fetch_failed": 0, "failed": 0}
 
-        # Check if report exists in Minio
-        available_files = await asyncio.to_thread(minio.list_files_by_company, company.security)
+    async def process_report(company, report) -> str:
+        report_path = f"{company.security}/{report.year}/{os.path.basename(report.url)}"
         if report_path not in available_files:
             logger.warning(f"Report {report_path} does not exist in Minio. Skipping.")
-            return
+            return "missing"
+        logger.info(f"Processing report {report_path} for company {company.security}")
 
-        # Fetch PDF as bytes from Minio
-        pdf_bytes = await asyncio.to_thread(minio.get_pdf_bytes, report_path)
-        if not pdf_bytes:
-            logger.warning(f"Failed to fetch PDF bytes for {report_path} in Minio for company '{company.security}'. Skipping.")
-            return
-
-        # Write bytes to a NamedTemporaryFile
-        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=True) as tmp_pdf:
-            tmp_pdf.write(pdf_bytes)
-            tmp_pdf.flush()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # Stream the PDF from Minio to disk
+            pdf_path = os.path.join(tmp_dir, "report.pdf")
+            try:
+                await asyncio.to_thread(minio.download_file, report_path, pdf_path)
+            except Exception as e:
+                logger.warning(f"Failed to fetch {report_path} from Minio for company '{company.security}': {e}. Skipping.")
+                return "fetch_failed"
 
             # Extract text using LLamaTextExtractor
             try:
-                extractor = LLamaTextExtractor(pdf_path=tmp_pdf.name)
-                docs = await extractor.async_extract_document_pages()
+                key_pages = await asyncio.to_thread(LLamaTextExtractor.find_pages_with_keywords, pdf_path)
+                extractor = LLamaTextExtractor(pdf_path=pdf_path, key_pages=key_pages)
+                async with upload_slots:
+                    docs = await extractor.async_extract_document_pages()
             except Exception as e:
                 logger.error(f"Extraction failed for {report_path}: {e}")
+                return "failed"
+
+        # Store in MongoDB
+        try:
+            await asyncio.to_thread(mongo.insert_report, company, report, docs)
+        except Exception as e:
+            logger.error(f"Failed to store extracted document for {report_path}: {e}")
+            return "failed"
+        return "parsed"
+
+    async def worker():
+        while True:
+            try:
+                company, report = queue.get_nowait()
+            except asyncio.QueueEmpty:
                 return
-
-            # Store in MongoDB
             try:
-                await asyncio.to_thread(mongo.insert_report, company, report, docs)
+                outcome = await process_report(company, report)
             except Exception as e:
-                logger.error(f"Failed to store extracted document for {report_path}: {e}")
+                logger.error(f"Unexpected error processing {company.security} {report.year}: {e}")
+                outcome = "failed"
+            counts[outcome] += 1
+            done = sum(counts.values())
+            if done % 25 == 0 or done == total:
+                logger.info(f"Processed {done}/{total} reports: {counts}")
 
-    # Create tasks for all company/report pairs
-    tasks = []
-    for company in companies:
-        for report in company.esg_reports:
-            tasks.append(process_report(company, report))
-    await asyncio.gather(*tasks)
+    await asyncio.gather(*(worker() for _ in range(max(1, min(max_concurrency, total)))))
+    return counts
+
+
+# Main function to run the script
+async def main():
+    # 1. initialise postegres db, minio, and mongo client
+    postgres = PostgreSQLDB()
+    minio = MinioFileSystem()
+    mongo = MongCollection()
+
+    # 2. get all company and report data from postgres
+    companies = get_all_companies(postgres, limit=model_settings.PARSE_COMPANY_LIMIT)
+    companies = append_reports_to_companies(companies, postgres)
+
+    # 3. list Minio once; each report is checked against this set
+    available_files = await asyncio.to_thread(minio.list_all_files)
+    logger.info(f"Found {len(available_files)} files in Minio.")
+
+    # 4. process every report through a bounded worker pool
+    counts = await process_reports(companies, minio, mongo, available_files)
+    logger.info(f"Text extraction finished: {counts}")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
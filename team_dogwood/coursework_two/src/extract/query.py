@@ -2,7 +2,8 @@
 """
 previously: ingest_to_pg.py
 
-Load parsed CSR pages from MongoDB, build an in‐memory vector index,
+Load parsed CSR pages from MongoDB, build an in‐memory vector index
+(chunk embeddings are cached on disk, see vector_store.py),
 prompt GPT-4 to extract nine ESG metrics as JSON, validate/normalize
 them, and UPSERT into three PostgreSQL tables:
 
@@ -22,7 +23,6 @@ import sys
 from typing import List, Dict
 
 from loguru import logger
-from llama_index.core import VectorStoreIndex
 from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 from llama_index.llms.openai import OpenAI
 
@@ -33,6 +33,7 @@ from src.db_utils.postgres import PostgreSQLDB
 from config.models import model_settings
 from src.db_utils.metadata import upsert_metadata_table, create_metadata_table
 from src.data_models.metrics import IndicatorList
+from src.extract.vector_store import EmbeddingStore, build_index
 
 ESG_PROMPT = r"""
 You are an ESG data-extraction function. Return **only** valid JSON, no prose.
@@ -154,6 +155,7 @@ def main() -> None:
 
         # 2) LLM & embedding
         embed = HuggingFaceEmbedding(model_name=model_settings.EMBEDDINGS_MODEL_NAME)
+        embedding_store = EmbeddingStore(model_settings.EMBEDDINGS_MODEL_NAME)
         llm = OpenAI(model=model_settings.OPENAI_MODEL_NAME, api_key=model_settings.OPENAI_API_KEY)
 
         # 3) Postgres
@@ -211,81 +213,71 @@ def main() -> None:
             
             # 4) Loop companies & years
             for company in companies:
-                docs = mongo.get_reports_by_company(company)
-                if not docs:
-                    continue
-                
-                if args.year and args.company:
-                    try:
-                        docs = docs.get(args.year)
-                    except KeyError:
-                        logger.warning(f"No parsed year {args.year} for {company.security}; processing all available years.")
-                        docs = docs
-
-                if not docs:
-                    logger.warning(f"No parsed years for {company.security}; skipping.")
-                    continue
-                
+                years = [args.year] if args.year and args.company else None
                 metrics = []
-                if isinstance(docs, dict):
-                    for year, doc in docs.items():
-                        index = VectorStoreIndex.from_documents(doc, embed_model=embed)
-                        qe = index.as_query_engine(similarity_top_k=10, llm=llm, output_schema=IndicatorList)
-
-                        logger.info(f"▶ {company.security} / {year}")
-                        prompt = ESG_PROMPT.format(company=company.security)
-                        rsp = qe.query(prompt)
-                        raw = getattr(rsp, "response", None) or rsp.response_text
-
-                        try:
-                            # Clean and parse the LLM output
-                            metrics = parse_and_strip_json(raw)
-                            logger.debug(f"Parsed metrics: {metrics}")
-# If metrics is a dict with a 'data' key, extract the list
-                            if isinstance(metrics, dict) and "data" in metrics:
-                                # metrics = IndicatorList.model_validate(metrics["data"])
-                                metrics = metrics["data"]
-                            elif isinstance(metrics, list):
-                                # metrics = IndicatorList.model_validate(metrics)
-                                metrics = metrics
-                            else:
-                                logger.error(f"Invalid response format for {company.security}/{year}; skipping.")
-                                continue
-                        except (json.JSONDecodeError, Exception) as e:
-                            logger.error(f"Invalid JSON for {company.security}/{year}; skipping. Error: {e}")
-                            continue
+                found = False
+                for year, doc in mongo.iter_reports_by_company(company, years=years):
+                    found = True
+                    index = build_index(doc, embed, embedding_store)
+                    qe = index.as_query_engine(similarity_top_k=10, llm=llm, output_schema=IndicatorList)
 
-                        metrics = validate_and_normalize(metrics)
-                        emissions = [m for m in metrics if "emissions" in m["category"].lower()]
-                        energy = [
-                            m for m in metrics
-                            if m["indicator_name"].lower().startswith(("total energy", "water"))
-                        ]
-                        waste = [
-                            m for m in metrics
-                            if "waste" in m["category"].lower()
-                            or "packaging" in m["indicator_name"].lower()
-                        ]
-
-                        # Metadata tracking
-                        if not (emissions or energy or waste):
-                            logger.warning(
-                                f"No metrics found for {company.security}/{year}. "
-                            )
+                    logger.info(f"▶ {company.security} / {year}")
+                    prompt = ESG_PROMPT.format(company=company.security)
+                    rsp = qe.query(prompt)
+                    raw = getattr(rsp, "response", None) or rsp.response_text
+
+                    try:
+                        # Clean and parse the LLM output
+                        metrics = parse_and_strip_json(raw)
+                        logger.debug(f"Parsed metrics: {metrics}")
+# If metrics is a dict with a 'data' key, extract the list
+                        if isinstance(metrics, dict) and "data" in metrics:
+                            # metrics = IndicatorList.model_validate(metrics["data"])
+                            metrics = metrics["data"]
+                        elif isinstance(metrics, list):
+                            # metrics = IndicatorList.model_validate(metrics)
+                            metrics = metrics
                         else:
-                            if emissions:
-                                emissions_metrics_count += len(emissions)
-                                emissions_companies.add(company.security)
-                                db.upsert_metrics("emissions", emissions)
-                            if energy:
-                                energy_metrics_count += len(energy)
-                                energy_companies.add(company.security)
-                                db.upsert_metrics("energy", energy)
-                            if waste:
-                                waste_metrics_count += len(waste)
-                                waste_companies.add(company.security)
-                                db.upsert_metrics("waste", waste)
-                            logger.success(f"Persisted {company.security}/{year} → Postgres.")
+                            logger.error(f"Invalid response format for {company.security}/{year}; skipping.")
+                            continue
+                    except (json.JSONDecodeError, Exception) as e:
+                        logger.error(f"Invalid JSON for {company.security}/{year}; skipping. Error: {e}")
+                        continue
+
+                    metrics = validate_and_normalize(metrics)
+                    emissions = [m for m in metrics if "emissions" in m["category"].lower()]
+                    energy = [
+                        m for m in metrics
+                        if m["indicator_name"].lower().startswith(("total energy", "water"))
+                    ]
+                    waste = [
+                        m for m in metrics
+                        if "waste" in m["category"].lower()
+                        or "packaging" in m["indicator_name"].lower()
+                    ]
+
+                    # Metadata tracking
+                    if not (emissions or energy or waste):
+                        logger.warning(
+                            f"No metrics found for {company.security}/{year}. "
+                        )
+                    else:
+                        if emissions:
+                            emissions_metrics_count += len(emissions)
+                            emissions_companies.add(company.security)
+                            db.upsert_metrics("emissions", emissions)
+                        if energy:
+                            energy_metrics_count += len(energy)
+                            energy_companies.add(company.security)
+                            db.upsert_metrics("energy", energy)
+                        if waste:
+                            waste_metrics_count += len(waste)
+                            waste_companies.add(company.security)
+                            db.upsert_metrics("waste", waste)
+                        logger.success(f"Persisted {company.security}/{year} → Postgres.")
+
+                if not found:
+                    logger.warning(f"No parsed years for {company.security}; skipping.")
 
         # Update metadata tables after all companies processed
         create_metadata_table()
@@ -0,0 +1,226 @@
+"""
+Persistent embedding cache for the query stage.
+
+query.py used to build a fresh ``VectorStoreIndex`` for every company-year on every run,
+re-embedding every parsed page with the HuggingFace model. ``EmbeddingStore`` keeps the
+vectors on disk, keyed by the SHA-256 of the text that gets embedded, so each chunk is
+embedded once (in batches) and later runs only pay for the LLM calls.
+
+Layout (one sub-directory per embedding model)::
+
+    <root>/<model>/vectors.f32     float32 rows, appended to; read back with np.memmap
+    <root>/<model>/index.jsonl     {"hash": ..., "row": ...} per line, in row order
+    <root>/<model>/meta.json       {"model": ..., "dim": ...}
+
+Vectors are written and fsynced before their index lines, so a crash can at worst leave
+unreferenced rows at the end of ``vectors.f32`` and a torn last line in ``index.jsonl``;
+both are truncated on the next open.
+"""
+import hashlib
+import json
+import os
+import re
+import sys
+from typing import Dict, List, Sequence
+
+import numpy as np
+from loguru import logger
+from llama_index.core import Settings, VectorStoreIndex
+from llama_index.core.schema import MetadataMode
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../.."))
+
+from config.models import model_settings
+
+
+def text_hash(text: str) -> str:
+    """
+    SHA-256 hex digest used as the cache key for a chunk of text.
+
+    :param text: Text passed to the embedding model.
+    :type text: str
+    :return: Hex digest.
+    :rtype: str
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """
+    On-disk cache of text embeddings for a single embedding model.
+
+    :param model_name: Name of the embedding model; vectors of different models are kept apart.
+    :type model_name: str
+    :param root: Directory holding the cache. Defaults to ``model_settings.EMBEDDINGS_CACHE_DIR``.
+    :type root: str, optional
+
+    Example:
+        >>> store = EmbeddingStore("BAAI/bge-small-en-v1.5")
+        >>> vectors = store.get_or_embed(["page one", "page two"], embed_model)
+        >>> vectors.shape
+        (2, 384)
+    """
+
+    def __init__(self, model_name: str, root: str = None):
+        self.model_name = model_name
+        self.path = os.path.join(
+            root or model_settings.EMBEDDINGS_CACHE_DIR,
+            re.sub(r"[^\w.-]+", "_", model_name),
+        )
+        os.makedirs(self.path, exist_ok=True)
+        self._vectors_path = os.path.join(self.path, "vectors.f32")
+        self._index_path = os.path.join(self.path, "index.jsonl")
+        self._meta_path = os.path.join(self.path, "meta.json")
+
+        self.dim = None
+        self._rows: Dict[str, int] = {}
+        self._mmap = None
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    def _load(self) -> None:
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                self.dim = json.load(f)["dim"]
+        if self.dim is None:
+            return
+
+        n_vectors = os.path.getsize(self._vectors_path) // (4 * self.dim) if os.path.exists(self._vectors_path) else 0
+        good_end = 0
+        if os.path.exists(self._index_path):
+            with open(self._index_path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # partially written last line
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    if entry["row"] >= n_vectors:
+                        break
+                    self._rows[entry["hash"]] = entry["row"]
+                    good_end += len(line)
+
+        # drop index lines after the last good one (so appends start on a clean line)
+        # and vectors whose index line was never written
+        with open(self._index_path, "ab") as f:
+            f.truncate(good_end)
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(len(self._rows) * 4 * self.dim)
+        logger.debug(f"Loaded {len(self._rows)} cached embeddings from {self.path}")
+
+    def _matrix(self) -> np.ndarray:
+        """Memory-mapped view of all stored vectors (re-mapped after appends)."""
+        if self._mmap is None or self._mmap.shape[0] != len(self._rows):
+            self._mmap = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(len(self._rows), self.dim))
+        return self._mmap
+
+    def get(self, keys: Sequence[str]) -> np.ndarray:
+        """
+        Cached vectors for ``keys`` (all must be present), in the same order.
+
+        :param keys: Text hashes.
+        :type keys: Sequence[str]
+        :return: Array of shape ``(len(keys), dim)``.
+        :rtype: np.ndarray
+        """
+        rows = [self._rows[k] for k in keys]
+        return np.asarray(self._matrix()[rows])
+
+    def add(self, keys: Sequence[str], vectors: np.ndarray) -> None:
+        """
+        Append new vectors to the store; keys already present are ignored.
+
+        :param keys: Text hashes.
+        :type keys: Sequence[str]
+        :param vectors: Array of shape ``(len(keys), dim)``.
+        :type vectors: np.ndarray
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+            with open(self._meta_path, "w", encoding="utf-8") as f:
+                json.dump({"model": self.model_name, "dim": self.dim}, f)
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-dimensional vectors, got {vectors.shape[1]}")
+
+        new_keys, new_rows = [], []
+        for key, vector in zip(keys, vectors):
+            if key not in self._rows and key not in new_keys:
+                new_keys.append(key)
+                new_rows.append(vector)
+        if not new_keys:
+            return
+
+        start = len(self._rows)
+        with open(self._vectors_path, "ab") as f:
+            f.write(np.vstack(new_rows).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        with open(self._index_path, "a", encoding="utf-8") as f:
+            for i, key in enumerate(new_keys):
+                f.write(json.dumps({"hash": key, "row": start + i}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        for i, key in enumerate(new_keys):
+            self._rows[key] = start + i
+
+    def get_or_embed(self, texts: Sequence[str], embed_model, batch_size: int = None) -> np.ndarray:
+        """
+        Vectors for ``texts``, embedding (in batches) and storing only the ones not cached yet.
+
+        :param texts: Texts to embed.
+        :type texts: Sequence[str]
+        :param embed_model: llama_index embedding model (``get_text_embedding_batch``).
+        :param batch_size: Texts per embedding call. Defaults to ``model_settings.EMBEDDINGS_BATCH_SIZE``.
+        :type batch_size: int, optional
+        :return: Array of shape ``(len(texts), dim)``.
+        :rtype: np.ndarray
+        """
+        keys = [text_hash(t) for t in texts]
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in self._rows:
+                missing.setdefault(key, text)
+
+        if missing:
+            batch_size = batch_size or model_settings.EMBEDDINGS_BATCH_SIZE
+            missing_keys = list(missing)
+            for i in range(0, len(missing_keys), batch_size):
+                batch = missing_keys[i:i + batch_size]
+                vectors = embed_model.get_text_embedding_batch([missing[k] for k in batch])
+                self.add(batch, np.asarray(vectors, dtype=np.float32))
+            logger.info(f"Embedded {len(missing)} new chunks ({len(texts) - len(missing)} from cache)")
+
+        if not keys:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        return self.get(keys)
+
+
+def build_index(documents: List, embed_model, store: EmbeddingStore) -> VectorStoreIndex:
+    """
+    Build a ``VectorStoreIndex`` like ``VectorStoreIndex.from_documents`` but with chunk
+    embeddings taken from (and added to) ``store``.
+
+    Documents are split with the same default node parser, and each node is keyed on the
+    exact text the embedding model would see, so cached and fresh vectors are interchangeable.
+
+    :param documents: Parsed report pages.
+    :type documents: list[Document]
+    :param embed_model: Embedding model; still used to embed queries.
+    :param store: Embedding cache for ``embed_model``.
+    :type store: EmbeddingStore
+    :return: In-memory index ready for ``as_query_engine``.
+    :rtype: VectorStoreIndex
+    """
+    nodes = Settings.node_parser.get_nodes_from_documents(documents)
+    texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in nodes]
+    vectors = store.get_or_embed(texts, embed_model)
+    for node, vector in zip(nodes, vectors):
+        node.embedding = vector.tolist()
+    return VectorStoreIndex(nodes, embed_model=embed_model)
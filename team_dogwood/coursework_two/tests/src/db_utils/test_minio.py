@@ -0,0 +1,39 @@
+import os
+import sys
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../.."))
+
+from src.db_utils.minio import MinioFileSystem
+
+
+@patch("src.db_utils.minio.Minio")
+def test_list_all_files_uses_one_recursive_listing(mock_minio):
+    mock_client = mock_minio.return_value
+    mock_client.list_objects.return_value = [
+        SimpleNamespace(object_name="Apple Inc./2023/report.pdf"),
+        SimpleNamespace(object_name="Apple Inc./2022/report.pdf"),
+        SimpleNamespace(object_name="Apple Inc./2023/report.pdf"),
+    ]
+
+    minio = MinioFileSystem()
+    files = minio.list_all_files()
+
+    assert files == {"Apple Inc./2023/report.pdf", "Apple Inc./2022/report.pdf"}
+    mock_client.list_objects.assert_called_once_with(
+        minio.bucket_name, prefix=None, recursive=True
+    )
+
+
+@patch("src.db_utils.minio.Minio")
+def test_list_all_files_with_prefix(mock_minio):
+    mock_client = mock_minio.return_value
+    mock_client.list_objects.return_value = []
+
+    minio = MinioFileSystem()
+
+    assert minio.list_all_files("Apple Inc./") == set()
+    mock_client.list_objects.assert_called_once_with(
+        minio.bucket_name, prefix="Apple Inc./", recursive=True
+    )
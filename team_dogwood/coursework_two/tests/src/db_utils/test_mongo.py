@@ -149,4 +149,62 @@ def test_get_available_years_invalid():
 def test_get_available_years_missing():
     db = MongCollection()
     doc = {}
-    assert db.get_available_years(doc) == []
\ No newline at end of file
+    assert db.get_available_years(doc) == []
+
+@patch("src.db_utils.mongo.MongoClient")
+def test_enter_creates_lookup_indexes(mock_mongo):
+    mock_client, mock_db, mock_collection = mock_mongo_hierarchy()
+    mock_mongo.return_value = mock_client
+
+    with MongCollection():
+        pass
+    names = [kwargs["name"] for _, kwargs in mock_collection.create_index.call_args_list]
+    assert names == ["company_security_year", "company_symbol_year"]
+    keys = mock_collection.create_index.call_args_list[0][0][0]
+    assert [k for k, _ in keys] == ["company.security", "report_metadata.year"]
+
+@patch("src.db_utils.mongo.MongoClient")
+def test_iter_reports_by_company_uses_scalar_key_and_projection(mock_mongo):
+    mock_client, mock_db, mock_collection = mock_mongo_hierarchy()
+    mock_mongo.return_value = mock_client
+    cursor = mock_collection.aggregate.return_value
+    cursor.__iter__.return_value = iter([
+        {"report_metadata": {"year": 2023}, "year_int": 2023, "report": [{"content": "p1"}]},
+        {"report_metadata": {"year": "2022"}, "year_int": 2022, "report": [{"content": "p2"}, {"content": "p3"}]},
+    ])
+
+    db = MongCollection()
+    with patch("src.db_utils.mongo.Document", DummyDocument):
+        reports = db.iter_reports_by_company(DummyCompany(), years=[2023, "2022"])
+        assert not mock_collection.aggregate.called  # lazy until iterated
+        year, pages = next(reports)
+        assert year == 2023 and pages[0].content == "p1"
+        assert [len(p) for _, p in reports] == [2]
+
+    match, project, sort = mock_collection.aggregate.call_args[0][0]
+    query = match["$match"]
+    assert query["company.security"] == "Apple Inc."
+    assert set(query["report_metadata.year"]["$in"]) == {2023, "2023", 2022, "2022"}
+    assert {k for k, v in project["$project"].items() if v == 1} == {"report_metadata.year", "report"}
+    assert project["$project"]["_id"] == 0
+    assert cursor.close.called
+
+@patch("src.db_utils.mongo.MongoClient")
+def test_iter_reports_by_company_sorts_on_int_year(mock_mongo):
+    mock_client, mock_db, mock_collection = mock_mongo_hierarchy()
+    mock_mongo.return_value = mock_client
+    mock_collection.aggregate.return_value.__iter__.return_value = iter([
+        {"report_metadata": {"year": "2024"}, "year_int": 2024, "report": []},
+        {"report_metadata": {"year": 2023}, "year_int": 2023, "report": []},
+        {"report_metadata": {"year": "unknown"}, "year_int": None, "report": []},
+    ])
+
+    db = MongCollection()
+    with patch("src.db_utils.mongo.Document", DummyDocument):
+        years = [year for year, _ in db.iter_reports_by_company(DummyCompany())]
+
+    # str and int years are sorted together on the converted value, and yielded as int
+    _, project, sort = mock_collection.aggregate.call_args[0][0]
+    assert project["$project"]["year_int"]["$convert"]["to"] == "int"
+    assert sort == {"$sort": {"year_int": -1}}
+    assert years == [2024, 2023, "unknown"]
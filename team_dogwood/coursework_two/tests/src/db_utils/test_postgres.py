@@ -0,0 +1,146 @@
+import os
+import sys
+import time
+import types
+import pytest
+from unittest.mock import patch, MagicMock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../.."))
+
+from src.db_utils.postgres import PostgreSQLDB
+
+
+class RecordingCursor:
+    """Minimal psycopg2-like cursor: records every statement sent to the server."""
+    connection = types.SimpleNamespace(encoding="UTF8")
+
+    def __init__(self, row=None):
+        self.statements = []
+        self.rows_sent = 0
+        self.row = row
+    def mogrify(self, template, args):
+        self.rows_sent += 1
+        return repr(args).encode()
+    def execute(self, sql, params=None):
+        self.statements.append(sql)
+    def fetchone(self):
+        return self.row
+    def close(self):
+        pass
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        return False
+
+
+def synthetic_metrics(n):
+    return [
+        {
+            "indicator_id": f"IND_{i % 9:03d}_{i // 9}",
+            "indicator_name": "Scope 1 GHG Emissions",
+            "category": "Climate / Emissions",
+            "company": f"Company {i // 9}",
+            "year": 2023,
+            "figure": float(i),
+            "unit": "tco2e",
+            "data_type": "float",
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def db():
+    with patch("src.db_utils.postgres.psycopg2.connect") as mock_connect:
+        conn = MagicMock()
+        conn.cursor.return_value = RecordingCursor()
+        mock_connect.return_value = conn
+        yield PostgreSQLDB()
+
+
+def test_upsert_metrics_one_transaction(db):
+    rows = synthetic_metrics(2500)
+    assert db.upsert_metrics("emissions", rows) == 2500
+
+    cursor = db.conn.cursor.return_value
+    inserts = [s for s in cursor.statements if isinstance(s, bytes)]
+    assert len(inserts) == 3  # 1000-row pages
+    assert cursor.rows_sent == 2500
+    assert b"ON CONFLICT (indicator_id, year) DO UPDATE" in inserts[0]
+    assert "data_version" in cursor.statements[-1]  # bumped in the same transaction
+    assert db.conn.commit.call_count == 1
+
+
+def test_upsert_metrics_dedupes_keys_and_fills_missing_columns(db):
+    rows = [
+        {"indicator_id": "IND_001", "year": 2023, "figure": 1.0},
+        {"indicator_id": "IND_001", "year": 2023, "figure": 2.0, "unit": "mwh"},
+        {"indicator_id": "IND_002", "year": 2023, "unit": "m3"},
+    ]
+    with patch("src.db_utils.postgres.execute_values") as mock_execute_values:
+        assert db.upsert_metrics("energy", rows) == 2
+    _, sql, values = mock_execute_values.call_args[0]
+    assert "(indicator_id, year, figure, unit)" in sql
+    assert values == [("IND_001", 2023, 2.0, "mwh"), ("IND_002", 2023, None, "m3")]
+
+
+def test_upsert_metrics_rolls_back_on_error(db):
+    with patch("src.db_utils.postgres.execute_values", side_effect=Exception("fail")):
+        assert db.upsert_metrics("waste", synthetic_metrics(10)) == 0
+    assert db.conn.rollback.called
+    assert not db.conn.commit.called
+
+
+def test_upsert_metrics_empty(db):
+    assert db.upsert_metrics("waste", []) == 0
+    assert not db.conn.cursor.called
+
+
+def test_create_data_version_table_starts_at_zero(db):
+    db.create_data_version_table()
+    statements = db.conn.cursor.return_value.statements
+    assert any("CREATE TABLE IF NOT EXISTS csr_metrics.data_version" in s for s in statements)
+    assert "VALUES (1, 0, NOW()) ON CONFLICT (id) DO NOTHING" in statements[-1]
+
+
+def test_get_data_version(db):
+    assert db.get_data_version() == 0  # table created, no metrics written yet
+    db.conn.cursor.return_value = RecordingCursor(row={"version": 7})
+    assert db.get_data_version() == 7
+
+
+def test_get_data_version_failure_returns_none(db):
+    db.conn.cursor.side_effect = Exception("connection lost")
+    assert db.get_data_version() is None
+    assert db.conn.rollback.called
+
+
+@pytest.mark.skipif(
+    not os.getenv("POSTGRES_BENCHMARK"),
+    reason="set POSTGRES_BENCHMARK=1 to benchmark against the configured database",
+)
+@pytest.mark.parametrize("n", [10_000, 100_000])
+def test_upsert_metrics_benchmark(n):
+    rows = synthetic_metrics(n)
+    with PostgreSQLDB() as db:
+        db.execute("CREATE SCHEMA IF NOT EXISTS csr_metrics;")
+        db.execute("DROP TABLE IF EXISTS csr_metrics.bench_metrics;")
+        db.execute("CREATE TABLE csr_metrics.bench_metrics (LIKE csr_metrics.emissions INCLUDING ALL);")
+        try:
+            start = time.perf_counter()
+            assert db.upsert_metrics("bench_metrics", rows) == n
+            insert_s = time.perf_counter() - start
+
+            for r in rows:
+                r["figure"] += 1
+            start = time.perf_counter()
+            assert db.upsert_metrics("bench_metrics", rows) == n
+            update_s = time.perf_counter() - start
+
+            count = db.fetch("SELECT count(*) AS n FROM csr_metrics.bench_metrics")[0]["n"]
+        finally:
+            db.execute("DROP TABLE IF EXISTS csr_metrics.bench_metrics;")
+
+    print(f"\nupsert_metrics {n:>7} rows: insert {insert_s:.2f}s, update {update_s:.2f}s")
+    assert count == n
+    assert insert_s < 30 and update_s < 30
@@ -0,0 +1,103 @@
+import os
+import sys
+import threading
+from unittest.mock import patch
+
+import matplotlib
+matplotlib.use("Agg")
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../.."))
+
+from src.display.chart_cache import ChartService
+
+
+def make_df(offset=0):
+    return pd.DataFrame(
+        {
+            "company_name": ["Apple Inc.", "Apple Inc.", "Microsoft Corp"],
+            "indicator_id": ["IND_001", "IND_001", "IND_001"],
+            "year": [2022, 2023, 2023],
+            "value": [10.0 + offset, 12.0 + offset, 30.0 + offset],
+        }
+    )
+
+
+class FakeSource:
+    def __init__(self):
+        self.version = 1
+        self.loads = 0
+    def load(self):
+        self.loads += 1
+        return make_df(self.version)
+    def get_version(self):
+        return self.version
+
+
+@pytest.fixture
+def source():
+    return FakeSource()
+
+
+@pytest.fixture
+def charts(source):
+    return ChartService(loader=source.load, version_fn=source.get_version, check_interval=0)
+
+
+def test_charts_rendered_once_per_data_version(charts, source):
+    first = charts.company_chart("Apple Inc.")
+    assert first and charts.company_chart("Apple Inc.") == first
+    assert charts.comparison_chart(["Apple Inc.", "Microsoft Corp"], ["IND_001"])
+    assert (charts.hits, charts.misses) == (1, 2)
+    assert source.loads == 1
+
+    source.version = 2  # upsert_metrics wrote new data
+    assert charts.company_chart("Apple Inc.") != first
+    assert source.loads == 2
+    assert charts.stats()["charts_cached"] == 1  # stale version evicted
+
+
+def test_version_checked_at_most_every_interval(source):
+    charts = ChartService(loader=source.load, version_fn=source.get_version, check_interval=60)
+    charts.data()
+    source.version = 2
+    charts.data()
+    assert source.loads == 1
+    charts.invalidate()
+    assert charts.data()[1] == 2 and source.loads == 2
+
+
+def test_failed_version_check_keeps_cached_data(charts, source):
+    df, version = charts.data()
+    source.version = None  # transient DB error
+    assert charts.data() == (df, 1)
+    assert source.loads == 1
+
+    source.version = 2
+    assert charts.data()[1] == 2 and source.loads == 2
+
+
+def test_lru_bound_and_concurrent_requests(source):
+    charts = ChartService(loader=source.load, version_fn=source.get_version, max_charts=2, check_interval=0)
+    with patch("src.display.chart_cache.plot_company_all_three_categories", side_effect=lambda df, name: name) as render:
+        threads = [threading.Thread(target=charts.company_chart, args=("Apple Inc.",)) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert render.call_count == 1
+
+        charts.company_chart("Microsoft Corp")
+        charts.company_chart("Other")
+        assert charts.stats()["charts_cached"] == 2
+        charts.company_chart("Apple Inc.")
+        assert render.call_count == 4
+
+
+def test_prerender_fills_cache(charts):
+    with patch("src.display.chart_cache.plot_company_all_three_categories", side_effect=lambda df, name: name):
+        charts.prerender().join(timeout=10)
+        assert charts.stats()["charts_cached"] == 2
+        charts.company_chart("Microsoft Corp")
+        assert charts.hits == 1
@@ -0,0 +1,136 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../.."))
+
+pytest.importorskip("pdfplumber")
+pytest.importorskip("llama_cloud_services")
+
+from src.extract import parse
+
+
+def make_companies(n_companies, years=(2022, 2023)):
+    return [
+        SimpleNamespace(
+            security=f"Company {i}",
+            esg_reports=[SimpleNamespace(url=f"http://example.com/{i}_{y}.pdf", year=y) for y in years],
+        )
+        for i in range(n_companies)
+    ]
+
+
+def object_names(companies):
+    return {
+        f"{c.security}/{r.year}/{os.path.basename(r.url)}"
+        for c in companies for r in c.esg_reports
+    }
+
+
+class PeakCounter:
+    """Thread-safe count of calls in flight, remembering the peak."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.current = 0
+        self.peak = 0
+    def __enter__(self):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+    def __exit__(self, *exc):
+        with self._lock:
+            self.current -= 1
+
+
+class FakeMinio:
+    """Writes a stub PDF for every download; fails for the names in ``broken``."""
+    def __init__(self, broken=()):
+        self.broken = set(broken)
+        self.downloaded = []
+        self.in_flight = PeakCounter()
+    def download_file(self, file_name, dest_path):
+        with self.in_flight:
+            time.sleep(0.01)
+            if file_name in self.broken:
+                raise ConnectionError("connection reset")
+            with open(dest_path, "wb") as f:
+                f.write(b"%PDF-1.7")
+            self.downloaded.append(file_name)
+
+
+@pytest.fixture
+def llama(monkeypatch):
+    """Mock LlamaParse: every parse sleeps briefly; the first ``fail_first`` parses raise."""
+    state = SimpleNamespace(uploads=PeakCounter(), fail_first=0)
+    monkeypatch.setattr(parse, "LlamaParse", MagicMock())
+    monkeypatch.setattr(parse.LLamaTextExtractor, "find_pages_with_keywords", staticmethod(lambda path: [0]))
+
+    def reader(input_files, file_extractor):
+        async def aload_data():
+            with state.uploads:
+                await asyncio.sleep(0.02)
+            if state.fail_first:
+                state.fail_first -= 1
+                raise RuntimeError("LlamaParse job failed")
+            return [SimpleNamespace(text="page")]
+        return SimpleNamespace(aload_data=aload_data)
+
+    monkeypatch.setattr(parse, "SimpleDirectoryReader", reader)
+    return state
+
+
+def test_concurrency_and_upload_limits_hold(llama):
+    companies = make_companies(10)
+    minio = FakeMinio()
+    mongo = MagicMock()
+
+    counts = asyncio.run(parse.process_reports(
+        companies, minio, mongo, object_names(companies), max_concurrency=5, max_uploads=2,
+    ))
+
+    assert counts == {"parsed": 20, "missing": 0, "fetch_failed": 0, "failed": 0}
+    assert minio.in_flight.peak <= 5
+    assert llama.uploads.peak == 2
+    assert mongo.insert_report.call_count == 20
+
+
+def test_missing_objects_are_counted_without_download(llama):
+    companies = make_companies(3)
+    available = object_names(companies)
+    missing = {name for name in available if name.endswith("_2022.pdf")}
+    minio = FakeMinio()
+
+    counts = asyncio.run(parse.process_reports(
+        companies, minio, MagicMock(), available - missing, max_concurrency=4, max_uploads=2,
+    ))
+
+    assert counts == {"parsed": 3, "missing": 3, "fetch_failed": 0, "failed": 0}
+    assert missing.isdisjoint(minio.downloaded)
+    assert len(minio.downloaded) == 3
+
+
+def test_one_failure_does_not_stop_the_queue(llama):
+    companies = make_companies(4)
+    broken_fetch = "Company 0/2022/0_2022.pdf"
+    minio = FakeMinio(broken=[broken_fetch])
+    mongo = MagicMock()
+
+    # One MinIO fetch, the first LlamaParse job and both of Company 1's Mongo writes fail
+    def insert_report(company, report, docs):
+        if company.security == "Company 1":
+            raise RuntimeError("mongo down")
+    mongo.insert_report.side_effect = insert_report
+    llama.fail_first = 1
+
+    counts = asyncio.run(parse.process_reports(
+        companies, minio, mongo, object_names(companies), max_concurrency=1, max_uploads=1,
+    ))
+
+    assert counts == {"parsed": 4, "missing": 0, "fetch_failed": 1, "failed": 3}
+    assert mongo.insert_report.call_count == 6
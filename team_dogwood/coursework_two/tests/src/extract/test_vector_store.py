@@ -0,0 +1,82 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../.."))
+
+from src.extract.vector_store import EmbeddingStore, text_hash
+
+
+class CountingEmbedding:
+    """Deterministic 4-d embeddings; records every batch it is asked for."""
+    def __init__(self):
+        self.batches = []
+    def get_text_embedding_batch(self, texts):
+        self.batches.append(list(texts))
+        return [[len(t), t.count("a"), t.count("e"), 1.0] for t in texts]
+
+
+def test_embeds_once_in_batches(tmp_path):
+    embed = CountingEmbedding()
+    store = EmbeddingStore("org/model", root=str(tmp_path))
+    texts = ["alpha", "beta", "gamma", "alpha"]
+
+    vectors = store.get_or_embed(texts, embed, batch_size=2)
+    assert vectors.shape == (4, 4)
+    assert embed.batches == [["alpha", "beta"], ["gamma"]]
+    np.testing.assert_array_equal(vectors[0], vectors[3])
+
+    again = store.get_or_embed(texts, embed, batch_size=2)
+    assert len(embed.batches) == 2
+    np.testing.assert_array_equal(again, vectors)
+
+
+def test_persists_and_adds_incrementally(tmp_path):
+    embed = CountingEmbedding()
+    EmbeddingStore("org/model", root=str(tmp_path)).get_or_embed(["alpha", "beta"], embed)
+
+    store = EmbeddingStore("org/model", root=str(tmp_path))
+    assert len(store) == 2 and text_hash("beta") in store
+    vectors = store.get_or_embed(["beta", "delta"], embed)
+    assert embed.batches[-1] == ["delta"]
+    assert vectors[1].tolist() == [5.0, 1.0, 1.0, 1.0]
+    assert len(EmbeddingStore("org/model", root=str(tmp_path))) == 3
+
+
+def test_recovers_from_torn_write(tmp_path):
+    embed = CountingEmbedding()
+    store = EmbeddingStore("m", root=str(tmp_path))
+    store.get_or_embed(["alpha", "beta"], embed)
+    # vectors written but the index line never made it
+    with open(os.path.join(store.path, "vectors.f32"), "ab") as f:
+        f.write(np.ones(4, dtype=np.float32).tobytes())
+
+    reopened = EmbeddingStore("m", root=str(tmp_path))
+    assert len(reopened) == 2
+    reopened.get_or_embed(["gamma"], embed)
+    assert reopened.get([text_hash("gamma")]).tolist() == [[5.0, 2.0, 0.0, 1.0]]
+
+
+def test_torn_index_line_is_truncated(tmp_path):
+    embed = CountingEmbedding()
+    store = EmbeddingStore("m", root=str(tmp_path))
+    store.get_or_embed(["alpha", "beta"], embed)
+    with open(os.path.join(store.path, "index.jsonl"), "a", encoding="utf-8") as f:
+        f.write('{"hash": "abc", "ro')
+
+    reopened = EmbeddingStore("m", root=str(tmp_path))
+    assert len(reopened) == 2
+    reopened.get_or_embed(["gamma", "delta"], embed)
+
+    again = EmbeddingStore("m", root=str(tmp_path))
+    assert len(again) == 4
+    assert again.get([text_hash("delta")]).tolist() == [[5.0, 1.0, 1.0, 1.0]]
+
+
+def test_rejects_dimension_change(tmp_path):
+    store = EmbeddingStore("m", root=str(tmp_path))
+    store.add(["k1"], np.zeros((1, 4)))
+    with pytest.raises(ValueError):
+        store.add(["k2"], np.zeros((1, 3)))